@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+DevScope - /api/analyze 端到端基准测试
+
+先用 record 模式访问真实 GitHub 录制存档，之后用 replay 模式完全离线、
+可重复地测量 `main.analyze_developer` 的耗时（可注入固定网络延迟）：
+
+    python benchmark_analyze.py torvalds --mode record
+    python benchmark_analyze.py torvalds --mode replay --iterations 20 --latency-ms 50
+
+每次运行使用临时目录中的响应缓存与提交存储，结果不受本地缓存状态影响；
+同一次运行中第 2 次起的迭代会命中条件请求缓存（与线上重复分析一致）。
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+async def run(usernames, iterations):
+    import httpx
+    import main
+
+    # ASGITransport 不触发启动 / 关闭钩子，手动创建与释放 GitHub 客户端
+    await main.init_github_client()
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for username in usernames:
+                timings = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    resp = await client.get(f"/api/analyze/{username}")
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if resp.status_code != 200:
+                        print(f"  ✗ {username}: HTTP {resp.status_code} {resp.text[:200]}")
+                        break
+                results[username] = timings
+    finally:
+        await main.close_github_client()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="DevScope /api/analyze 端到端基准测试")
+    parser.add_argument("usernames", nargs="+", help="GitHub 用户名")
+    parser.add_argument("--mode", choices=["record", "replay", "live"], default="replay")
+    parser.add_argument(
+        "--fixtures",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "github_fixtures.json.gz"),
+        help="回放存档路径",
+    )
+    parser.add_argument("--iterations", type=int, default=5, help="每个用户的分析次数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="回放时每个请求注入的延迟（毫秒）")
+    args = parser.parse_args()
+
+    os.environ["GITHUB_TRANSPORT"] = args.mode
+    os.environ["GITHUB_FIXTURE_PATH"] = args.fixtures
+    os.environ["GITHUB_REPLAY_LATENCY_MS"] = str(args.latency_ms)
+    if args.mode == "replay":
+        # 回放完全离线：不调用 LLM
+        os.environ["LLM_API_KEY"] = ""
+
+    iterations = 1 if args.mode == "record" else max(1, args.iterations)
+    with tempfile.TemporaryDirectory(prefix="devscope-bench-") as workdir:
+        os.environ["GITHUB_CACHE_PATH"] = os.path.join(workdir, "responses.sqlite3")
+        os.environ["GITHUB_COMMIT_STORE_PATH"] = os.path.join(workdir, "commits.sqlite3")
+        results = asyncio.run(run(args.usernames, iterations))
+
+    print("\n" + "=" * 70)
+    print(f"DevScope /api/analyze 基准测试 (mode={args.mode}, latency={args.latency_ms}ms)")
+    print("=" * 70)
+    for username, timings in results.items():
+        if not timings:
+            continue
+        print(
+            f"  {username}: n={len(timings)} "
+            f"first={timings[0]:.1f}ms "
+            f"p50={statistics.median(timings):.1f}ms "
+            f"p95={_percentile(timings, 95):.1f}ms "
+            f"min={min(timings):.1f}ms max={max(timings):.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,144 @@
+"""
+按仓库的增量提交同步存储
+
+`get_user_commit_activity` 每次都会重新下载 365 天窗口内的全部提交。
+此模块为每个 (用户, 仓库) 保存已抓取的提交（时间、消息、链接）以及同步水位线：
+- 再次分析时只请求 `since=<水位线 - overlap>` 之后的提交并合并；
+  GitHub 按提交者时间过滤 since，overlap 需覆盖本地提交后延迟推送的情况；
+- since 对齐到 UTC 零点，同一天内的重复请求参数一致，可命中条件请求缓存；
+- 只有完整抓取（未触及分页上限）后才推进水位线，否则下次仍从旧水位线开始；
+- 超出 365 天窗口的旧提交在合并时被清理。
+
+与 `github_cache.ResponseCache` 一样基于 SQLite，多个 worker 共享且重启后保留。
+"""
+
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from github_records import CommitRecord
+
+logger = logging.getLogger('github_client')
+
+
+def _parse_ts(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class CommitStore:
+    """基于 SQLite 的提交增量存储。
+
+    参数：
+        path: SQLite 文件路径（目录不存在时自动创建）
+        overlap: 增量请求时水位线向前回退的时长，覆盖时钟偏差与延迟推送
+    """
+
+    def __init__(self, path: str, overlap: timedelta = timedelta(days=7)) -> None:
+        self.path = path
+        self.overlap = overlap
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS commits (
+                    username TEXT NOT NULL,
+                    repo TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    message TEXT NOT NULL,
+                    PRIMARY KEY (username, repo, url)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_commits_repo_ts ON commits(username, repo, ts)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    username TEXT NOT NULL,
+                    repo TEXT NOT NULL,
+                    synced_at TEXT NOT NULL,
+                    PRIMARY KEY (username, repo)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def fetch_since(self, username: str, repo: str, window_start: str) -> str:
+        """返回本次应请求的 since：有水位线时取 max(窗口起点, 水位线 - overlap)，对齐到 UTC 零点。"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT synced_at FROM watermarks WHERE username = ? AND repo = ?",
+                    (username.lower(), repo),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning(f"读取提交水位线失败: {exc}")
+            return window_start
+        if row is None:
+            return window_start
+        watermark = datetime.fromisoformat(row[0]) - self.overlap
+        watermark = watermark.replace(hour=0, minute=0, second=0, microsecond=0)
+        if watermark.timestamp() <= _parse_ts(window_start):
+            return window_start
+        return watermark.isoformat()
+
+    def merge(
+        self,
+        username: str,
+        repo: str,
+        commits: List[CommitRecord],
+        window_start: str,
+        synced_at: datetime,
+        complete: bool = True,
+    ) -> Optional[List[CommitRecord]]:
+        """合并新抓取的提交、清理窗口外旧提交；complete 为 True 时推进水位线。
+
+        返回该仓库窗口内的全部提交（按时间倒序）。
+        读写失败时返回 None：本次抓取只覆盖水位线之后，调用方应改为完整抓取。
+        """
+        rows = []
+        for c in commits:
+            try:
+                rows.append((username.lower(), repo, c.url, c.date, _parse_ts(c.date), c.message))
+            except ValueError:
+                continue
+        start_ts = _parse_ts(window_start)
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO commits (username, repo, url, date, ts, message) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "DELETE FROM commits WHERE username = ? AND repo = ? AND ts < ?",
+                    (username.lower(), repo, start_ts),
+                )
+                if complete:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO watermarks (username, repo, synced_at) VALUES (?, ?, ?)",
+                        (username.lower(), repo, synced_at.isoformat()),
+                    )
+                stored = conn.execute(
+                    "SELECT url, date, message FROM commits WHERE username = ? AND repo = ? ORDER BY ts DESC",
+                    (username.lower(), repo),
+                ).fetchall()
+        except sqlite3.Error as exc:
+            logger.warning(f"写入提交存储失败: {exc}")
+            return None
+        return [CommitRecord(date=date, message=message, url=url) for url, date, message in stored]
@@ -0,0 +1,101 @@
+"""
+时间分布拟合结果缓存
+
+`/api/analyze` 与 `/api/match` 会对同一用户的 `commit_times` 各拟合一次，
+重复分析没有新提交的用户时也会从头重新拟合。`FitMemo` 按输入内容的哈希
+（过滤后按时间顺序排列的间隔数组）缓存拟合结果：
+
+- LRU 淘汰，同时受条目数上限与 TTL 约束；
+- 命中 / 未命中 / 淘汰 / 过期次数可通过 `stats()` 查看；
+- 存入与取出时都做深拷贝，调用方修改返回的字典不会影响缓存内容。
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+def array_digest(values: Any) -> str:
+    """数组内容的稳定哈希（按 float64 序列化，与元素顺序相关）。"""
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest()
+
+
+class FitMemo:
+    """拟合结果的 LRU + TTL 内存缓存，线程安全。
+
+    参数：
+        max_entries: 最多缓存的条目数，超过后淘汰最久未使用的条目
+        ttl: 条目存活秒数（<= 0 表示不过期）
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 3600.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """返回缓存结果的副本；不存在或已过期时返回 None。"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """命中时返回缓存副本，否则调用 compute() 并缓存其结果。"""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
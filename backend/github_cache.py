@@ -0,0 +1,208 @@
+"""
+GitHub 响应缓存（ETag / Last-Modified 条件请求）
+
+GitHub 对携带 `If-None-Match` / `If-Modified-Since` 的请求在数据未变化时返回
+304，且 304 不计入速率限制。此模块把 200 响应的正文与校验头保存在 SQLite 中：
+- 同一身份（Token 摘要）+ URL + 参数再次请求时附带条件头，不同 Token 的响应互不共享；
+- 收到 304 时直接返回本地保存的正文。
+
+SQLite 文件可被同一台机器上的多个 uvicorn worker 共享，并在重启后保留。
+总大小超过上限时按最近访问时间（LRU）淘汰。读取路径不写库：命中时只在内存中
+记下访问时间（精度 ACCESS_RESOLUTION 秒），攒够一批或间隔到期时一次性写回，
+避免每次命中都争抢 WAL 写锁。
+"""
+
+import json
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger('github_client')
+
+# 304 时需要从缓存中恢复的响应头（其余头部以最新的 304 响应为准）
+_STORED_HEADERS = ("Content-Type", "Link", "ETag", "Last-Modified")
+
+
+class ResponseCache:
+    """基于 SQLite 的条件请求缓存。
+
+    参数：
+        path: SQLite 文件路径（目录不存在时自动创建）
+        max_bytes: 缓存正文总大小上限，超出后按 LRU 淘汰
+    """
+
+    # accessed_at 的精度（秒）：距上次记录不足该值的命中不再更新
+    ACCESS_RESOLUTION = 60.0
+    # 待写回的访问时间达到该条数，或距上次写回超过 TOUCH_FLUSH_INTERVAL 秒时批量写回
+    TOUCH_FLUSH_BATCH = 64
+    TOUCH_FLUSH_INTERVAL = 30.0
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._touched: Dict[str, float] = {}
+        self._touch_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 每次操作独立连接：线程安全，且多进程通过 SQLite 文件锁协调
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        identity: str = "anonymous",
+    ) -> str:
+        """缓存键：身份（Token 摘要）+ 方法 + URL + 排序后的参数。"""
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = json.dumps([identity, method.upper(), url, items], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，返回 {etag, last_modified, headers, body} 或 None。"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT etag, last_modified, headers, body, accessed_at FROM responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning(f"读取响应缓存失败: {exc}")
+            return None
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[4] >= self.ACCESS_RESOLUTION:
+            self._touch(key, now)
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "headers": json.loads(row[2]),
+            "body": bytes(row[3]),
+        }
+
+    def put(self, key: str, headers: Any, body: bytes) -> None:
+        """保存 200 响应；仅当响应带有 ETag 或 Last-Modified 时才有意义。"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        if len(body) > self.max_bytes:
+            return
+        stored = {h: headers.get(h) for h in _STORED_HEADERS if headers.get(h) is not None}
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO responses
+                        (key, etag, last_modified, headers, body, size, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, etag, last_modified, json.dumps(stored), body, len(body), time.time()),
+                )
+                # 淘汰前写回待更新的访问时间，LRU 顺序才准确
+                self._write_touches(conn, self._take_touches())
+                self._evict(conn)
+        except sqlite3.Error as exc:
+            logger.warning(f"写入响应缓存失败: {exc}")
+
+    def _touch(self, key: str, accessed_at: float) -> None:
+        with self._touch_lock:
+            self._touched[key] = accessed_at
+            due = (
+                len(self._touched) >= self.TOUCH_FLUSH_BATCH
+                or time.monotonic() - self._last_flush >= self.TOUCH_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush_touches()
+
+    def _take_touches(self) -> Dict[str, float]:
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.monotonic()
+        return touched
+
+    @staticmethod
+    def _write_touches(conn: sqlite3.Connection, touched: Dict[str, float]) -> None:
+        if touched:
+            conn.executemany(
+                "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(ts, key) for key, ts in touched.items()],
+            )
+
+    def flush_touches(self) -> None:
+        """把内存中攒下的访问时间批量写回（服务关闭时也应调用一次）。"""
+        touched = self._take_touches()
+        if not touched:
+            return
+        try:
+            with self._connect() as conn:
+                self._write_touches(conn, touched)
+        except sqlite3.Error as exc:
+            logger.warning(f"写回响应缓存访问时间失败: {exc}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        victims = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        logger.info(f"响应缓存超出上限，淘汰 {len(victims)} 条")
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def merged_headers(entry: Dict[str, Any], fresh_headers: Any) -> Dict[str, str]:
+        """304 场景：以缓存的内容头为底，覆盖上最新的速率限制等响应头。"""
+        merged: Dict[str, Any] = {}
+        for k, v in list(entry["headers"].items()) + list(fresh_headers.items()):
+            if k.lower() in ("content-length", "content-encoding", "transfer-encoding"):
+                continue
+            merged[k.lower()] = (k, v)
+        return {k: v for k, v in merged.values()}
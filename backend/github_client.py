@@ -1,24 +1,67 @@
 import os
 import time
+import asyncio
+import hashlib
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple, Callable
+from urllib.parse import parse_qs, urlparse
 
 import requests
+import httpx
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from github_cache import ResponseCache
+from commit_store import CommitStore
+from github_records import RepoRecord, CommitRecord
+import github_graphql
+from github_quota import TokenPool, QuotaExhaustedError, RateLimitedError, resource_for_endpoint
+from singleflight import SingleFlight, coalesce
+from github_metrics import MetricsSink, endpoint_template
+from github_resilience import (
+    RETRYABLE_STATUS,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TransientRequestError,
+    circuit_breaker_for,
+)
 
 logger = logging.getLogger('github_client')
 
+_LINK_LAST_RE = re.compile(r'<([^>]+)>;\s*rel="last"')
 
-class GitHubClient:
-    """GitHub REST API 客户端封装。
 
-    环境变量：
-    - GITHUB_TOKEN: 可选的个人访问令牌，用于提升速率限制与授权访问。
+# 并发请求合并的键：用户名不区分大小写，只包含影响结果的参数
+def _user_key(self, username: str) -> Any:
+    return username.lower()
+
+
+def _repos_key(self, username: str, per_page: int = 100, max_pages: int = 10) -> Any:
+    return (username.lower(), per_page, max_pages)
+
+
+def _activity_key(
+    self,
+    username: str,
+    limit_repos: int = 20,
+    per_repo_commits: int = 500,
+    concurrency: Optional[int] = None,
+    repos: Optional[List[RepoRecord]] = None,
+) -> Any:
+    # 传入的仓库列表决定抓取范围：不同列表的调用不能合并
+    repos_digest = None
+    if repos is not None:
+        listing = "\n".join(f"{r.owner}/{r.name}@{r.pushed_at or ''}" for r in repos)
+        repos_digest = hashlib.blake2b(listing.encode("utf-8"), digest_size=16).hexdigest()
+    return (username.lower(), limit_repos, per_repo_commits, repos_digest)
 
-    速率限制处理逻辑：
-    - 读取响应头 `X-RateLimit-Remaining` 与 `X-RateLimit-Reset`。
-    - 当剩余额度过低时，休眠到重置时间后再继续请求。
-    """
+
+class _GitHubClientBase:
+    """同步/异步客户端共用的配置与数据整理逻辑（不涉及网络 I/O）。"""
 
     def __init__(
         self,
@@ -26,63 +69,766 @@ class GitHubClient:
         base_url: str = "https://api.github.com",
         min_remaining: int = 2,
         timeout: int = 60,  # 增加到60秒
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        fetch_mode: Optional[str] = None,
+        token_pool: Optional[TokenPool] = None,
+        quota_deadline: float = 10.0,
+        tokens: Optional[List[str]] = None,
+        commit_store: Optional[CommitStore] = None,
+        events_fast_path: Optional[bool] = None,
+        metrics: Optional[MetricsSink] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        commit_source: Optional[str] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
+        # 可选的 ETag/Last-Modified 条件请求缓存
+        self.cache = cache
         self.timeout = timeout
         self.min_remaining = min_remaining
-        _token = token or os.environ.get("GITHUB_TOKEN")
-        headers = {
+        # 可选的按仓库增量提交存储（水位线之后的提交才重新请求）
+        self.commit_store = commit_store
+        # 按仓库并发抓取提交时的默认并发上限
+        self.max_concurrency = max(1, max_concurrency)
+        # Token 池：每个 Token 独立跟踪额度（可在多个客户端间共享）；
+        # 额度不足时最多等待 quota_deadline 秒
+        if token_pool is None:
+            token_pool = TokenPool(self._resolve_tokens(token, tokens), min_remaining)
+        self.token_pool = token_pool
+        self.quota_deadline = quota_deadline
+        # 请求延迟 / 状态码 / 字节数 / 分页数 / 剩余额度的指标接收器（默认不记录）
+        self.metrics = metrics or MetricsSink()
+        # 幂等 GET 的退避重试策略，以及按主机共享的熔断器
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or circuit_breaker_for(self.base_url)
+        # 同一用户的并发 get_user / get_repos / 提交活动请求只执行一次，结果共享（只读）
+        self._flights = SingleFlight()
+        self.headers = {
             "Accept": "application/vnd.github+json",
             "User-Agent": "DevScope-Client/1.0",
         }
-        if _token:
-            headers["Authorization"] = f"Bearer {_token}"
-            logger.info("使用 GitHub Token 进行认证")
+        if self.token_pool.authenticated:
+            logger.info(f"使用 GitHub Token 进行认证 (Token 数={len(self.token_pool)})")
         else:
             logger.warning("未设置 GITHUB_TOKEN，将使用匿名访问（速率限制较低）")
-        self.session.headers.update(headers)
+        # 抓取模式："rest"（默认）或 "graphql"（需要 Token）
+        mode = (fetch_mode or os.environ.get("GITHUB_FETCH_MODE", "rest")).lower()
+        if mode not in ("rest", "graphql"):
+            raise ValueError(f"未知的 GitHub 抓取模式: {mode}")
+        if mode == "graphql" and not self.token_pool.authenticated:
+            logger.warning("GraphQL 模式需要 GITHUB_TOKEN，已回退为 REST 模式")
+            mode = "rest"
+        self.fetch_mode = mode
+        # REST 模式下先用公开事件流选出最近推送过的仓库，只抓取这些仓库的提交（默认开启）；
+        # 间隔数不足以拟合时才按仓库列表逐仓库抓取
+        if events_fast_path is None:
+            events_fast_path = os.environ.get("GITHUB_EVENTS_FAST_PATH", "1").lower() in ("1", "true", "yes")
+        self.events_fast_path = events_fast_path
+        # REST 模式下的提交来源："repos"（默认，逐仓库抓取）或 "search"（search/commits 一次覆盖所有仓库）
+        source = (commit_source or os.environ.get("GITHUB_COMMIT_SOURCE", "repos")).lower()
+        if source not in ("repos", "search"):
+            raise ValueError(f"未知的提交来源: {source}")
+        self.commit_source = source
+
+    @staticmethod
+    def _resolve_tokens(token: Optional[str], tokens: Optional[List[str]]) -> List[str]:
+        """Token 来源优先级：tokens 参数 > token 参数 > GITHUB_TOKENS（逗号分隔）> GITHUB_TOKEN。"""
+        if tokens:
+            return list(tokens)
+        if token:
+            return [token]
+        pool = [t.strip() for t in os.environ.get("GITHUB_TOKENS", "").split(",") if t.strip()]
+        if pool:
+            return pool
+        single = os.environ.get("GITHUB_TOKEN")
+        return [single] if single else []
+
+    def _quota_wait(self, resource: str, started: float) -> Tuple[int, float]:
+        """申请额度：返回 (Token 槽位, 需等待秒数)；超过截止时间则抛出 QuotaExhaustedError。"""
+        slot, wait = self.token_pool.try_acquire(resource)
+        if wait > 0 and time.monotonic() - started + wait > self.quota_deadline:
+            logger.warning(f"GitHub 速率额度不足 ({resource})，{wait:.0f} 秒后重置，快速失败")
+            raise QuotaExhaustedError(wait, resource)
+        return slot, wait
+
+    def _check_rate_limited(self, slot: int, resource: str, resp: Any, url: str) -> None:
+        """403/429 限流响应：标记该 Token 额度耗尽并抛出 RateLimitedError。"""
+        if resp.status_code not in (403, 429):
+            return
+        retry_after_header = resp.headers.get("Retry-After")
+        if retry_after_header is None and "rate limit" not in resp.text.lower():
+            return
+        try:
+            retry_after = float(retry_after_header) if retry_after_header is not None else None
+        except ValueError:
+            retry_after = None
+        if retry_after is None:
+            try:
+                retry_after = float(resp.headers.get("X-RateLimit-Reset", 0)) - time.time()
+            except ValueError:
+                retry_after = 60.0
+            retry_after = retry_after if retry_after > 0 else 60.0
+        logger.warning(f"检测到速率限制 ({resource})，{retry_after:.0f} 秒后重置: {url}")
+        self.token_pool.mark_exhausted(slot, resource, retry_after)
+        raise RateLimitedError(retry_after, resource)
+
+    def _cache_key(
+        self, method: str, url: str, params: Optional[Dict[str, Any]], slot: int
+    ) -> Optional[str]:
+        if self.cache is None or method.upper() != "GET":
+            return None
+        # 不同 Token 可见的数据可能不同（私有仓库、组织权限），缓存按 Token 身份隔离
+        return ResponseCache.make_key(method, url, params, self.token_pool.identity(slot))
+
+    def _fanout_width(self, n_tasks: int, concurrency: Optional[int] = None) -> int:
+        """计算并发抓取宽度：不超过配置上限、任务数，以及当前剩余额度。"""
+        width = concurrency or self.max_concurrency
+        available = self.token_pool.available("core")
+        if available is not None:
+            width = min(width, max(1, available))
+        return max(1, min(width, n_tasks))
 
-    def _rate_limit_sleep(self, headers: Dict[str, Any]) -> None:
-        remaining = headers.get("X-RateLimit-Remaining")
-        reset = headers.get("X-RateLimit-Reset")
+    def _retry_delay(
+        self, method: str, attempt: int, started: float, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """幂等 GET 的第 attempt 次失败后的退避秒数；不重试时返回 None。"""
+        if method.upper() != "GET":
+            return None
+        return self.retry_policy.next_delay(attempt, started, retry_after)
+
+    @staticmethod
+    def _retry_after(resp: Any) -> Optional[float]:
+        value = resp.headers.get("Retry-After")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _record_request(
+        self,
+        endpoint: str,
+        method: str,
+        status: str,
+        started: float,
+        headers: Any = None,
+        nbytes: int = 0,
+    ) -> None:
+        """把一次请求的延迟、状态码、字节数与剩余额度交给指标接收器。"""
+        self.metrics.observe_request(
+            endpoint_template(endpoint), method, status, time.perf_counter() - started, nbytes
+        )
+        remaining = headers.get("X-RateLimit-Remaining") if headers is not None else None
+        if remaining is not None:
+            try:
+                resource = headers.get("X-RateLimit-Resource") or resource_for_endpoint(endpoint)
+                self.metrics.set_rate_limit_remaining(resource, int(remaining))
+            except ValueError:
+                pass
+
+    def _join_pages(self, endpoint: str, pages: List[List[Any]]) -> List[Any]:
+        self.metrics.observe_pages(endpoint_template(endpoint), len(pages))
+        return [item for page in pages for item in page]
+
+    @staticmethod
+    def _commit_params(
+        author: Optional[str],
+        since: Optional[str],
+        until: Optional[str],
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {}
+        if author:
+            params["author"] = author
+        if since:
+            params["since"] = since
+        if until:
+            params["until"] = until
+        return params
+
+    @staticmethod
+    def _last_page(headers: Any) -> Optional[int]:
+        """从 Link 响应头的 rel="last" 中解析总页数，没有时返回 None。"""
+        link = headers.get("Link")
+        if not link:
+            return None
+        match = _LINK_LAST_RE.search(link)
+        if not match:
+            return None
+        page = parse_qs(urlparse(match.group(1)).query).get("page")
         try:
-            remaining_int = int(remaining) if remaining is not None else None
-            reset_int = int(reset) if reset is not None else None
+            return int(page[0]) if page else None
         except ValueError:
-            remaining_int = None
-            reset_int = None
-        if remaining_int is not None and remaining_int <= self.min_remaining:
-            if reset_int is not None:
-                now = int(time.time())
-                sleep_s = max(0, reset_int - now)
-                if sleep_s > 0:
-                    time.sleep(sleep_s)
-
-    def _request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+            return None
+
+    @staticmethod
+    def _activity_window() -> Tuple[datetime, str]:
+        """返回 (当前时间, 窗口起点 ISO 字符串)，窗口为 Rolling 12 Months。
+
+        窗口起点对齐到 UTC 零点：同一天内的重复请求参数一致，才能命中条件请求缓存。
+        """
+        now = datetime.now(timezone.utc)
+        since_date = (now - timedelta(days=365)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return now, since_date.isoformat()
+
+    def _activity_targets(
+        self,
+        repos: List[RepoRecord],
+        username: str,
+        limit_repos: int,
+        since_str: Optional[str] = None,
+    ) -> List[Tuple[str, str]]:
+        """从仓库列表中选出需要抓取提交的 (owner, name)，limit_repos 作为兜底。
+
+        - pushed_at 早于窗口起点的仓库窗口内不可能有提交，直接跳过；
+        - 其余仓库按 pushed_at 倒序，优先把预算花在最近活跃的仓库上；
+        - 缺少 pushed_at 的仓库排在最后。
+        """
+        window_start = self._parse_iso(since_str) if since_str else None
+        candidates: List[Tuple[float, str, str]] = []
+        skipped = 0
+        for repo in repos:
+            owner, name = repo.owner or username, repo.name
+            pushed = self._parse_iso(repo.pushed_at)
+            if pushed is not None and window_start is not None and pushed < window_start:
+                skipped += 1
+                continue
+            candidates.append((pushed if pushed is not None else float("-inf"), owner, name))
+        if skipped:
+            logger.info(f"跳过 {skipped} 个窗口内无推送的仓库")
+        # 稳定排序：pushed_at 相同时保持 API 返回顺序
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        return [(owner, name) for _, owner, name in candidates[:limit_repos]]
+
+    @staticmethod
+    def _parse_iso(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+
+    # search/commits 单个查询最多返回 1000 条（10 页 × 100 条）；超出时二分时间窗口
+    SEARCH_MAX_RESULTS = 1000
+    SEARCH_PER_PAGE = 100
+    SEARCH_MIN_SLICE = timedelta(hours=1)
+
+    @staticmethod
+    def _search_query(username: str, start: datetime, end: Optional[datetime]) -> str:
+        def fmt(d: datetime) -> str:
+            return d.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        if end is None:
+            return f"author:{username} committer-date:>{fmt(start)}"
+        return f"author:{username} committer-date:{fmt(start)}..{fmt(end)}"
+
+    @classmethod
+    def _search_params(cls, query: str, page: int) -> Dict[str, Any]:
+        return {
+            "q": query,
+            "sort": "committer-date",
+            "order": "desc",
+            "per_page": cls.SEARCH_PER_PAGE,
+            "page": page,
+        }
+
+    @staticmethod
+    def _search_items(payload: Dict[str, Any]) -> Tuple[int, List[Tuple[str, str, CommitRecord]]]:
+        """search/commits 响应 → (total_count, [(owner, name, CommitRecord)])。"""
+        if payload.get("incomplete_results"):
+            logger.warning("提交搜索结果不完整 (incomplete_results=true)")
+        items = []
+        for item in payload.get("items") or []:
+            record = CommitRecord.from_json(item)
+            repo = item.get("repository") or {}
+            owner = (repo.get("owner") or {}).get("login")
+            name = repo.get("name")
+            if record and owner and name:
+                items.append((owner, name, record))
+        return int(payload.get("total_count") or 0), items
+
+    def _search_split(
+        self, total: int, start: datetime, end: Optional[datetime], now: datetime
+    ) -> Optional[Tuple[Tuple[datetime, datetime], Tuple[datetime, datetime]]]:
+        """超过 1000 条上限时返回 (较新的一半, 较早的一半)，否则返回 None。
+
+        开放窗口的上界取次日 UTC 零点：窗口起点同样对齐到零点，二分点只取决于日期，
+        同一天内重复请求的查询参数一致，可以命中条件请求缓存与回放存档。
+        """
+        if end is None:
+            end = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        if total <= self.SEARCH_MAX_RESULTS or end - start <= self.SEARCH_MIN_SLICE:
+            if total > self.SEARCH_MAX_RESULTS:
+                logger.warning(f"提交搜索时间片内仍有 {total} 条，仅取前 {self.SEARCH_MAX_RESULTS} 条")
+            return None
+        mid = start + (end - start) / 2
+        return (mid, end), (start, mid)
+
+    def _search_pages(self, total: int) -> int:
+        capped = min(total, self.SEARCH_MAX_RESULTS)
+        return (capped + self.SEARCH_PER_PAGE - 1) // self.SEARCH_PER_PAGE
+
+    def _search_result(
+        self, found: List[Tuple[str, str, CommitRecord]], since_str: str, now: datetime
+    ) -> Dict[str, Any]:
+        # 相邻时间片的边界是闭区间，按提交链接去重
+        timestamps: List[str] = []
+        recent_commits: List[Dict[str, Any]] = []
+        seen = set()
+        for owner, name, commit in found:
+            if commit.url in seen:
+                continue
+            seen.add(commit.url)
+            self._collect_commits(owner, name, [commit], timestamps, recent_commits)
+        return self._finalize_activity(timestamps, recent_commits, since_str, now, source="search")
+
+    # 事件流选出的仓库中足以拟合 Weibull 的最少有效间隔数（modeling 要求至少 3 个，这里留出余量）
+    EVENTS_MIN_INTERVALS = 10
+
+    @staticmethod
+    def _author_identities(username: str, profile: Optional[Dict[str, Any]]) -> Set[str]:
+        """事件负载中的提交作者只有 name / email，用登录名与资料中的姓名、邮箱识别本人。"""
+        identities = {username.lower()}
+        for field in ("name", "email"):
+            value = (profile or {}).get(field)
+            if value:
+                identities.add(value.strip().lower())
+        return identities
+
+    @staticmethod
+    def _authored_by(commit: Dict[str, Any], username: str, identities: Set[str]) -> bool:
+        author = commit.get("author") or {}
+        name = (author.get("name") or "").strip().lower()
+        email = (author.get("email") or "").strip().lower()
+        if name in identities or email in identities:
+            return True
+        # noreply 邮箱：<id>+<login>@users.noreply.github.com 或 <login>@users.noreply.github.com
+        local, _, domain = email.partition("@")
+        return domain == "users.noreply.github.com" and local.rsplit("+", 1)[-1] == username.lower()
+
+    @classmethod
+    def _active_repos_from_events(
+        cls,
+        events: List[Dict[str, Any]],
+        since_str: str,
+        username: str,
+        identities: Set[str],
+    ) -> List[Tuple[str, str]]:
+        """从公开事件流的 PushEvent 中选出本人推送过的仓库 (owner, name)，最近推送的在前。
+
+        事件流只用于挑选仓库：推送时间 created_at 不是提交的作者时间，
+        提交时间仍由 commits API 在完整窗口内抓取。负载中只有其他作者提交的推送不计入。
+        """
+        window_start = cls._parse_iso(since_str)
+        active: List[Tuple[str, str]] = []
+        for event in events:
+            if event.get("type") != "PushEvent":
+                continue
+            created_ts = cls._parse_iso(event.get("created_at"))
+            if created_ts is None or (window_start is not None and created_ts < window_start):
+                continue
+            owner, _, name = ((event.get("repo") or {}).get("name") or "").partition("/")
+            if not owner or not name:
+                continue
+            payload = event.get("payload") or {}
+            listed = [c for c in payload.get("commits") or [] if c.get("distinct", True)]
+            # 新版事件负载可能不含提交列表，此时仍认为是本人的推送
+            if listed and not any(cls._authored_by(c, username, identities) for c in listed):
+                continue
+            if (owner, name) not in active:
+                active.append((owner, name))
+        return active
+
+    @staticmethod
+    def _per_repo_cap(per_repo_commits: int) -> int:
+        """单仓库提交上限，与 REST 模式一致：每页 100 条，per_repo_commits / 100 页（至少 1 页）。"""
+        return 100 * max(1, int(per_repo_commits / 100))
+
+    @staticmethod
+    def _history_round(
+        pending: List[Tuple[str, str]],
+        history: Dict[str, Any],
+        results: Dict[Tuple[str, str], Optional[List[CommitRecord]]],
+        cursors: Dict[Tuple[str, str], Optional[str]],
+        cap: int,
+    ) -> List[Tuple[str, str]]:
+        """合并一轮批量 history 查询的结果，返回仍需翻页的仓库。
+
+        单个仓库的字段出错（别名为 null）时丢弃该仓库已取回的全部提交，与 REST 模式单仓库失败一致。
+        """
+        next_pending: List[Tuple[str, str]] = []
+        for i, target in enumerate(pending):
+            node = history.get(f"r{i}")
+            if node is None:
+                results[target] = None
+                continue
+            commits, cursor = github_graphql.history_page(node)
+            collected = results[target]
+            collected.extend(commits)
+            if cursor and len(collected) < cap:
+                cursors[target] = cursor
+                next_pending.append(target)
+        return next_pending
+
+    @classmethod
+    def _collect_targets(
+        cls,
+        targets: List[Tuple[str, str]],
+        results: Dict[Tuple[str, str], Optional[List[CommitRecord]]],
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """按 targets 顺序合并各仓库的提交；抓取失败（None）的仓库跳过。"""
+        timestamps: List[str] = []
+        recent_commits: List[Dict[str, Any]] = []
+        for owner, name in targets:
+            commits = results.get((owner, name))
+            if commits is not None:
+                cls._collect_commits(owner, name, commits, timestamps, recent_commits)
+        return timestamps, recent_commits
+
+    @classmethod
+    def _count_intervals(cls, timestamps: List[str]) -> int:
+        """与 modeling.fit_time_distribution 相同口径：排序后相邻间隔 > 0.01 天才计数。"""
+        points = sorted(t for t in (cls._parse_iso(ts) for ts in timestamps) if t is not None)
+        return sum(1 for a, b in zip(points, points[1:]) if b - a > 0.01 * 86400)
+
+    @staticmethod
+    def _collect_commits(
+        owner: str,
+        name: str,
+        commits: List[CommitRecord],
+        timestamps: List[str],
+        recent_commits: List[Dict[str, Any]],
+    ) -> None:
+        repo_name = f"{owner}/{name}"
+        for c in commits:
+            timestamps.append(c.date)
+            # 收集提交详情
+            recent_commits.append({
+                "message": c.message,
+                "repo_name": repo_name,
+                "date": c.date,
+                "url": c.url
+            })
+
+    @classmethod
+    def _finalize_activity(
+        cls,
+        timestamps: List[str],
+        recent_commits: List[Dict[str, Any]],
+        since_str: str,
+        now: datetime,
+        source: str = "repos",
+    ) -> Dict[str, Any]:
+        # 按时间倒序排序并取前 20 条（按解析后的时间比较，时区偏移不同的时间戳也能正确排序）
+        def moment(commit: Dict[str, Any]) -> float:
+            parsed = cls._parse_iso(commit["date"])
+            return parsed if parsed is not None else float("-inf")
+
+        recent_commits.sort(key=moment, reverse=True)
+        recent_commits = recent_commits[:20]
+
+        logger.info(f"提交活动获取完成: 共 {len(timestamps)} 条提交记录")
+        return {
+            "commit_times": timestamps,
+            "recent_commits": recent_commits,
+            "window_start": since_str,
+            "window_end": now.isoformat(),
+            "source": source,
+        }
+
+
+class GitHubClient(_GitHubClientBase):
+    """GitHub REST API 客户端封装。
+
+    环境变量：
+    - GITHUB_TOKEN: 可选的个人访问令牌，用于提升速率限制与授权访问。
+    - GITHUB_TOKENS: 可选的逗号分隔 Token 列表，启用多 Token 轮换（优先于 GITHUB_TOKEN）。
+
+    速率限制处理逻辑：
+    - 读取响应头 `X-RateLimit-Remaining` 与 `X-RateLimit-Reset`，交由 QuotaTracker 跟踪。
+    - 当剩余额度过低时，仅在 quota_deadline 内短暂等待；否则抛出 QuotaExhaustedError。
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = "https://api.github.com",
+        min_remaining: int = 2,
+        timeout: int = 60,  # 增加到60秒
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        fetch_mode: Optional[str] = None,
+        token_pool: Optional[TokenPool] = None,
+        quota_deadline: float = 10.0,
+        tokens: Optional[List[str]] = None,
+        commit_store: Optional[CommitStore] = None,
+        events_fast_path: Optional[bool] = None,
+        metrics: Optional[MetricsSink] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        commit_source: Optional[str] = None,
+        transport: Optional[BaseAdapter] = None,
+    ) -> None:
+        super().__init__(
+            token,
+            base_url,
+            min_remaining,
+            timeout,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            fetch_mode=fetch_mode,
+            token_pool=token_pool,
+            quota_deadline=quota_deadline,
+            tokens=tokens,
+            commit_store=commit_store,
+            events_fast_path=events_fast_path,
+            metrics=metrics,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            commit_source=commit_source,
+        )
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # 可替换的 requests 适配器（如 github_transport 的录制 / 回放），默认直连网络
+        if transport is not None:
+            self.session.mount("https://", transport)
+            self.session.mount("http://", transport)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _acquire_quota(self, resource: str) -> int:
+        # 仅在截止时间内短暂等待，不会像以前那样阻塞到额度重置
+        started = time.monotonic()
+        while True:
+            slot, wait = self._quota_wait(resource, started)
+            if wait <= 0:
+                return slot
+            time.sleep(wait)
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> requests.Response:
+        """发送请求：幂等 GET 在超时 / 连接错误 / 5xx / 限流响应时退避重试，熔断时快速失败。"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            probe = self.circuit_breaker.allow()
+            try:
+                resp = self._send(method, endpoint, params, json_body)
+            except TransientRequestError:
+                self.circuit_breaker.record(False, probe)
+                delay = self._retry_delay(method, attempt, started)
+                if delay is None:
+                    raise
+            except RateLimitedError:
+                # 该 Token 已被标记耗尽，重试时会换用其他 Token 或在截止时间内等待
+                self.circuit_breaker.release_probe(probe)
+                delay = self._retry_delay(method, attempt, started)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.circuit_breaker.release_probe(probe)
+                raise
+            else:
+                failed = resp.status_code in RETRYABLE_STATUS
+                self.circuit_breaker.record(not failed, probe)
+                if not failed:
+                    return resp
+                delay = self._retry_delay(method, attempt, started, self._retry_after(resp))
+                if delay is None:
+                    return resp
+            attempt += 1
+            logger.warning(f"GitHub API 请求失败，{delay:.1f} 秒后第 {attempt} 次重试: {method} {endpoint}")
+            time.sleep(delay)
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> requests.Response:
         url = f"{self.base_url}{endpoint}"
         logger.info(f"发送 GitHub API 请求: {method} {url}")
+        resource = resource_for_endpoint(endpoint)
+        slot = self._acquire_quota(resource)
+        cache_key = self._cache_key(method, url, params, slot)
+        cached = self.cache.get(cache_key) if cache_key else None
+        extra_headers = ResponseCache.conditional_headers(cached) if cached else None
+        extra_headers = {**self.token_pool.auth_headers(slot), **(extra_headers or {})}
+        started = time.perf_counter()
         try:
-            resp = self.session.request(method, url, params=params, timeout=self.timeout)
+            resp = self.session.request(
+                method, url, params=params, json=json_body, headers=extra_headers, timeout=self.timeout
+            )
             logger.info(f"GitHub API 响应: {resp.status_code} {url}")
+            self._record_request(endpoint, method, str(resp.status_code), started, resp.headers, len(resp.content))
         except requests.Timeout as exc:
+            self.token_pool.release(slot, resource)
+            self._record_request(endpoint, method, "error", started)
             logger.error(f"GitHub API 请求超时: {url} (timeout={self.timeout}s)")
-            raise RuntimeError(f"GitHub API 请求超时: {exc}")
+            raise TransientRequestError(f"GitHub API 请求超时: {exc}")
         except requests.ConnectionError as exc:
+            self.token_pool.release(slot, resource)
+            self._record_request(endpoint, method, "error", started)
             logger.error(f"GitHub API 连接错误: {url} - {exc}")
-            raise RuntimeError(f"GitHub API 连接失败: {exc}")
+            raise TransientRequestError(f"GitHub API 连接失败: {exc}")
         except requests.RequestException as exc:
+            self.token_pool.release(slot, resource)
+            self._record_request(endpoint, method, "error", started)
             logger.error(f"GitHub API 请求异常: {url} - {exc}")
-            raise RuntimeError(f"GitHub API 请求失败: {exc}")
-        
-        self._rate_limit_sleep(resp.headers)
-        if resp.status_code == 403 and "rate limit" in resp.text.lower():
-            logger.warning(f"检测到速率限制，等待重置: {url}")
-            self._rate_limit_sleep(resp.headers)
+            raise TransientRequestError(f"GitHub API 请求失败: {exc}")
+
+        if cached is not None and resp.status_code == 304:
+            logger.info(f"GitHub API 缓存命中 (304): {url}")
+            resp = self._cached_response(cached, resp)
+        elif cache_key is not None and resp.status_code == 200:
+            self.cache.put(cache_key, resp.headers, resp.content)
+
+        self.token_pool.update(slot, resource, resp.headers)
+        self._check_rate_limited(slot, resource, resp, url)
+        return resp
+
+    @staticmethod
+    def _cached_response(cached: Dict[str, Any], not_modified: requests.Response) -> requests.Response:
+        """用缓存正文构造 200 响应，响应头以 304 返回的最新值为准。"""
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = cached["body"]
+        resp.headers = CaseInsensitiveDict(ResponseCache.merged_headers(cached, not_modified.headers))
+        resp.url = not_modified.url
+        resp.request = not_modified.request
+        resp.encoding = "utf-8"
         return resp
 
+    def _fetch_page(
+        self, endpoint: str, params: Dict[str, Any], error_prefix: str
+    ) -> Tuple[List[Any], Any]:
+        resp = self._request("GET", endpoint, params=params)
+        if resp.status_code >= 400:
+            error_msg = f"{error_prefix}: {resp.status_code} {resp.text[:200]}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        batch = resp.json()
+        return (batch if isinstance(batch, list) else []), resp.headers
+
+    def _paginate(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        per_page: int,
+        max_pages: int,
+        error_prefix: str,
+        project: Callable[[List[Any]], List[Any]],
+        concurrent_pages: bool = True,
+    ) -> List[Any]:
+        """分页抓取并按页序拼接结果。
+
+        首页响应的 Link: rel="last" 给出总页数后，其余页并发抓取；
+        没有 Link 头或 concurrent_pages=False（调用方自身已在按仓库并发，
+        避免两层并发叠加）时顺序翻页。每页到达后立即经 project 投影。
+        """
+        def page_params(page: int) -> Dict[str, Any]:
+            return {**params, "per_page": per_page, "page": page}
+
+        batch, headers = self._fetch_page(endpoint, page_params(1), error_prefix)
+        pages = [project(batch)]
+        if len(batch) < per_page or max_pages <= 1:
+            return self._join_pages(endpoint, pages)
+
+        last = self._last_page(headers) if concurrent_pages else None
+        if last is not None:
+            rest = list(range(2, min(last, max_pages) + 1))
+            if rest:
+                logger.info(f"并发抓取剩余 {len(rest)} 页: {endpoint}")
+                with ThreadPoolExecutor(max_workers=self._fanout_width(len(rest))) as pool:
+                    pages.extend(pool.map(
+                        lambda page: project(self._fetch_page(endpoint, page_params(page), error_prefix)[0]),
+                        rest,
+                    ))
+            return self._join_pages(endpoint, pages)
+
+        # 没有 Link 头（或不并发翻页）：顺序翻页
+        page = 2
+        while page <= max_pages:
+            batch, _ = self._fetch_page(endpoint, page_params(page), error_prefix)
+            if not batch:
+                break
+            pages.append(project(batch))
+            if len(batch) < per_page:
+                break
+            page += 1
+        return self._join_pages(endpoint, pages)
+
+    # ------------------------------------------------------------------
+    # GraphQL 模式
+    # ------------------------------------------------------------------
+
+    def _graphql(
+        self, query: str, variables: Dict[str, Any], allow_partial: bool = False
+    ) -> Dict[str, Any]:
+        resp = self._request("POST", "/graphql", json_body={"query": query, "variables": variables})
+        return github_graphql.graphql_data(resp, allow_partial=allow_partial)
+
+    def _graphql_get_user(self, username: str) -> Dict[str, Any]:
+        data = self._graphql(github_graphql.USER_QUERY, {"login": username})
+        return github_graphql.user_from_graphql(github_graphql.require_user(data, username))
+
+    def _graphql_get_repos(self, username: str, per_page: int, max_pages: int) -> List[RepoRecord]:
+        repos: List[RepoRecord] = []
+        cursor: Optional[str] = None
+        for _ in range(max_pages):
+            data = self._graphql(
+                github_graphql.REPOS_QUERY,
+                {"login": username, "first": min(per_page, 100), "after": cursor},
+            )
+            batch, cursor = github_graphql.repos_page(data, username)
+            repos.extend(batch)
+            if cursor is None:
+                break
+        logger.info(f"仓库列表获取完成 (GraphQL): 共 {len(repos)} 个仓库")
+        return repos
+
+    def _graphql_commit_activity(
+        self, username: str, limit_repos: int, per_repo_commits: int
+    ) -> Dict[str, Any]:
+        now, since_str = self._activity_window()
+        data = self._graphql(
+            github_graphql.CONTRIBUTIONS_QUERY,
+            github_graphql.contributions_variables(username, now, limit_repos),
+        )
+        user = github_graphql.require_user(data, username)
+        targets = github_graphql.contribution_targets(user, limit_repos)
+        logger.info(f"开始处理 {len(targets)} 个仓库的提交记录 (GraphQL)")
+
+        # 每轮一次批量查询，仍有下一页的仓库按游标进入下一轮，直到达到单仓库上限
+        cap = self._per_repo_cap(per_repo_commits)
+        results: Dict[Tuple[str, str], Optional[List[CommitRecord]]] = {target: [] for target in targets}
+        cursors: Dict[Tuple[str, str], Optional[str]] = {}
+        pending = list(targets)
+        while pending:
+            query, variables = github_graphql.build_history_query(
+                [(owner, name, min(100, cap - len(results[(owner, name)])), cursors.get((owner, name)))
+                 for owner, name in pending],
+                user["id"],
+                since_str,
+            )
+            history = self._graphql(query, variables, allow_partial=True)
+            pending = self._history_round(pending, history, results, cursors, cap)
+
+        timestamps, recent_commits = self._collect_targets(targets, results)
+        return self._finalize_activity(timestamps, recent_commits, since_str, now, source="graphql")
+
+    @coalesce(_user_key)
     def get_user(self, username: str) -> Dict[str, Any]:
         logger.info(f"获取用户信息: {username}")
+        if self.fetch_mode == "graphql":
+            return self._graphql_get_user(username)
         resp = self._request("GET", f"/users/{username}")
         if resp.status_code >= 400:
             error_msg = f"获取用户信息失败: {resp.status_code} {resp.text[:200]}"
@@ -92,31 +838,131 @@ class GitHubClient:
         logger.info(f"用户信息获取成功: {user_data.get('login', 'unknown')}")
         return user_data
 
-    def get_repos(self, username: str, per_page: int = 100, max_pages: int = 10) -> List[Dict[str, Any]]:
+    @coalesce(_repos_key)
+    def get_repos(self, username: str, per_page: int = 100, max_pages: int = 10) -> List[RepoRecord]:
         logger.info(f"获取仓库列表: {username} (per_page={per_page}, max_pages={max_pages})")
-        repos: List[Dict[str, Any]] = []
-        page = 1
-        while page <= max_pages:
-            params = {"per_page": per_page, "page": page, "type": "owner"}
-            logger.info(f"获取仓库列表第 {page} 页")
-            resp = self._request("GET", f"/users/{username}/repos", params=params)
-            if resp.status_code >= 400:
-                error_msg = f"获取仓库列表失败: {resp.status_code} {resp.text[:200]}"
-                logger.error(error_msg)
-                raise RuntimeError(error_msg)
-            batch = resp.json()
-            if not isinstance(batch, list) or not batch:
-                logger.info(f"第 {page} 页无数据，停止分页")
-                break
-            repos.extend(batch)
-            logger.info(f"第 {page} 页获取到 {len(batch)} 个仓库，总计 {len(repos)} 个")
-            if len(batch) < per_page:
-                logger.info(f"第 {page} 页数据不足 {per_page}，已获取全部仓库")
-                break
-            page += 1
+        if self.fetch_mode == "graphql":
+            return self._graphql_get_repos(username, per_page, max_pages)
+        # 逐页投影为紧凑记录，原始 JSON 随本页释放
+        repos = self._paginate(
+            f"/users/{username}/repos",
+            {"type": "owner"},
+            per_page,
+            max_pages,
+            "获取仓库列表失败",
+            lambda batch: [r for r in (RepoRecord.from_json(item, username) for item in batch) if r],
+        )
         logger.info(f"仓库列表获取完成: 共 {len(repos)} 个仓库")
         return repos
 
+    def get_user_events(self, username: str, per_page: int = 100, max_pages: int = 3) -> List[Dict[str, Any]]:
+        """获取用户公开事件流（GitHub 最多保留最近 90 天、300 条）。"""
+        return self._paginate(
+            f"/users/{username}/events/public",
+            {},
+            per_page,
+            max_pages,
+            "获取公开事件失败",
+            lambda batch: batch,
+        )
+
+    def _search_page(self, query: str, page: int) -> Tuple[int, List[Tuple[str, str, CommitRecord]]]:
+        resp = self._request("GET", "/search/commits", params=self._search_params(query, page))
+        if resp.status_code >= 400:
+            error_msg = f"搜索提交失败: {resp.status_code} {resp.text[:200]}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        return self._search_items(resp.json())
+
+    def _search_window(
+        self,
+        username: str,
+        start: datetime,
+        end: Optional[datetime],
+        now: datetime,
+        found: List[Tuple[str, str, CommitRecord]],
+    ) -> None:
+        """抓取 [start, end] 内的提交追加到 found（新的时间片优先）。"""
+        query = self._search_query(username, start, end)
+        total, items = self._search_page(query, 1)
+        halves = self._search_split(total, start, end, now)
+        if halves is not None:
+            logger.info(f"提交搜索命中 {total} 条，超过上限，二分时间窗口: {query}")
+            for half_start, half_end in halves:
+                self._search_window(username, half_start, half_end, now, found)
+            return
+        found.extend(items)
+        for page in range(2, self._search_pages(total) + 1):
+            _, items = self._search_page(query, page)
+            if not items:
+                break
+            found.extend(items)
+
+    def _search_commit_activity(
+        self, username: str, since_str: str, now: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """search/commits 模式：一个分页流覆盖所有仓库（含组织仓库与 fork）。
+
+        搜索 API 有独立的额度（resource=search）。额度耗尽时如果已有结果则使用已获取部分，
+        否则返回 None，由调用方改为逐仓库抓取（消耗 core 额度）。
+        """
+        found: List[Tuple[str, str, CommitRecord]] = []
+        try:
+            self._search_window(username, datetime.fromisoformat(since_str), None, now, found)
+        except CircuitOpenError:
+            raise
+        except QuotaExhaustedError as e:
+            if not found:
+                logger.warning(f"搜索 API 额度不足，改为逐仓库抓取: {e}")
+                return None
+            logger.warning(f"搜索 API 额度不足，使用已获取的 {len(found)} 条提交")
+        except Exception as e:
+            logger.warning(f"搜索提交失败，改为逐仓库抓取: {e}")
+            return None
+        logger.info(f"提交搜索完成: {len(found)} 条结果")
+        return self._search_result(found, since_str, now)
+
+    def _events_activity(
+        self,
+        username: str,
+        since_str: str,
+        now: datetime,
+        limit_repos: int,
+        per_repo_commits: int,
+        concurrency: Optional[int],
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[Tuple[str, str], Optional[List[CommitRecord]]]]:
+        """事件流快速路径：只抓取事件流中本人推送过的仓库。
+
+        返回 (活动数据, 已抓取的各仓库提交)；间隔数不足时活动数据为 None，
+        已抓取的提交交给逐仓库抓取复用，不重复请求。
+        """
+        try:
+            events = self.get_user_events(username)
+        except (QuotaExhaustedError, CircuitOpenError):
+            raise
+        except Exception as e:
+            logger.warning(f"获取公开事件失败，改为逐仓库抓取: {e}")
+            return None, {}
+        try:
+            profile = self.get_user(username)
+        except (QuotaExhaustedError, CircuitOpenError):
+            raise
+        except Exception as e:
+            logger.warning(f"获取用户资料失败，仅按登录名识别提交作者: {e}")
+            profile = None
+        identities = self._author_identities(username, profile)
+        targets = self._active_repos_from_events(events, since_str, username, identities)[:limit_repos]
+        if not targets:
+            return None, {}
+        results = self._fetch_targets(username, targets, since_str, per_repo_commits, concurrency)
+        timestamps, recent_commits = self._collect_targets(targets, results)
+        intervals = self._count_intervals(timestamps)
+        if intervals < self.EVENTS_MIN_INTERVALS:
+            logger.info(f"事件流中的 {len(targets)} 个仓库仅有 {intervals} 个有效间隔，改为逐仓库抓取提交")
+            return None, results
+        logger.info(f"事件流快速路径: {len(targets)} 个仓库，{len(timestamps)} 条提交，{intervals} 个有效间隔")
+        return self._finalize_activity(timestamps, recent_commits, since_str, now, source="events"), results
+
     def get_commits(
         self,
         owner: str,
@@ -126,104 +972,723 @@ class GitHubClient:
         until: Optional[str] = None,
         per_page: int = 100,
         max_pages: int = 10,
-    ) -> List[Dict[str, Any]]:
-        commits: List[Dict[str, Any]] = []
-        page = 1
-        while page <= max_pages:
-            params: Dict[str, Any] = {"per_page": per_page, "page": page}
-            if author:
-                params["author"] = author
-            if since:
-                params["since"] = since
-            if until:
-                params["until"] = until
-            resp = self._request("GET", f"/repos/{owner}/{repo}/commits", params=params)
-            if resp.status_code >= 400:
-                raise RuntimeError(f"获取提交历史失败: {resp.status_code} {resp.text}")
-            batch = resp.json()
-            if not isinstance(batch, list) or not batch:
-                break
-            commits.extend(batch)
-            if len(batch) < per_page:
-                break
-            page += 1
-        return commits
+        concurrent_pages: bool = True,
+    ) -> List[CommitRecord]:
+        return self._paginate(
+            f"/repos/{owner}/{repo}/commits",
+            self._commit_params(author, since, until),
+            per_page,
+            max_pages,
+            "获取提交历史失败",
+            lambda batch: [c for c in (CommitRecord.from_json(item) for item in batch) if c],
+            concurrent_pages,
+        )
+
+    def _fetch_targets(
+        self,
+        username: str,
+        targets: List[Tuple[str, str]],
+        since_str: str,
+        per_repo_commits: int,
+        concurrency: Optional[int] = None,
+        prefetched: Optional[Dict[Tuple[str, str], Optional[List[CommitRecord]]]] = None,
+    ) -> Dict[Tuple[str, str], Optional[List[CommitRecord]]]:
+        """并发抓取各仓库窗口内的提交，返回 {(owner, name): 提交 | None}；prefetched 中已有的仓库不再请求。"""
+        results = dict(prefetched or {})
+        pending = [target for target in targets if target not in results]
+        if not pending:
+            return results
+        width = self._fanout_width(len(pending), concurrency)
+        logger.info(f"开始处理 {len(pending)} 个仓库的提交记录 (并发={width})")
+        with ThreadPoolExecutor(max_workers=width) as pool:
+            results.update(zip(pending, pool.map(
+                lambda t: self._fetch_repo_commits(username, t[0], t[1], since_str, per_repo_commits),
+                pending,
+            )))
+        return results
+
+    def _fetch_repo_commits(
+        self,
+        username: str,
+        owner: str,
+        name: str,
+        since_str: str,
+        per_repo_commits: int,
+    ) -> Optional[List[CommitRecord]]:
+        """抓取单个仓库窗口内的提交；失败时返回 None，不影响其他仓库。
+
+        配置了 commit_store 时只请求水位线之后的提交，并返回合并后的窗口内全部提交；
+        存储读写失败时回退为抓取整个窗口。
+        """
+        repo = f"{owner}/{name}"
+        try:
+            synced_at = datetime.now(timezone.utc)
+            fetch_since = (
+                self.commit_store.fetch_since(username, repo, since_str)
+                if self.commit_store is not None else since_str
+            )
+            max_pages = max(1, int(per_repo_commits / 100))
+            commits = self.get_commits(
+                owner,
+                name,
+                author=username,
+                since=fetch_since,
+                per_page=100,
+                max_pages=max_pages,
+                # 已在按仓库并发，仓库内顺序翻页，总并发不超过 fan-out 宽度
+                concurrent_pages=False,
+            )
+            logger.info(f"仓库 {repo} 获取到 {len(commits)} 条提交 (since={fetch_since})")
+            if self.commit_store is not None:
+                # 触及分页上限时可能还有更早的提交未取回，不推进水位线
+                merged = self.commit_store.merge(
+                    username, repo, commits, since_str, synced_at,
+                    complete=len(commits) < 100 * max_pages,
+                )
+                if merged is not None:
+                    return merged
+                if fetch_since != since_str:
+                    # 存储不可用时无法补全水位线之前的提交，改为抓取整个窗口
+                    commits = self.get_commits(
+                        owner, name, author=username, since=since_str, per_page=100,
+                        max_pages=max_pages, concurrent_pages=False,
+                    )
+            return commits
+        except (QuotaExhaustedError, CircuitOpenError):
+            # 额度耗尽 / 熔断不属于单仓库故障，交由上层快速失败
+            raise
+        except Exception as e:
+            logger.warning(f"获取仓库 {owner}/{name} 的提交失败: {e}")
+            return None
 
+    @coalesce(_activity_key)
     def get_user_commit_activity(
-        self, username: str, limit_repos: int = 20, per_repo_commits: int = 500
+        self,
+        username: str,
+        limit_repos: int = 20,
+        per_repo_commits: int = 500,
+        concurrency: Optional[int] = None,
+        repos: Optional[List[RepoRecord]] = None,
     ) -> Dict[str, Any]:
         """获取用户最近一年的提交活动时间戳。
 
         策略变更:
         - 采用 "Rolling 12 Months" 观测窗口。
         - limit_repos 和 per_repo_commits 仅作为兜底限制。
+        - 各仓库的提交并发抓取，并发宽度由 concurrency（默认 max_concurrency）
+          与当前剩余速率额度共同限制；结果按仓库原顺序合并。
+        - 调用方已获取过仓库列表时可通过 repos 传入，避免重复分页请求。
+        - 配置 commit_store 时按仓库增量同步：只请求水位线之后的提交，
+          与已存储的提交合并，窗口外的旧提交自动清理。
+        - commit_source="search" 时用 search/commits 一次覆盖所有仓库（含组织仓库与 fork），
+          超过 1000 条上限时二分时间窗口；搜索失败或额度不足时回退为逐仓库抓取。
+        - events_fast_path（默认开启，未配置搜索来源与 commit_store 时生效）先读取公开事件流，
+          选出本人最近推送过的仓库（含组织仓库），只对这些仓库用 commits API 抓取完整窗口内的提交；
+          有效间隔数达到 EVENTS_MIN_INTERVALS 时直接返回（source="events"），否则按仓库列表
+          逐仓库抓取，已抓取的仓库不再重复请求。提交时间始终是 commits API 返回的作者时间，
+          但 source="events" 时只覆盖事件流（最近约 90 天 / 300 条）中出现过的仓库。
+        - GraphQL 模式下由 contributionsCollection 选出窗口内有提交的仓库
+          （忽略 repos），再用批量 history 查询按游标翻页取回提交，单仓库上限与 REST 模式相同。
 
         返回:
         {
             "commit_times": [...],
+            "recent_commits": [...],
             "window_start": "...",
-            "window_end": "..."
+            "window_end": "...",
+            "source": "repos" | "search" | "events" | "graphql"
         }
         """
         logger.info(f"获取提交活动: {username} (limit_repos={limit_repos})")
+        if self.fetch_mode == "graphql":
+            return self._graphql_commit_activity(username, limit_repos, per_repo_commits)
         # 1. 计算时间窗口
-        now = datetime.now(timezone.utc)
-        since_date = now - timedelta(days=365)
-        since_str = since_date.isoformat()
+        now, since_str = self._activity_window()
 
-        # 2. 获取仓库列表
-        repos = self.get_repos(username, per_page=100, max_pages=5)
-        logger.info(f"开始处理 {min(len(repos), limit_repos)} 个仓库的提交记录")
-        
-        timestamps: List[str] = []
-        recent_commits: List[Dict[str, Any]] = []
-        
-        # 3. 遍历仓库 (limit_repos 作为兜底)
-        for idx, repo in enumerate(repos[:limit_repos], 1):
-            owner = repo.get("owner", {}).get("login", username)
-            name = repo.get("name")
-            if not name:
-                continue
-            
-            logger.info(f"处理仓库 {idx}/{min(len(repos), limit_repos)}: {owner}/{name}")
-            
-            # 4. 获取 Commit (使用 since 参数)
+        # 1.1 搜索 API：一次分页流覆盖所有仓库，不受 limit_repos 限制
+        if self.commit_source == "search":
+            searched = self._search_commit_activity(username, since_str, now)
+            if searched is not None:
+                return searched
+
+        # 1.2 事件流快速路径：只抓取最近推送过的仓库（配置了搜索来源或增量存储时不使用）
+        prefetched: Dict[Tuple[str, str], Optional[List[CommitRecord]]] = {}
+        if self.events_fast_path and self.commit_source == "repos" and self.commit_store is None:
+            fast, prefetched = self._events_activity(
+                username, since_str, now, limit_repos, per_repo_commits, concurrency
+            )
+            if fast is not None:
+                return fast
+
+        # 2. 获取仓库列表（调用方已提供则直接复用）
+        if repos is None:
+            repos = self.get_repos(username, per_page=100, max_pages=5)
+        targets = self._activity_targets(repos, username, limit_repos, since_str)
+
+        # 3. 并发抓取各仓库 Commit (使用 since 参数)，快速路径已抓取的仓库直接复用
+        results = self._fetch_targets(username, targets, since_str, per_repo_commits, concurrency, prefetched)
+
+        # 4. 按仓库顺序合并
+        timestamps, recent_commits = self._collect_targets(targets, results)
+        return self._finalize_activity(timestamps, recent_commits, since_str, now)
+
+
+class AsyncGitHubClient(_GitHubClientBase):
+    """基于 httpx 连接池的异步 GitHub REST API 客户端。
+
+    接口与 `GitHubClient` 保持一致（get_user / get_repos / get_commits /
+    get_user_commit_activity），但所有方法均为协程，供 FastAPI 的
+    `async def` 接口直接 await，避免慢请求阻塞 uvicorn 事件循环。
+
+    连接池：
+    - 底层 `httpx.AsyncClient` 在首次请求时懒加载，复用 keep-alive 连接。
+    - max_connections / max_keepalive_connections 控制单个 worker 的并发上限。
+    - 服务关闭时调用 `aclose()` 释放连接。
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = "https://api.github.com",
+        min_remaining: int = 2,
+        timeout: int = 60,
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        fetch_mode: Optional[str] = None,
+        token_pool: Optional[TokenPool] = None,
+        quota_deadline: float = 10.0,
+        tokens: Optional[List[str]] = None,
+        commit_store: Optional[CommitStore] = None,
+        events_fast_path: Optional[bool] = None,
+        metrics: Optional[MetricsSink] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        commit_source: Optional[str] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        super().__init__(
+            token,
+            base_url,
+            min_remaining,
+            timeout,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            fetch_mode=fetch_mode,
+            token_pool=token_pool,
+            quota_deadline=quota_deadline,
+            tokens=tokens,
+            commit_store=commit_store,
+            events_fast_path=events_fast_path,
+            metrics=metrics,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            commit_source=commit_source,
+        )
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        # 可替换的 httpx 传输层（如 github_transport 的录制 / 回放），默认直连网络
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def _acquire_quota(self, resource: str) -> int:
+        # 等待期间让出事件循环；超过截止时间直接失败
+        started = time.monotonic()
+        while True:
+            slot, wait = self._quota_wait(resource, started)
+            if wait <= 0:
+                return slot
+            await asyncio.sleep(wait)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> httpx.Response:
+        """发送请求：幂等 GET 在超时 / 连接错误 / 5xx / 限流响应时退避重试，熔断时快速失败。"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            probe = self.circuit_breaker.allow()
+            try:
+                resp = await self._send(method, endpoint, params, json_body)
+            except TransientRequestError:
+                self.circuit_breaker.record(False, probe)
+                delay = self._retry_delay(method, attempt, started)
+                if delay is None:
+                    raise
+            except RateLimitedError:
+                # 该 Token 已被标记耗尽，重试时会换用其他 Token 或在截止时间内等待
+                self.circuit_breaker.release_probe(probe)
+                delay = self._retry_delay(method, attempt, started)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.circuit_breaker.release_probe(probe)
+                raise
+            else:
+                failed = resp.status_code in RETRYABLE_STATUS
+                self.circuit_breaker.record(not failed, probe)
+                if not failed:
+                    return resp
+                delay = self._retry_delay(method, attempt, started, self._retry_after(resp))
+                if delay is None:
+                    return resp
+            attempt += 1
+            logger.warning(f"GitHub API 请求失败，{delay:.1f} 秒后第 {attempt} 次重试: {method} {endpoint}")
+            await asyncio.sleep(delay)
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> httpx.Response:
+        url = f"{self.base_url}{endpoint}"
+        logger.info(f"发送 GitHub API 请求: {method} {url}")
+        resource = resource_for_endpoint(endpoint)
+        slot = await self._acquire_quota(resource)
+        cache_key = self._cache_key(method, url, params, slot)
+        # SQLite 读写放到线程中执行，避免阻塞事件循环
+        cached = await asyncio.to_thread(self.cache.get, cache_key) if cache_key else None
+        extra_headers = ResponseCache.conditional_headers(cached) if cached else None
+        extra_headers = {**self.token_pool.auth_headers(slot), **(extra_headers or {})}
+        started = time.perf_counter()
+        try:
+            resp = await self._get_client().request(
+                method, url, params=params, json=json_body, headers=extra_headers
+            )
+            logger.info(f"GitHub API 响应: {resp.status_code} {url}")
+            self._record_request(endpoint, method, str(resp.status_code), started, resp.headers, len(resp.content))
+        except httpx.TimeoutException as exc:
+            self.token_pool.release(slot, resource)
+            self._record_request(endpoint, method, "error", started)
+            logger.error(f"GitHub API 请求超时: {url} (timeout={self.timeout}s)")
+            raise TransientRequestError(f"GitHub API 请求超时: {exc}")
+        except httpx.TransportError as exc:
+            self.token_pool.release(slot, resource)
+            self._record_request(endpoint, method, "error", started)
+            logger.error(f"GitHub API 连接错误: {url} - {exc}")
+            raise TransientRequestError(f"GitHub API 连接失败: {exc}")
+        except httpx.HTTPError as exc:
+            self.token_pool.release(slot, resource)
+            self._record_request(endpoint, method, "error", started)
+            logger.error(f"GitHub API 请求异常: {url} - {exc}")
+            raise TransientRequestError(f"GitHub API 请求失败: {exc}")
+
+        if cached is not None and resp.status_code == 304:
+            logger.info(f"GitHub API 缓存命中 (304): {url}")
+            resp = httpx.Response(
+                200,
+                headers=ResponseCache.merged_headers(cached, resp.headers),
+                content=cached["body"],
+                request=resp.request,
+            )
+        elif cache_key is not None and resp.status_code == 200:
+            await asyncio.to_thread(self.cache.put, cache_key, resp.headers, resp.content)
+
+        self.token_pool.update(slot, resource, resp.headers)
+        self._check_rate_limited(slot, resource, resp, url)
+        return resp
+
+    async def _fetch_page(
+        self, endpoint: str, params: Dict[str, Any], error_prefix: str
+    ) -> Tuple[List[Any], Any]:
+        resp = await self._request("GET", endpoint, params=params)
+        if resp.status_code >= 400:
+            error_msg = f"{error_prefix}: {resp.status_code} {resp.text[:200]}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        batch = resp.json()
+        return (batch if isinstance(batch, list) else []), resp.headers
+
+    async def _paginate(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        per_page: int,
+        max_pages: int,
+        error_prefix: str,
+        project: Callable[[List[Any]], List[Any]],
+        concurrent_pages: bool = True,
+    ) -> List[Any]:
+        """分页抓取并按页序拼接结果（Link 头给出总页数后并发抓取其余页，concurrent_pages=False 时顺序翻页）。"""
+        def page_params(page: int) -> Dict[str, Any]:
+            return {**params, "per_page": per_page, "page": page}
+
+        batch, headers = await self._fetch_page(endpoint, page_params(1), error_prefix)
+        pages = [project(batch)]
+        if len(batch) < per_page or max_pages <= 1:
+            return self._join_pages(endpoint, pages)
+
+        last = self._last_page(headers) if concurrent_pages else None
+        if last is not None:
+            rest = list(range(2, min(last, max_pages) + 1))
+            if rest:
+                logger.info(f"并发抓取剩余 {len(rest)} 页: {endpoint}")
+                semaphore = asyncio.Semaphore(self._fanout_width(len(rest)))
+
+                async def fetch(page: int) -> List[Any]:
+                    async with semaphore:
+                        batch, _ = await self._fetch_page(endpoint, page_params(page), error_prefix)
+                        return project(batch)
+
+                pages.extend(await asyncio.gather(*(fetch(page) for page in rest)))
+            return self._join_pages(endpoint, pages)
+
+        # 没有 Link 头（或不并发翻页）：顺序翻页
+        page = 2
+        while page <= max_pages:
+            batch, _ = await self._fetch_page(endpoint, page_params(page), error_prefix)
+            if not batch:
+                break
+            pages.append(project(batch))
+            if len(batch) < per_page:
+                break
+            page += 1
+        return self._join_pages(endpoint, pages)
+
+    # ------------------------------------------------------------------
+    # GraphQL 模式
+    # ------------------------------------------------------------------
+
+    async def _graphql(
+        self, query: str, variables: Dict[str, Any], allow_partial: bool = False
+    ) -> Dict[str, Any]:
+        resp = await self._request("POST", "/graphql", json_body={"query": query, "variables": variables})
+        return github_graphql.graphql_data(resp, allow_partial=allow_partial)
+
+    async def _graphql_get_user(self, username: str) -> Dict[str, Any]:
+        data = await self._graphql(github_graphql.USER_QUERY, {"login": username})
+        return github_graphql.user_from_graphql(github_graphql.require_user(data, username))
+
+    async def _graphql_get_repos(self, username: str, per_page: int, max_pages: int) -> List[RepoRecord]:
+        repos: List[RepoRecord] = []
+        cursor: Optional[str] = None
+        for _ in range(max_pages):
+            data = await self._graphql(
+                github_graphql.REPOS_QUERY,
+                {"login": username, "first": min(per_page, 100), "after": cursor},
+            )
+            batch, cursor = github_graphql.repos_page(data, username)
+            repos.extend(batch)
+            if cursor is None:
+                break
+        logger.info(f"仓库列表获取完成 (GraphQL): 共 {len(repos)} 个仓库")
+        return repos
+
+    async def _graphql_commit_activity(
+        self, username: str, limit_repos: int, per_repo_commits: int
+    ) -> Dict[str, Any]:
+        now, since_str = self._activity_window()
+        data = await self._graphql(
+            github_graphql.CONTRIBUTIONS_QUERY,
+            github_graphql.contributions_variables(username, now, limit_repos),
+        )
+        user = github_graphql.require_user(data, username)
+        targets = github_graphql.contribution_targets(user, limit_repos)
+        logger.info(f"开始处理 {len(targets)} 个仓库的提交记录 (GraphQL)")
+
+        # 每轮一次批量查询，仍有下一页的仓库按游标进入下一轮，直到达到单仓库上限
+        cap = self._per_repo_cap(per_repo_commits)
+        results: Dict[Tuple[str, str], Optional[List[CommitRecord]]] = {target: [] for target in targets}
+        cursors: Dict[Tuple[str, str], Optional[str]] = {}
+        pending = list(targets)
+        while pending:
+            query, variables = github_graphql.build_history_query(
+                [(owner, name, min(100, cap - len(results[(owner, name)])), cursors.get((owner, name)))
+                 for owner, name in pending],
+                user["id"],
+                since_str,
+            )
+            history = await self._graphql(query, variables, allow_partial=True)
+            pending = self._history_round(pending, history, results, cursors, cap)
+
+        timestamps, recent_commits = self._collect_targets(targets, results)
+        return self._finalize_activity(timestamps, recent_commits, since_str, now, source="graphql")
+
+    @coalesce(_user_key)
+    async def get_user(self, username: str) -> Dict[str, Any]:
+        logger.info(f"获取用户信息: {username}")
+        if self.fetch_mode == "graphql":
+            return await self._graphql_get_user(username)
+        resp = await self._request("GET", f"/users/{username}")
+        if resp.status_code >= 400:
+            error_msg = f"获取用户信息失败: {resp.status_code} {resp.text[:200]}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        user_data = resp.json()
+        logger.info(f"用户信息获取成功: {user_data.get('login', 'unknown')}")
+        return user_data
+
+    @coalesce(_repos_key)
+    async def get_repos(self, username: str, per_page: int = 100, max_pages: int = 10) -> List[RepoRecord]:
+        logger.info(f"获取仓库列表: {username} (per_page={per_page}, max_pages={max_pages})")
+        if self.fetch_mode == "graphql":
+            return await self._graphql_get_repos(username, per_page, max_pages)
+        # 逐页投影为紧凑记录，原始 JSON 随本页释放
+        repos = await self._paginate(
+            f"/users/{username}/repos",
+            {"type": "owner"},
+            per_page,
+            max_pages,
+            "获取仓库列表失败",
+            lambda batch: [r for r in (RepoRecord.from_json(item, username) for item in batch) if r],
+        )
+        logger.info(f"仓库列表获取完成: 共 {len(repos)} 个仓库")
+        return repos
+
+    async def get_user_events(self, username: str, per_page: int = 100, max_pages: int = 3) -> List[Dict[str, Any]]:
+        """获取用户公开事件流（GitHub 最多保留最近 90 天、300 条）。"""
+        return await self._paginate(
+            f"/users/{username}/events/public",
+            {},
+            per_page,
+            max_pages,
+            "获取公开事件失败",
+            lambda batch: batch,
+        )
+
+    async def _search_page(self, query: str, page: int) -> Tuple[int, List[Tuple[str, str, CommitRecord]]]:
+        resp = await self._request("GET", "/search/commits", params=self._search_params(query, page))
+        if resp.status_code >= 400:
+            error_msg = f"搜索提交失败: {resp.status_code} {resp.text[:200]}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        return self._search_items(resp.json())
+
+    async def _search_window(
+        self,
+        username: str,
+        start: datetime,
+        end: Optional[datetime],
+        now: datetime,
+        found: List[Tuple[str, str, CommitRecord]],
+    ) -> None:
+        """抓取 [start, end] 内的提交追加到 found（新的时间片优先）。"""
+        query = self._search_query(username, start, end)
+        total, items = await self._search_page(query, 1)
+        halves = self._search_split(total, start, end, now)
+        if halves is not None:
+            logger.info(f"提交搜索命中 {total} 条，超过上限，二分时间窗口: {query}")
+            for half_start, half_end in halves:
+                await self._search_window(username, half_start, half_end, now, found)
+            return
+        found.extend(items)
+        for page in range(2, self._search_pages(total) + 1):
+            _, items = await self._search_page(query, page)
+            if not items:
+                break
+            found.extend(items)
+
+    async def _search_commit_activity(
+        self, username: str, since_str: str, now: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """search/commits 模式：一个分页流覆盖所有仓库（含组织仓库与 fork）。
+
+        搜索 API 有独立的额度（resource=search）。额度耗尽时如果已有结果则使用已获取部分，
+        否则返回 None，由调用方改为逐仓库抓取（消耗 core 额度）。
+        """
+        found: List[Tuple[str, str, CommitRecord]] = []
+        try:
+            await self._search_window(username, datetime.fromisoformat(since_str), None, now, found)
+        except CircuitOpenError:
+            raise
+        except QuotaExhaustedError as e:
+            if not found:
+                logger.warning(f"搜索 API 额度不足，改为逐仓库抓取: {e}")
+                return None
+            logger.warning(f"搜索 API 额度不足，使用已获取的 {len(found)} 条提交")
+        except Exception as e:
+            logger.warning(f"搜索提交失败，改为逐仓库抓取: {e}")
+            return None
+        logger.info(f"提交搜索完成: {len(found)} 条结果")
+        return self._search_result(found, since_str, now)
+
+    async def _events_activity(
+        self,
+        username: str,
+        since_str: str,
+        now: datetime,
+        limit_repos: int,
+        per_repo_commits: int,
+        concurrency: Optional[int],
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[Tuple[str, str], Optional[List[CommitRecord]]]]:
+        """事件流快速路径（异步版本，语义同 GitHubClient._events_activity）。"""
+        try:
+            events = await self.get_user_events(username)
+        except (QuotaExhaustedError, CircuitOpenError):
+            raise
+        except Exception as e:
+            logger.warning(f"获取公开事件失败，改为逐仓库抓取: {e}")
+            return None, {}
+        try:
+            profile = await self.get_user(username)
+        except (QuotaExhaustedError, CircuitOpenError):
+            raise
+        except Exception as e:
+            logger.warning(f"获取用户资料失败，仅按登录名识别提交作者: {e}")
+            profile = None
+        identities = self._author_identities(username, profile)
+        targets = self._active_repos_from_events(events, since_str, username, identities)[:limit_repos]
+        if not targets:
+            return None, {}
+        results = await self._fetch_targets(username, targets, since_str, per_repo_commits, concurrency)
+        timestamps, recent_commits = self._collect_targets(targets, results)
+        intervals = self._count_intervals(timestamps)
+        if intervals < self.EVENTS_MIN_INTERVALS:
+            logger.info(f"事件流中的 {len(targets)} 个仓库仅有 {intervals} 个有效间隔，改为逐仓库抓取提交")
+            return None, results
+        logger.info(f"事件流快速路径: {len(targets)} 个仓库，{len(timestamps)} 条提交，{intervals} 个有效间隔")
+        return self._finalize_activity(timestamps, recent_commits, since_str, now, source="events"), results
+
+    async def get_commits(
+        self,
+        owner: str,
+        repo: str,
+        author: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        per_page: int = 100,
+        max_pages: int = 10,
+        concurrent_pages: bool = True,
+    ) -> List[CommitRecord]:
+        return await self._paginate(
+            f"/repos/{owner}/{repo}/commits",
+            self._commit_params(author, since, until),
+            per_page,
+            max_pages,
+            "获取提交历史失败",
+            lambda batch: [c for c in (CommitRecord.from_json(item) for item in batch) if c],
+            concurrent_pages,
+        )
+
+    async def _fetch_targets(
+        self,
+        username: str,
+        targets: List[Tuple[str, str]],
+        since_str: str,
+        per_repo_commits: int,
+        concurrency: Optional[int] = None,
+        prefetched: Optional[Dict[Tuple[str, str], Optional[List[CommitRecord]]]] = None,
+    ) -> Dict[Tuple[str, str], Optional[List[CommitRecord]]]:
+        """并发抓取各仓库窗口内的提交，返回 {(owner, name): 提交 | None}；prefetched 中已有的仓库不再请求。"""
+        results = dict(prefetched or {})
+        pending = [target for target in targets if target not in results]
+        if not pending:
+            return results
+        width = self._fanout_width(len(pending), concurrency)
+        logger.info(f"开始处理 {len(pending)} 个仓库的提交记录 (并发={width})")
+        semaphore = asyncio.Semaphore(width)
+        results.update(zip(pending, await asyncio.gather(*(
+            self._fetch_repo_commits(username, owner, name, since_str, per_repo_commits, semaphore)
+            for owner, name in pending
+        ))))
+        return results
+
+    async def _fetch_repo_commits(
+        self,
+        username: str,
+        owner: str,
+        name: str,
+        since_str: str,
+        per_repo_commits: int,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[List[CommitRecord]]:
+        """抓取单个仓库窗口内的提交；失败时返回 None，不影响其他仓库。"""
+        repo = f"{owner}/{name}"
+        async with semaphore:
             try:
-                commits = self.get_commits(
-                    owner, 
-                    name, 
+                synced_at = datetime.now(timezone.utc)
+                fetch_since = (
+                    await asyncio.to_thread(self.commit_store.fetch_since, username, repo, since_str)
+                    if self.commit_store is not None else since_str
+                )
+                max_pages = max(1, int(per_repo_commits / 100))
+                commits = await self.get_commits(
+                    owner,
+                    name,
                     author=username,
-                    since=since_str, 
-                    per_page=100, 
-                    max_pages=max(1, int(per_repo_commits / 100))
+                    since=fetch_since,
+                    per_page=100,
+                    max_pages=max_pages,
+                    # 已在按仓库并发，仓库内顺序翻页，总并发不超过 fan-out 宽度
+                    concurrent_pages=False,
                 )
-                logger.info(f"仓库 {owner}/{name} 获取到 {len(commits)} 条提交")
-                for c in commits:
-                    try:
-                        ts = c["commit"]["author"]["date"]
-                        if isinstance(ts, str):
-                            timestamps.append(ts)
-                            # 收集提交详情
-                            recent_commits.append({
-                                "message": c["commit"]["message"],
-                                "repo_name": f"{owner}/{name}",
-                                "date": ts,
-                                "url": c["html_url"]
-                            })
-                    except Exception:
-                        continue
+                logger.info(f"仓库 {repo} 获取到 {len(commits)} 条提交 (since={fetch_since})")
+                if self.commit_store is not None:
+                    merged = await asyncio.to_thread(
+                        self.commit_store.merge, username, repo, commits, since_str, synced_at,
+                        len(commits) < 100 * max_pages,
+                    )
+                    if merged is not None:
+                        return merged
+                    if fetch_since != since_str:
+                        commits = await self.get_commits(
+                            owner, name, author=username, since=since_str, per_page=100,
+                            max_pages=max_pages, concurrent_pages=False,
+                        )
+                return commits
+            except (QuotaExhaustedError, CircuitOpenError):
+                raise
             except Exception as e:
                 logger.warning(f"获取仓库 {owner}/{name} 的提交失败: {e}")
-                continue
-        
-        # 按时间倒序排序并取前 20 条
-        recent_commits.sort(key=lambda x: x["date"], reverse=True)
-        recent_commits = recent_commits[:20]
+                return None
 
-        logger.info(f"提交活动获取完成: 共 {len(timestamps)} 条提交记录")
-        return {
-            "commit_times": timestamps,
-            "recent_commits": recent_commits,
-            "window_start": since_str,
-            "window_end": now.isoformat()
-        }
+    @coalesce(_activity_key)
+    async def get_user_commit_activity(
+        self,
+        username: str,
+        limit_repos: int = 20,
+        per_repo_commits: int = 500,
+        concurrency: Optional[int] = None,
+        repos: Optional[List[RepoRecord]] = None,
+    ) -> Dict[str, Any]:
+        """获取用户最近一年的提交活动时间戳（异步版本，返回结构同 GitHubClient）。"""
+        logger.info(f"获取提交活动: {username} (limit_repos={limit_repos})")
+        if self.fetch_mode == "graphql":
+            return await self._graphql_commit_activity(username, limit_repos, per_repo_commits)
+        now, since_str = self._activity_window()
+
+        # 1.1 搜索 API：一次分页流覆盖所有仓库，不受 limit_repos 限制
+        if self.commit_source == "search":
+            searched = await self._search_commit_activity(username, since_str, now)
+            if searched is not None:
+                return searched
+
+        # 1.2 事件流快速路径：只抓取最近推送过的仓库（配置了搜索来源或增量存储时不使用）
+        prefetched: Dict[Tuple[str, str], Optional[List[CommitRecord]]] = {}
+        if self.events_fast_path and self.commit_source == "repos" and self.commit_store is None:
+            fast, prefetched = await self._events_activity(
+                username, since_str, now, limit_repos, per_repo_commits, concurrency
+            )
+            if fast is not None:
+                return fast
+
+        if repos is None:
+            repos = await self.get_repos(username, per_page=100, max_pages=5)
+        targets = self._activity_targets(repos, username, limit_repos, since_str)
+        results = await self._fetch_targets(username, targets, since_str, per_repo_commits, concurrency, prefetched)
+        timestamps, recent_commits = self._collect_targets(targets, results)
+        return self._finalize_activity(timestamps, recent_commits, since_str, now)
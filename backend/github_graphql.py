@@ -0,0 +1,218 @@
+"""
+GitHub GraphQL 查询与结果映射
+
+GraphQL 模式下，`GitHubClient` 用少量查询代替 REST 的多次分页请求：
+- 用户信息：1 次查询
+- 仓库列表：每页 100 个（含语言与 topics）
+- 提交活动：1 次 contributionsCollection 查询选出窗口内有提交的仓库，
+  再用带别名的批量 history 查询取回各仓库的提交（每轮每个仓库 100 条，
+  仍有下一页的仓库按 endCursor 进入下一轮，直到达到与 REST 模式相同的单仓库上限）
+
+本模块只负责查询文本与结果映射：用户信息映射为 REST 字典结构，
+仓库与提交映射为与 REST 投影相同的 RepoRecord / CommitRecord，
+保证 main.py 读取的字段在两种模式下完全一致。
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from github_records import RepoRecord, CommitRecord
+
+
+USER_QUERY = """
+query($login: String!) {
+  user(login: $login) {
+    login
+    name
+    bio
+    avatarUrl
+    company
+    location
+    createdAt
+    followers { totalCount }
+    following { totalCount }
+    repositories(ownerAffiliations: OWNER, privacy: PUBLIC) { totalCount }
+  }
+}
+"""
+
+REPOS_QUERY = """
+query($login: String!, $first: Int!, $after: String) {
+  user(login: $login) {
+    repositories(
+      first: $first
+      after: $after
+      ownerAffiliations: OWNER
+      privacy: PUBLIC
+      orderBy: {field: NAME, direction: ASC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        pushedAt
+        owner { login }
+        primaryLanguage { name }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+      }
+    }
+  }
+}
+"""
+
+CONTRIBUTIONS_QUERY = """
+query($login: String!, $from: DateTime!, $to: DateTime!, $maxRepos: Int!) {
+  user(login: $login) {
+    id
+    contributionsCollection(from: $from, to: $to) {
+      commitContributionsByRepository(maxRepositories: $maxRepos) {
+        repository { name owner { login } }
+      }
+    }
+  }
+}
+"""
+
+_HISTORY_FRAGMENT = """
+  r{i}: repository(owner: $o{i}, name: $n{i}) {{
+    defaultBranchRef {{
+      target {{
+        ... on Commit {{
+          history(first: $f{i}, after: $a{i}, since: $since, author: {{id: $uid}}) {{
+            pageInfo {{ hasNextPage endCursor }}
+            nodes {{ authoredDate message url }}
+          }}
+        }}
+      }}
+    }}
+  }}"""
+
+
+def graphql_data(resp: Any, allow_partial: bool = False) -> Dict[str, Any]:
+    """解析 GraphQL 响应，返回 data 字段。
+
+    - HTTP 错误或无 data 时抛出 RuntimeError；
+    - NOT_FOUND 错误在消息中带上 404，便于 main.py 映射为 404；
+    - allow_partial=True 时，只要 data 存在就忽略单个字段的错误（单仓库失败不影响整体）。
+    """
+    if resp.status_code >= 400:
+        raise RuntimeError(f"GitHub GraphQL 请求失败: {resp.status_code} {resp.text[:200]}")
+    payload = resp.json()
+    errors = payload.get("errors") or []
+    data = payload.get("data")
+    if errors and (data is None or not allow_partial):
+        if any(e.get("type") == "NOT_FOUND" for e in errors):
+            raise RuntimeError(f"GitHub GraphQL 请求失败: 404 {errors[0].get('message', '')}")
+        raise RuntimeError(f"GitHub GraphQL 请求失败: {errors[0].get('message', errors[0])}")
+    if data is None:
+        raise RuntimeError("GitHub GraphQL 请求失败: 响应缺少 data 字段")
+    return data
+
+
+def require_user(data: Dict[str, Any], username: str) -> Dict[str, Any]:
+    user = data.get("user")
+    if user is None:
+        raise RuntimeError(f"获取用户信息失败: 404 用户 {username} 不存在")
+    return user
+
+
+def user_from_graphql(node: Dict[str, Any]) -> Dict[str, Any]:
+    """GraphQL User 节点 → REST /users/{username} 结构。"""
+    return {
+        "login": node.get("login"),
+        "name": node.get("name"),
+        "bio": node.get("bio"),
+        "avatar_url": node.get("avatarUrl"),
+        "company": node.get("company"),
+        "location": node.get("location"),
+        "created_at": node.get("createdAt"),
+        "followers": (node.get("followers") or {}).get("totalCount", 0),
+        "following": (node.get("following") or {}).get("totalCount", 0),
+        "public_repos": (node.get("repositories") or {}).get("totalCount", 0),
+    }
+
+
+def repo_from_graphql(node: Dict[str, Any]) -> Optional[RepoRecord]:
+    """GraphQL Repository 节点 → 与 REST 投影一致的 RepoRecord。"""
+    name = node.get("name")
+    if not name:
+        return None
+    language = node.get("primaryLanguage") or {}
+    topics = tuple(
+        t["topic"]["name"]
+        for t in (node.get("repositoryTopics") or {}).get("nodes", [])
+        if t and t.get("topic")
+    )
+    return RepoRecord(
+        owner=(node.get("owner") or {}).get("login", ""),
+        name=name,
+        language=language.get("name"),
+        topics=topics,
+        pushed_at=node.get("pushedAt"),
+    )
+
+
+def repos_page(data: Dict[str, Any], username: str) -> Tuple[List[RepoRecord], Optional[str]]:
+    """返回 (本页仓库列表, 下一页游标或 None)。"""
+    conn = require_user(data, username).get("repositories") or {}
+    repos = [r for r in (repo_from_graphql(n) for n in conn.get("nodes") or [] if n) if r]
+    page_info = conn.get("pageInfo") or {}
+    cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    return repos, cursor
+
+
+def contributions_variables(username: str, now: datetime, limit_repos: int) -> Dict[str, Any]:
+    # contributionsCollection 的时间跨度不能超过一年
+    return {
+        "login": username,
+        "from": (now - timedelta(days=365)).isoformat(),
+        "to": now.isoformat(),
+        "maxRepos": max(1, min(100, limit_repos)),
+    }
+
+
+def contribution_targets(user: Dict[str, Any], limit_repos: int) -> List[Tuple[str, str]]:
+    """从 commitContributionsByRepository 中取出 (owner, name)，含组织仓库与 fork。"""
+    collection = user.get("contributionsCollection") or {}
+    targets: List[Tuple[str, str]] = []
+    for item in collection.get("commitContributionsByRepository") or []:
+        repo = (item or {}).get("repository") or {}
+        owner = (repo.get("owner") or {}).get("login")
+        name = repo.get("name")
+        if owner and name:
+            targets.append((owner, name))
+    return targets[:limit_repos]
+
+
+def build_history_query(
+    targets: List[Tuple[str, str, int, Optional[str]]], user_id: str, since: str
+) -> Tuple[str, Dict[str, Any]]:
+    """构造一次性拉取多个仓库提交历史的别名查询（r0, r1, ...）。
+
+    targets 中每项为 (owner, name, 本轮条数, 游标)，游标为 None 表示从第一页开始。
+    """
+    params = ["$uid: ID!", "$since: GitTimestamp!"]
+    variables: Dict[str, Any] = {"uid": user_id, "since": since}
+    fields = []
+    for i, (owner, name, first, after) in enumerate(targets):
+        params.extend([f"$o{i}: String!", f"$n{i}: String!", f"$f{i}: Int!", f"$a{i}: String"])
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+        variables[f"f{i}"] = first
+        variables[f"a{i}"] = after
+        fields.append(_HISTORY_FRAGMENT.format(i=i))
+    query = "query(" + ", ".join(params) + ") {" + "".join(fields) + "\n}"
+    return query, variables
+
+
+def history_page(node: Optional[Dict[str, Any]]) -> Tuple[List[CommitRecord], Optional[str]]:
+    """别名仓库节点 → (与 REST 投影一致的 CommitRecord 列表, 下一页游标或 None)。"""
+    target = (((node or {}).get("defaultBranchRef") or {}).get("target")) or {}
+    history = target.get("history") or {}
+    commits = []
+    for c in history.get("nodes") or []:
+        if not c or not isinstance(c.get("authoredDate"), str):
+            continue
+        commits.append(CommitRecord(date=c["authoredDate"], message=c.get("message", ""), url=c.get("url") or ""))
+    page_info = history.get("pageInfo") or {}
+    cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    return commits, cursor
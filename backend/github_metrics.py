@@ -0,0 +1,164 @@
+"""
+GitHub 客户端指标
+
+`GitHubClient._request` 以前只有 `logger.info` 日志，无法看出分析耗时花在哪里。
+客户端在每次请求后把以下数据交给指标接收器（`MetricsSink`）：
+- 按接口模板（如 `/users/{u}/repos`、`/repos/{o}/{r}/commits`）统计的延迟直方图；
+- 按状态码统计的请求数（网络异常记为 `error`）；
+- 接收字节数；
+- 每次分页调用抓取的页数；
+- 最近一次响应头中的 `X-RateLimit-Remaining`（按资源类型）。
+
+`MetricsSink` 本身不做任何事，可替换为对接其他监控系统的实现；
+`PrometheusMetrics` 在内存中聚合，并输出 Prometheus 文本格式供 `/metrics` 使用。
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 接口路径 → 模板，避免用户名 / 仓库名进入指标标签
+_TEMPLATES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"^/users/[^/]+$"), "/users/{u}"),
+    (re.compile(r"^/users/[^/]+/repos$"), "/users/{u}/repos"),
+    (re.compile(r"^/users/[^/]+/events/public$"), "/users/{u}/events/public"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/commits$"), "/repos/{o}/{r}/commits"),
+]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PAGES_BUCKETS = (1, 2, 3, 5, 10, 20)
+
+
+def endpoint_template(endpoint: str) -> str:
+    """把具体接口路径归一为模板；未知路径保留首段（如 /graphql、/search/commits）。"""
+    for pattern, template in _TEMPLATES:
+        if pattern.match(endpoint):
+            return template
+    if endpoint.startswith("/search/") or endpoint == "/graphql":
+        return endpoint
+    parts = endpoint.strip("/").split("/")
+    return f"/{parts[0]}/..." if parts and parts[0] else "/"
+
+
+class MetricsSink:
+    """指标接收器接口（默认实现不记录任何内容）。"""
+
+    def observe_request(
+        self, endpoint: str, method: str, status: str, seconds: float, nbytes: int
+    ) -> None:
+        pass
+
+    def observe_pages(self, endpoint: str, pages: int) -> None:
+        pass
+
+    def set_rate_limit_remaining(self, resource: str, remaining: int) -> None:
+        pass
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_le(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+class PrometheusMetrics(MetricsSink):
+    """线程安全的内存指标聚合，`render()` 输出 Prometheus 文本格式。"""
+
+    def __init__(self, prefix: str = "devscope_github") -> None:
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], _Histogram] = {}
+        self._pages: Dict[str, _Histogram] = {}
+        self._status: Dict[Tuple[str, str], int] = {}
+        self._bytes: Dict[str, int] = {}
+        self._remaining: Dict[str, int] = {}
+
+    def observe_request(
+        self, endpoint: str, method: str, status: str, seconds: float, nbytes: int
+    ) -> None:
+        with self._lock:
+            hist = self._latency.get((endpoint, method))
+            if hist is None:
+                hist = self._latency[(endpoint, method)] = _Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            self._status[(endpoint, status)] = self._status.get((endpoint, status), 0) + 1
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + nbytes
+
+    def observe_pages(self, endpoint: str, pages: int) -> None:
+        with self._lock:
+            hist = self._pages.get(endpoint)
+            if hist is None:
+                hist = self._pages[endpoint] = _Histogram(PAGES_BUCKETS)
+            hist.observe(pages)
+
+    def set_rate_limit_remaining(self, resource: str, remaining: int) -> None:
+        with self._lock:
+            self._remaining[resource] = remaining
+
+    def rate_limit_remaining(self, resource: str = "core") -> Optional[int]:
+        with self._lock:
+            return self._remaining.get(resource)
+
+    def _render_histogram(
+        self, lines: List[str], name: str, series: Dict, label_names: Tuple[str, ...]
+    ) -> None:
+        for key, hist in sorted(series.items()):
+            values = key if isinstance(key, tuple) else (key,)
+            labels = dict(zip(label_names, values))
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(**labels, le=_format_le(bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+            lines.append(f"{name}_sum{_labels(**labels)} {hist.total}")
+            lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+    def render(self) -> str:
+        p = self.prefix
+        lines: List[str] = []
+        with self._lock:
+            lines.append(f"# HELP {p}_request_duration_seconds GitHub API 请求延迟")
+            lines.append(f"# TYPE {p}_request_duration_seconds histogram")
+            self._render_histogram(
+                lines, f"{p}_request_duration_seconds", self._latency, ("endpoint", "method")
+            )
+            lines.append(f"# HELP {p}_requests_total 按状态码统计的 GitHub API 请求数")
+            lines.append(f"# TYPE {p}_requests_total counter")
+            for (endpoint, status), count in sorted(self._status.items()):
+                lines.append(f"{p}_requests_total{_labels(endpoint=endpoint, status=status)} {count}")
+            lines.append(f"# HELP {p}_response_bytes_total 接收的响应字节数")
+            lines.append(f"# TYPE {p}_response_bytes_total counter")
+            for endpoint, nbytes in sorted(self._bytes.items()):
+                lines.append(f"{p}_response_bytes_total{_labels(endpoint=endpoint)} {nbytes}")
+            lines.append(f"# HELP {p}_pages_per_call 每次分页调用抓取的页数")
+            lines.append(f"# TYPE {p}_pages_per_call histogram")
+            self._render_histogram(lines, f"{p}_pages_per_call", self._pages, ("endpoint",))
+            lines.append(f"# HELP {p}_ratelimit_remaining 最近一次响应头中的 X-RateLimit-Remaining")
+            lines.append(f"# TYPE {p}_ratelimit_remaining gauge")
+            for resource, remaining in sorted(self._remaining.items()):
+                lines.append(f"{p}_ratelimit_remaining{_labels(resource=resource)} {remaining}")
+        return "\n".join(lines) + "\n"
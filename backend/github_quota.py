@@ -0,0 +1,263 @@
+"""
+GitHub 速率额度跟踪
+
+由响应头 `X-RateLimit-Remaining` / `X-RateLimit-Reset` / `X-RateLimit-Resource`
+驱动，按资源类型（core / graphql / search）分别记录剩余额度。
+多个 Token 时由 `TokenPool` 为每个 Token 维护独立的 `QuotaTracker`，
+每次请求选用余量最大的 Token，耗尽的 Token 在重置前被跳过。
+
+请求发出前先向 `QuotaTracker` 申请额度：
+- 额度充足时立即放行，并为在途请求预留 1 个单位；
+- 额度耗尽时返回距重置的秒数，由调用方决定短暂等待还是直接失败，
+  不再像以前那样 `time.sleep` 到重置时间（最长可达 1 小时）。
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class QuotaExhaustedError(RuntimeError):
+    """在截止时间内无法获得 GitHub 速率额度。
+
+    retry_after: 建议客户端多少秒后重试（用于 HTTP 503 的 Retry-After）。
+    """
+
+    def __init__(self, retry_after: float, resource: str = "core") -> None:
+        self.retry_after = max(1, int(retry_after + 0.999))
+        self.resource = resource
+        super().__init__(
+            f"GitHub API rate limit exhausted ({resource})，{self.retry_after} 秒后重试"
+        )
+
+
+class RateLimitedError(QuotaExhaustedError):
+    """GitHub 返回了 403/429 限流响应（区别于请求前额度检查的快速失败），可换 Token 重试。"""
+
+
+def resource_for_endpoint(endpoint: str) -> str:
+    """根据接口路径判断消耗的额度类型。"""
+    if endpoint.startswith("/graphql"):
+        return "graphql"
+    if endpoint.startswith("/search/"):
+        return "search"
+    return "core"
+
+
+class _Bucket:
+    __slots__ = ("remaining", "reset", "limit", "in_flight")
+
+    def __init__(self) -> None:
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.limit: Optional[int] = None
+        self.in_flight = 0
+
+
+class QuotaTracker:
+    """线程安全的速率额度跟踪器，可在多个客户端 / 协程之间共享。
+
+    参数：
+        min_remaining: 保留的安全余量，剩余额度低于等于该值时不再放行
+    """
+
+    def __init__(self, min_remaining: int = 2) -> None:
+        self.min_remaining = min_remaining
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, resource: str) -> _Bucket:
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            bucket = self._buckets[resource] = _Bucket()
+        return bucket
+
+    def try_acquire(self, resource: str = "core") -> float:
+        """申请 1 个单位额度。放行返回 0，否则返回距离重置的秒数。"""
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(resource)
+            if bucket.reset is not None and now >= bucket.reset:
+                # 已过重置时间，额度未知，先放行并等待下一次响应头更新
+                bucket.remaining = None
+                bucket.reset = None
+            if (
+                bucket.remaining is None
+                or bucket.reset is None
+                or bucket.remaining - bucket.in_flight > self.min_remaining
+            ):
+                bucket.in_flight += 1
+                return 0.0
+            return max(1.0, bucket.reset - now)
+
+    def release(self, resource: str = "core") -> None:
+        """请求未得到响应（网络异常等）时归还预留额度。"""
+        with self._lock:
+            bucket = self._bucket(resource)
+            bucket.in_flight = max(0, bucket.in_flight - 1)
+
+    def update(self, resource: str, headers: Any) -> None:
+        """用响应头刷新额度，并归还该请求的预留。"""
+        header_resource = headers.get("X-RateLimit-Resource") or resource
+        try:
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            limit = headers.get("X-RateLimit-Limit")
+            remaining_int = int(remaining) if remaining is not None else None
+            reset_int = int(reset) if reset is not None else None
+            limit_int = int(limit) if limit is not None else None
+        except ValueError:
+            remaining_int = reset_int = limit_int = None
+        with self._lock:
+            reserved = self._bucket(resource)
+            reserved.in_flight = max(0, reserved.in_flight - 1)
+            bucket = self._bucket(header_resource)
+            if remaining_int is not None:
+                bucket.remaining = remaining_int
+            if reset_int is not None:
+                bucket.reset = float(reset_int)
+            if limit_int is not None:
+                bucket.limit = limit_int
+
+    def mark_exhausted(self, resource: str, retry_after: float) -> None:
+        """收到 403/429 限流响应时，把该资源标记为耗尽直到 retry_after 秒后。"""
+        with self._lock:
+            bucket = self._bucket(resource)
+            bucket.remaining = 0
+            bucket.reset = time.time() + retry_after
+
+    def headroom(self, resource: str, default_limit: int) -> int:
+        """用于挑选 Token 的余量估计：额度未知时按 default_limit 计算。"""
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(resource)
+            remaining = bucket.remaining
+            if remaining is None or (bucket.reset is not None and now >= bucket.reset):
+                remaining = bucket.limit or default_limit
+            return remaining - bucket.in_flight - self.min_remaining
+
+    def available(self, resource: str = "core") -> Optional[int]:
+        """当前可用额度（扣除在途请求与安全余量），未知时返回 None。"""
+        with self._lock:
+            bucket = self._bucket(resource)
+            if bucket.remaining is None:
+                return None
+            if bucket.reset is not None and time.time() >= bucket.reset:
+                return None
+            return max(0, bucket.remaining - bucket.in_flight - self.min_remaining)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "remaining": b.remaining,
+                    "limit": b.limit,
+                    "reset": b.reset,
+                    "in_flight": b.in_flight,
+                }
+                for name, b in self._buckets.items()
+            }
+
+
+# 已认证 Token 的默认每小时额度，用于额度未知时的估计
+_DEFAULT_LIMIT = 5000
+
+
+class TokenPool:
+    """多 Token 池：按 Token 分别跟踪额度，并把请求分配给余量最大的 Token。
+
+    tokens 为空时表示匿名访问（池中只有一个不带 Authorization 的槽位）。
+    吞吐量随 Token 数线性增长；`utilization()` 用于评估池的规模是否合适。
+    """
+
+    def __init__(self, tokens: Optional[List[str]] = None, min_remaining: int = 2) -> None:
+        unique = list(dict.fromkeys(t for t in tokens or [] if t))
+        self._tokens: List[Optional[str]] = list(unique) or [None]
+        self._trackers = [QuotaTracker(min_remaining) for _ in self._tokens]
+        self._requests = [0] * len(self._tokens)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    @property
+    def authenticated(self) -> bool:
+        return self._tokens[0] is not None
+
+    def auth_headers(self, slot: int) -> Dict[str, str]:
+        token = self._tokens[slot]
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def identity(self, slot: int) -> str:
+        """槽位对应 Token 的稳定摘要（不含 Token 本身），用于区分不同身份的缓存条目。"""
+        token = self._tokens[slot]
+        if not token:
+            return "anonymous"
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+    def try_acquire(self, resource: str = "core") -> Tuple[int, float]:
+        """选出余量最大且可放行的 Token，返回 (槽位, 0)；全部耗尽时返回 (-1, 最短等待秒数)。"""
+        default_limit = _DEFAULT_LIMIT if self.authenticated else 60
+        order = sorted(
+            range(len(self._tokens)),
+            key=lambda i: self._trackers[i].headroom(resource, default_limit),
+            reverse=True,
+        )
+        waits = []
+        for slot in order:
+            wait = self._trackers[slot].try_acquire(resource)
+            if wait <= 0:
+                with self._lock:
+                    self._requests[slot] += 1
+                return slot, 0.0
+            waits.append(wait)
+        return -1, min(waits)
+
+    def release(self, slot: int, resource: str = "core") -> None:
+        self._trackers[slot].release(resource)
+
+    def update(self, slot: int, resource: str, headers: Any) -> None:
+        self._trackers[slot].update(resource, headers)
+
+    def mark_exhausted(self, slot: int, resource: str, retry_after: float) -> None:
+        self._trackers[slot].mark_exhausted(resource, retry_after)
+
+    def available(self, resource: str = "core") -> Optional[int]:
+        """所有 Token 可用额度之和；任一 Token 额度未知时返回 None。"""
+        total = 0
+        for tracker in self._trackers:
+            available = tracker.available(resource)
+            if available is None:
+                return None
+            total += available
+        return total
+
+    def utilization(self) -> Dict[str, Any]:
+        """池利用率：每个 Token 的请求数与各资源额度，以及 core 额度的总体使用率。"""
+        with self._lock:
+            requests_made = list(self._requests)
+        per_token = []
+        remaining_total = 0
+        limit_total = 0
+        for slot, (token, tracker) in enumerate(zip(self._tokens, self._trackers)):
+            snapshot = tracker.snapshot()
+            core = snapshot.get("core", {})
+            if core.get("remaining") is not None and core.get("limit"):
+                remaining_total += core["remaining"]
+                limit_total += core["limit"]
+            per_token.append({
+                "slot": slot,
+                # 只报告槽位与是否认证，不输出 Token 的任何字符
+                "authenticated": bool(token),
+                "requests": requests_made[slot],
+                "resources": snapshot,
+            })
+        return {
+            "size": len(self._tokens),
+            "total_requests": sum(requests_made),
+            "core_remaining": remaining_total,
+            "core_limit": limit_total,
+            "core_utilization": round(1 - remaining_total / limit_total, 4) if limit_total else None,
+            "tokens": per_token,
+        }
@@ -0,0 +1,136 @@
+"""
+GitHub 数据的紧凑记录类型
+
+REST 返回的仓库 JSON 约有 100 个字段（含 owner / license 等嵌套对象），
+提交 JSON 也带有大量未使用的字段。分析流程实际只用到其中少数几个：
+- 仓库：owner.login / name / language / topics / pushed_at
+- 提交：commit.author.date / commit.message / html_url
+
+客户端在解析每一页响应时立即投影为下面的 `__slots__` 记录，
+原始 JSON 随页面一起释放，降低活跃用户和组织的单请求内存峰值。
+
+推荐使用属性访问（`repo.owner`、`commit.date`）。为兼容按 REST JSON 编写的调用方，
+记录也支持只读的下标访问（`repo["owner"]["login"]`、`commit["commit"]["author"]["date"]`），
+但只包含上面投影保留的字段，其余字段（如 stargazers_count）抛出 KeyError。
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class _RestMapping:
+    """按 REST JSON 结构提供只读下标访问。
+
+    子类在 `_REST_KEYS` 中登记 REST 字段名 → 属性名，下标访问直接读取对应属性，
+    不为每次访问构造整份 REST 字典；嵌套字段（如 owner）由子类的私有属性按需生成。
+    """
+
+    __slots__ = ()
+    _REST_KEYS: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self._REST_KEYS.get(key)
+        if attr is None:
+            raise KeyError(key)
+        return getattr(self, attr)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._REST_KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._REST_KEYS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        attr = self._REST_KEYS.get(key)
+        return default if attr is None else getattr(self, attr)
+
+    def keys(self) -> Any:
+        return self._REST_KEYS.keys()
+
+
+class RepoRecord(_RestMapping):
+    """仓库记录（对应 /users/{username}/repos 列表项）。"""
+
+    __slots__ = ("owner", "name", "language", "topics", "pushed_at")
+    _REST_KEYS = {
+        "name": "name",
+        "full_name": "full_name",
+        "owner": "_rest_owner",
+        "language": "language",
+        "topics": "_rest_topics",
+        "pushed_at": "pushed_at",
+    }
+
+    def __init__(
+        self,
+        owner: str,
+        name: str,
+        language: Optional[str] = None,
+        topics: Tuple[str, ...] = (),
+        pushed_at: Optional[str] = None,
+    ) -> None:
+        self.owner = owner
+        self.name = name
+        self.language = language
+        self.topics = topics
+        self.pushed_at = pushed_at
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], default_owner: str = "") -> Optional["RepoRecord"]:
+        """从 REST JSON 投影；缺少仓库名时返回 None。"""
+        name = data.get("name")
+        if not name:
+            return None
+        owner = (data.get("owner") or {}).get("login") or default_owner
+        return cls(
+            owner=owner,
+            name=name,
+            language=data.get("language"),
+            topics=tuple(data.get("topics") or ()),
+            pushed_at=data.get("pushed_at"),
+        )
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+    @property
+    def _rest_owner(self) -> Dict[str, Any]:
+        return {"login": self.owner}
+
+    @property
+    def _rest_topics(self) -> List[str]:
+        return list(self.topics)
+
+    def __repr__(self) -> str:
+        return f"RepoRecord({self.full_name!r}, language={self.language!r}, pushed_at={self.pushed_at!r})"
+
+
+class CommitRecord(_RestMapping):
+    """提交记录（对应 /repos/{owner}/{repo}/commits 列表项）。"""
+
+    __slots__ = ("date", "message", "url")
+    _REST_KEYS = {"html_url": "url", "commit": "_rest_commit"}
+
+    def __init__(self, date: str, message: str, url: str) -> None:
+        self.date = date
+        self.message = message
+        self.url = url
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> Optional["CommitRecord"]:
+        """从 REST JSON 投影；缺少作者时间等关键字段时返回 None。"""
+        try:
+            commit = data["commit"]
+            date = commit["author"]["date"]
+            if not isinstance(date, str):
+                return None
+            return cls(date=date, message=commit["message"], url=data["html_url"])
+        except (KeyError, TypeError):
+            return None
+
+    @property
+    def _rest_commit(self) -> Dict[str, Any]:
+        return {"author": {"date": self.date}, "message": self.message}
+
+    def __repr__(self) -> str:
+        return f"CommitRecord(date={self.date!r}, url={self.url!r})"
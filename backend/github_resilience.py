@@ -0,0 +1,172 @@
+"""
+GitHub 请求重试与熔断
+
+以前 `_request` 把每次超时 / 连接错误直接转为 `RuntimeError`：
+`get_user_commit_activity` 会因此悄悄丢掉整个仓库，`get_user` 则让整个分析失败；
+而 GitHub 故障期间，大量 60 秒超时的请求会堆积在一起。
+
+- `RetryPolicy`：幂等 GET 在超时、连接错误、5xx 与二级限流响应时有限次重试，
+  退避时间为带抖动的指数退避（full jitter），并受总耗时上限约束；
+- `CircuitBreaker`：按主机统计最近请求的失败率，超过阈值后熔断，
+  冷却期内直接快速失败（`CircuitOpenError`），冷却结束后放行单个探测请求。
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+# 可重试的服务端错误状态码
+RETRYABLE_STATUS = frozenset({500, 502, 503, 504})
+
+
+class TransientRequestError(RuntimeError):
+    """请求未得到响应（超时 / 连接错误等），可重试。"""
+
+
+class CircuitOpenError(RuntimeError):
+    """目标主机已熔断，请求被快速拒绝。
+
+    retry_after: 距离熔断结束的秒数（用于 HTTP 503 的 Retry-After）。
+    """
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        self.host = host
+        self.retry_after = max(1, int(retry_after + 0.999))
+        super().__init__(f"GitHub API 暂不可用（{host} 已熔断），{self.retry_after} 秒后重试")
+
+
+class RetryPolicy:
+    """带抖动的指数退避重试策略。
+
+    参数：
+        max_retries: 最多重试次数（不含首次请求）
+        base_delay: 第 1 次重试的退避上限（秒），之后每次翻倍
+        max_delay: 单次退避上限（秒）
+        max_elapsed: 从首次请求开始的总耗时上限（秒），超过后不再重试
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 4.0,
+        max_elapsed: float = 15.0,
+    ) -> None:
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+
+    def next_delay(
+        self, attempt: int, started: float, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """第 attempt 次失败（从 0 开始）后的退避秒数；不应再重试时返回 None。"""
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = max(delay, retry_after)
+        if time.monotonic() - started + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """按主机的熔断器（线程安全，可在多个客户端 / 协程之间共享）。
+
+    参数：
+        window: 统计失败率的最近请求数
+        min_requests: 窗口内至少有这么多请求才会判断是否熔断
+        failure_ratio: 失败率阈值
+        cooldown: 熔断持续秒数，之后放行单个探测请求
+    """
+
+    def __init__(
+        self,
+        host: str = "",
+        window: int = 20,
+        min_requests: int = 10,
+        failure_ratio: float = 0.5,
+        cooldown: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self._results: deque = deque(maxlen=window)
+        self._opened_at: Optional[float] = None
+        # 半开状态下持有探测名额的请求令牌；只有持有者能提交或归还探测结果
+        self._probe: Optional[object] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> Optional[object]:
+        """请求前调用：熔断中抛出 CircuitOpenError；冷却结束后只放行一个探测请求。
+
+        返回探测令牌（本次请求即探测请求时）或 None，需原样传给 record / release_probe。
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self._probe is not None:
+                raise CircuitOpenError(self.host, max(remaining, 1.0))
+            self._probe = object()
+            return self._probe
+
+    def record(self, ok: bool, probe: Optional[object] = None) -> None:
+        """记录一次请求结果（超时 / 连接错误 / 5xx 视为失败）。"""
+        with self._lock:
+            if self._opened_at is not None:
+                # 熔断前发出、之后才返回的请求不影响状态；只有探测请求的结果决定恢复还是继续熔断
+                if probe is None or probe is not self._probe:
+                    return
+                self._probe = None
+                if ok:
+                    self._opened_at = None
+                    self._results.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+            self._results.append(ok)
+            failures = self._results.count(False)
+            if (
+                len(self._results) >= self.min_requests
+                and failures / len(self._results) >= self.failure_ratio
+            ):
+                self._opened_at = time.monotonic()
+
+    def release_probe(self, probe: Optional[object]) -> None:
+        """探测请求未得到结论（如被限流、被取消）时归还探测名额；非持有者调用时忽略。"""
+        if probe is None:
+            return
+        with self._lock:
+            if probe is self._probe:
+                self._probe = None
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker_for(base_url: str) -> CircuitBreaker:
+    """返回进程内该主机共享的熔断器。"""
+    host = urlsplit(base_url).netloc or base_url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
@@ -0,0 +1,319 @@
+"""
+GitHub 请求录制 / 回放传输层
+
+分析链路的基准测试以前必须访问真实 GitHub，耗时受网络波动影响且消耗额度。
+此模块提供可插拔的传输层：
+- 录制（record）：照常访问 GitHub，同时把 请求 → 响应（状态码、响应头、正文）
+  写入压缩的存档文件（gzip JSON）；
+- 回放（replay）：完全离线地从存档返回响应，可选注入固定延迟，模拟网络往返。
+
+两种客户端各自使用所在 HTTP 库的原生扩展点：
+- `AsyncGitHubClient(transport=...)`：httpx 传输层（`RecordingTransport` / `ReplayTransport`）；
+- `GitHubClient(transport=...)`：requests 适配器（`RecordingAdapter` / `ReplayAdapter`）。
+
+存档键只包含 方法 + 路径 + 查询参数（+ POST 正文摘要），不含主机名与 Authorization；
+随时间变化的参数（since / until）默认不参与匹配；搜索语句 `q` 中的日期改写为相对当天（UTC）
+的天数偏移（如 `committer-date:>2025-01-01T00:00:00Z` → `committer-date:><today-365>T00:00:00Z`），
+客户端的窗口起点与二分点都对齐到 UTC 零点，时间窗口二分出的各个子查询仍可区分，
+录制的存档在之后的日期仍可回放。
+录制模式每收到一个响应就追加一行到存档旁的日志文件（`<存档>.journal`，JSON Lines），
+关闭时才把全部条目压缩写回存档并删除日志；进程中途退出时，下次加载存档会合并日志中的条目。
+客户端关闭后重建连接也不会丢失之后的请求。
+录制时去掉条件请求头以保存完整的 200 响应；回放时若请求带有匹配的 If-None-Match，
+则像 GitHub 一样返回 304，条件请求缓存的行为在回放中保持不变。
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import re
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional, TextIO, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger('github_client')
+
+# 正文以解码后的形式保存，这些头部在回放时不再适用
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+_CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+_VOLATILE_PARAMS = ("since", "until")
+_RELATIVE_DATE_PARAMS = ("q",)
+_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})(?=$|[T.\s])")
+
+
+def _relative_dates(value: str, today: date) -> str:
+    """把文本中的日期部分改写为相对 today 的天数偏移，如 `2025-01-01T00:00:00Z` → `<today-365>T00:00:00Z`。"""
+    def replace(match: "re.Match[str]") -> str:
+        try:
+            day = date.fromisoformat(match.group(1))
+        except ValueError:
+            return match.group(0)
+        return f"<today{(day - today).days:+d}>"
+
+    return _DATE_RE.sub(replace, value)
+
+
+class FixtureMissError(RuntimeError):
+    """回放存档中没有对应的请求。"""
+
+
+class FixtureArchive:
+    """请求 → 响应存档（gzip 压缩的 JSON 文件），线程安全。
+
+    `put()` 只向日志文件追加一行，代价与存档大小无关；`save()` 把全部条目压缩写回存档、删除日志。
+
+    参数：
+        path: 存档文件路径，已存在时自动加载（连同未合并的日志）
+        volatile_params: 不参与匹配的查询参数
+        relative_date_params: 其中的日期按相对当天（UTC）的天数偏移参与匹配的查询参数
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        path: str,
+        volatile_params: Iterable[str] = _VOLATILE_PARAMS,
+        relative_date_params: Iterable[str] = _RELATIVE_DATE_PARAMS,
+    ) -> None:
+        self.path = path
+        self.volatile_params = frozenset(volatile_params)
+        self.relative_date_params = frozenset(relative_date_params)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.journal_path = f"{path}.journal"
+        self._journal: Optional[TextIO] = None
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+            self._entries = payload.get("entries", {})
+            logger.info(f"已加载回放存档: {path} ({len(self._entries)} 条)")
+        if os.path.exists(self.journal_path):
+            self._load_journal()
+
+    def _load_journal(self) -> None:
+        """合并上次录制未写回存档的日志条目（忽略中途截断的最后一行）。"""
+        count = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._entries[record.pop("key")] = record
+                count += 1
+        self._dirty = count > 0
+        logger.info(f"已合并录制日志: {self.journal_path} ({count} 条)")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, method: str, url: str, body: Optional[bytes] = None) -> str:
+        parts = urlsplit(url)
+        today = datetime.now(timezone.utc).date()
+        query = sorted(
+            (k, _relative_dates(v, today) if k in self.relative_date_params else v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in self.volatile_params
+        )
+        key = f"{method.upper()} {parts.path}"
+        if query:
+            key += "?" + "&".join(f"{k}={v}" for k, v in query)
+        if body:
+            key += " #" + hashlib.sha256(body).hexdigest()[:16]
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, status: int, headers: Iterable[Tuple[str, str]], body: bytes) -> None:
+        entry = {
+            "status": status,
+            "headers": [[k, v] for k, v in headers if k.lower() not in _SKIPPED_HEADERS],
+            "body": body.decode("utf-8", errors="replace"),
+        }
+        line = json.dumps({"key": key, **entry}, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty = True
+            if self._journal is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(line + "\n")
+            self._journal.flush()
+
+    def save(self) -> None:
+        """把全部条目压缩写回存档并删除日志（录制结束时调用一次）。"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": self.VERSION, "entries": self._entries}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._dirty = False
+        logger.info(f"已保存回放存档: {self.path} ({len(self._entries)} 条)")
+
+    def lookup(self, key: str, if_none_match: Optional[str]) -> Tuple[int, Dict[str, Any], bytes]:
+        """回放：返回 (状态码, 响应头, 正文)；条件请求命中时返回 304。"""
+        entry = self.get(key)
+        if entry is None:
+            raise FixtureMissError(f"回放存档中没有该请求: {key}")
+        headers = CaseInsensitiveDict(entry["headers"])
+        etag = headers.get("ETag")
+        if if_none_match and etag and if_none_match == etag:
+            return 304, dict(headers), b""
+        return entry["status"], dict(headers), entry["body"].encode("utf-8")
+
+
+# ----------------------------------------------------------------------
+# httpx 传输层（AsyncGitHubClient）
+# ----------------------------------------------------------------------
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """转发到真实网络并录制每个响应（立即追加到录制日志）；关闭时写回存档。
+
+    未传入 inner 时自行创建网络传输层；关闭后下一次请求会重新创建，
+    客户端在 aclose() 之后重建连接池时可以继续录制。传入的 inner 由调用方负责关闭。
+    """
+
+    def __init__(self, archive: FixtureArchive, inner: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.archive = archive
+        self.inner = inner
+        self._owns_inner = inner is None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for name in _CONDITIONAL_HEADERS:
+            request.headers.pop(name, None)
+        body = await request.aread()
+        if self.inner is None:
+            self.inner = httpx.AsyncHTTPTransport()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        self.archive.put(
+            self.archive.key(request.method, str(request.url), body),
+            response.status_code,
+            response.headers.items(),
+            content,
+        )
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        if self._owns_inner and self.inner is not None:
+            inner, self.inner = self.inner, None
+            await inner.aclose()
+        await asyncio.to_thread(self.archive.save)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """完全离线地从存档返回响应，latency 为每个请求注入的延迟（秒）。"""
+
+    def __init__(self, archive: FixtureArchive, latency: float = 0.0) -> None:
+        self.archive = archive
+        self.latency = latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        status, headers, content = self.archive.lookup(
+            self.archive.key(request.method, str(request.url), body),
+            request.headers.get("If-None-Match"),
+        )
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+# ----------------------------------------------------------------------
+# requests 适配器（GitHubClient）
+# ----------------------------------------------------------------------
+
+class RecordingAdapter(HTTPAdapter):
+    """转发到真实网络并录制每个响应（立即追加到录制日志）；关闭时写回存档。"""
+
+    def __init__(self, archive: FixtureArchive, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        for name in _CONDITIONAL_HEADERS:
+            request.headers.pop(name, None)
+        response = super().send(request, **kwargs)
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        self.archive.put(
+            self.archive.key(request.method, request.url, body),
+            response.status_code,
+            response.headers.items(),
+            response.content,
+        )
+        return response
+
+    def close(self) -> None:
+        super().close()
+        self.archive.save()
+
+
+class ReplayAdapter(BaseAdapter):
+    """完全离线地从存档返回响应，latency 为每个请求注入的延迟（秒）。"""
+
+    def __init__(self, archive: FixtureArchive, latency: float = 0.0) -> None:
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        status, headers, content = self.archive.lookup(
+            self.archive.key(request.method, request.url, body),
+            request.headers.get("If-None-Match"),
+        )
+        if self.latency > 0:
+            time.sleep(self.latency)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def async_transport_from_config(
+    mode: Optional[str], path: str, latency_ms: float = 0.0
+) -> Optional[httpx.AsyncBaseTransport]:
+    """按配置构造 AsyncGitHubClient 的传输层：live（默认，返回 None）| record | replay。"""
+    mode = (mode or "live").lower()
+    if mode == "live":
+        return None
+    if mode == "record":
+        logger.info(f"GitHub 请求录制模式: {path}")
+        return RecordingTransport(FixtureArchive(path))
+    if mode == "replay":
+        logger.info(f"GitHub 请求回放模式: {path} (注入延迟 {latency_ms}ms)")
+        return ReplayTransport(FixtureArchive(path), latency=latency_ms / 1000.0)
+    raise ValueError(f"未知的 GitHub 传输模式: {mode}（可选 live / record / replay）")
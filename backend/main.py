@@ -13,15 +13,20 @@ DevScope Phase 3 - 后端 API 服务 (FastAPI)
 4. 返回严格符合数据结构的 JSON
 
 **严格约束**：
-- 禁止修改 modeling.py 中的任何算法逻辑
+- 禁止修改 modeling.py 中的算法逻辑（只允许结果不变的性能改写）
 - 禁止引入深度学习/黑箱模型
-- 禁止设计数据库/缓存/用户系统
+- 禁止设计业务数据库/用户系统；缓存只作为可丢弃的加速层，不改变接口输出：
+  - GitHub 条件请求缓存（SQLite，GITHUB_CACHE_PATH）
+  - 按仓库的增量提交存储（SQLite，GITHUB_COMMIT_STORE=1 时启用）
+  - 进程内的时间分布拟合缓存（FitMemo）
 - 禁止过度抽象、重构项目结构
 - 所有输出必须直接来源于 Phase 2 的函数返回值
 """
 
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
+import asyncio
+import hmac
 import json
 import logging
 import os
@@ -31,12 +36,23 @@ from dotenv import load_dotenv
 # Load .env from the same directory as this file
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
-from fastapi import FastAPI, HTTPException, Query, Path, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Path, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 
-from github_client import GitHubClient
+from github_client import AsyncGitHubClient
+from github_records import RepoRecord
+from github_quota import QuotaExhaustedError
+from github_resilience import CircuitOpenError
+from github_cache import ResponseCache
+from commit_store import CommitStore
+from singleflight import SingleFlight
+from fit_memo import FitMemo
+from github_metrics import PrometheusMetrics
+from github_transport import async_transport_from_config
 import modeling
+from tech_vocab import TECH_VOCAB, TechVocabulary
 from llm_service import predict_next_commit, NextCommitPrediction
 
 # 配置日志
@@ -69,6 +85,8 @@ class TimePrediction(BaseModel):
     expected_interval_days: float = Field(..., ge=0, description="预期活跃间隔（天）")
     next_active_prob_30d: float = Field(..., ge=0.0, le=1.0, description="未来30天活跃概率")
     distribution_type: str = Field(..., description="'Weibull' 或 'Exponential'")
+    expected_interval_ci: Optional[List[float]] = Field(None, description="预期活跃间隔的 bootstrap 置信区间 [下限, 上限]")
+    next_active_prob_30d_ci: Optional[List[float]] = Field(None, description="未来30天活跃概率的 bootstrap 置信区间 [下限, 上限]")
 
 
 class PersonaInfo(BaseModel):
@@ -164,9 +182,96 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 初始化 GitHub 客户端（使用环境变量中的 Token）
-github_client = GitHubClient()
-logger.info("GitHub 客户端初始化完成")
+# GitHub 请求指标（延迟 / 状态码 / 字节数 / 分页数 / 剩余额度），由 /metrics 输出
+github_metrics = PrometheusMetrics()
+# GitHub 客户端在启动钩子中创建：导入 main 时不打开 .cache 下的 SQLite 文件
+github_client: Optional[AsyncGitHubClient] = None
+
+# 进行中的 /api/analyze 与 /api/match 计算，按规范化用户名与查询参数合并
+analysis_flights = SingleFlight()
+# 活跃时间分布拟合结果缓存（按有效间隔内容哈希），analyze 与 match 共享
+fit_memo = FitMemo(
+    max_entries=int(os.environ.get("FIT_MEMO_MAX_ENTRIES", "4096")),
+    ttl=float(os.environ.get("FIT_MEMO_TTL", "3600")),
+)
+# 活跃时间预测的 bootstrap 重采样次数（0 表示不计算置信区间）
+TIME_BOOTSTRAP_RESAMPLES = int(os.environ.get("TIME_BOOTSTRAP_RESAMPLES", "200"))
+# 运维端点（Token 池、拟合缓存统计、/metrics）的访问令牌；未设置时不校验
+OPS_TOKEN = os.environ.get("OPS_TOKEN", "")
+
+
+def require_ops_token(request: Request) -> None:
+    """设置了 OPS_TOKEN 时，运维端点要求请求头 Authorization: Bearer <OPS_TOKEN>。"""
+    if not OPS_TOKEN:
+        return
+    provided = request.headers.get("Authorization", "").encode("utf-8")
+    if not hmac.compare_digest(provided, f"Bearer {OPS_TOKEN}".encode("utf-8")):
+        raise HTTPException(status_code=401, detail="需要运维访问令牌")
+
+
+def _create_github_client() -> AsyncGitHubClient:
+    """按环境变量创建 GitHub 客户端（使用环境变量中的 Token）。
+
+    使用异步客户端 + 连接池，避免慢请求阻塞事件循环；
+    条件请求缓存落在本地 SQLite，多个 worker 共享且重启后保留。
+    """
+    response_cache = ResponseCache(
+        os.environ.get(
+            "GITHUB_CACHE_PATH",
+            os.path.join(os.path.dirname(__file__), ".cache", "github_responses.sqlite3"),
+        ),
+        max_bytes=int(os.environ.get("GITHUB_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    )
+    # 按仓库的增量提交存储：重复分析只拉取水位线之后的新提交（GITHUB_COMMIT_STORE=1 开启）
+    commit_store = (
+        CommitStore(
+            os.environ.get(
+                "GITHUB_COMMIT_STORE_PATH",
+                os.path.join(os.path.dirname(__file__), ".cache", "github_commits.sqlite3"),
+            ),
+            overlap=timedelta(days=float(os.environ.get("GITHUB_COMMIT_STORE_OVERLAP_DAYS", "7"))),
+        )
+        if os.environ.get("GITHUB_COMMIT_STORE", "0").lower() in ("1", "true", "yes")
+        else None
+    )
+    return AsyncGitHubClient(
+        cache=response_cache,
+        metrics=github_metrics,
+        commit_store=commit_store,
+        # 额度不足时最多等待的秒数，超过则直接返回 503（前端超时为 60 秒）
+        quota_deadline=float(os.environ.get("GITHUB_QUOTA_DEADLINE", "10")),
+        # 录制 / 回放 GitHub 请求，用于离线、可重复的基准测试（默认 live 直连）
+        transport=async_transport_from_config(
+            os.environ.get("GITHUB_TRANSPORT"),
+            os.environ.get(
+                "GITHUB_FIXTURE_PATH",
+                os.path.join(os.path.dirname(__file__), ".cache", "github_fixtures.json.gz"),
+            ),
+            latency_ms=float(os.environ.get("GITHUB_REPLAY_LATENCY_MS", "0")),
+        ),
+    )
+
+
+@app.on_event("startup")
+async def init_github_client():
+    """服务启动时创建 GitHub 客户端与本地缓存"""
+    global github_client
+    if github_client is None:
+        github_client = _create_github_client()
+        logger.info("GitHub 客户端初始化完成")
+
+
+@app.on_event("shutdown")
+async def close_github_client():
+    """服务关闭时释放 GitHub 连接池，并写回缓存中攒下的访问时间"""
+    global github_client
+    if github_client is None:
+        return
+    await github_client.aclose()
+    if github_client.cache is not None:
+        await asyncio.to_thread(github_client.cache.flush_touches)
+    github_client = None
+
 
 # 添加请求日志中间件
 @app.middleware("http")
@@ -185,36 +290,63 @@ async def log_requests(request: Request, call_next):
 # 数据处理辅助函数
 # =============================================================================
 
-def _extract_primary_language(repos: List[Dict]) -> Optional[str]:
+def _extract_primary_language(repos: List[RepoRecord]) -> Optional[str]:
     """
     从仓库列表中提取主要编程语言。
     
     策略：计算频次，返回最常见的语言。
     """
-    languages = [r.get("language") for r in repos if r.get("language")]
+    languages = [r.language for r in repos if r.language]
     if not languages:
         return None
     from collections import Counter
     return Counter(languages).most_common(1)[0][0]
 
 
-def _extract_repo_topics(repos: List[Dict]) -> List[str]:
+def _extract_repo_topics(repos: List[RepoRecord], vocab: TechVocabulary) -> List[int]:
     """
-    从仓库列表中提取所有话题/语言。
+    从仓库列表中提取所有话题/语言，返回规范技术 ID 列表。
     
     优先使用仓库的语言字段，次选话题标签。
+    语言与话题经别名表归一（如 "JavaScript" / "javascript" / "js"），
+    同一仓库中指向同一技术的多个名称只计一次。
     """
     topics = []
     for repo in repos:
+        repo_techs = []
         # 首先尝试获取编程语言
-        if repo.get("language"):
-            topics.append(repo["language"])
+        if repo.language:
+            repo_techs.append(vocab.canonical_id(repo.language))
         # 其次获取仓库的话题标签
-        if repo.get("topics"):
-            topics.extend(repo["topics"])
+        if repo.topics:
+            repo_techs.extend(vocab.canonical_ids(repo.topics))
+        topics.extend(dict.fromkeys(repo_techs))
     return topics
 
 
+def _fallback_topics(primary_language: Optional[str], vocab: TechVocabulary) -> List[int]:
+    """没有任何语言 / 话题时，以主要语言作为唯一话题。"""
+    return [vocab.canonical_id(primary_language)] if primary_language else []
+
+
+def _quota_exhausted_http_error(exc: QuotaExhaustedError) -> HTTPException:
+    """GitHub 额度耗尽 -> 503 + Retry-After"""
+    return HTTPException(
+        status_code=503,
+        detail=f"GitHub API 请求次数已达限制，请 {exc.retry_after} 秒后重试",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _circuit_open_http_error(exc: CircuitOpenError) -> HTTPException:
+    """GitHub 故障熔断中 -> 503 + Retry-After"""
+    return HTTPException(
+        status_code=503,
+        detail=f"GitHub API 暂不可用，请 {exc.retry_after} 秒后重试",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 def _sort_predictions_by_probability(
     predictions: Dict[str, Dict[str, Any]]
 ) -> List[PredictionResult]:
@@ -246,6 +378,32 @@ async def health_check(request: Request):
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
 
+@app.get("/api/github/pool", tags=["Health Check"], dependencies=[Depends(require_ops_token)])
+async def github_token_pool():
+    """GitHub Token 池利用率（按槽位的请求数与剩余额度，不含 Token 内容），用于评估池规模"""
+    return github_client.token_pool.utilization()
+
+
+@app.get("/api/modeling/fit-cache", tags=["Health Check"], dependencies=[Depends(require_ops_token)])
+async def fit_cache_stats():
+    """活跃时间分布拟合缓存的命中 / 未命中 / 淘汰统计"""
+    return fit_memo.stats()
+
+
+@app.get(
+    "/metrics",
+    tags=["Health Check"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_ops_token)],
+)
+async def metrics():
+    """Prometheus 文本格式的 GitHub 请求指标"""
+    return PlainTextResponse(
+        github_metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get(
     "/api/analyze/{username}",
     response_model=DeveloperAnalysis,
@@ -275,16 +433,31 @@ async def analyze_developer(
     - 返回融合社区均值的预测结果
     """
     logger.info(f"收到分析请求: username={username}, client={request.client.host if request.client else 'unknown'}")
-    
+    # 同一用户的并发分析合并为一次计算（GitHub 扇出、拟合与 LLM 调用只执行一次）
+    analysis = await analysis_flights.do_async(
+        ("analyze", username.lower()),
+        lambda: _run_analysis(username),
+    )
+    if analysis.username != username:
+        # 合并到了大小写不同的同名请求：按本次请求的写法回显用户名
+        analysis = analysis.model_copy(update={
+            "username": username,
+            "persona": analysis.persona.model_copy(update={"username": username}),
+        })
+    return analysis
+
+
+async def _run_analysis(username: str) -> DeveloperAnalysis:
+    """分析流程主体（由 analyze_developer 通过 single-flight 调用）"""
     try:
         # Step 1: 获取用户基本信息
         logger.info(f"开始获取用户信息: {username}")
-        user_info = github_client.get_user(username)
+        user_info = await github_client.get_user(username)
         logger.info(f"用户信息获取成功: {user_info.get('login', 'unknown')}")
         
         # Step 2: 获取用户仓库列表
         logger.info(f"开始获取仓库列表: {username}")
-        repos = github_client.get_repos(username)
+        repos = await github_client.get_repos(username)
         logger.info(f"仓库列表获取成功: {len(repos)} 个仓库")
         
         if not repos:
@@ -297,13 +470,16 @@ async def analyze_developer(
         # Step 3: 提取关键数据
         project_count = len(repos)
         primary_language = _extract_primary_language(repos)
-        repo_topics = _extract_repo_topics(repos)
+        # 未知话题只登记在本请求的词表中，不会让全局词表随用户增长
+        vocab = TECH_VOCAB.local()
+        repo_topics = _extract_repo_topics(repos, vocab)
         logger.info(f"提取数据: 项目数={project_count}, 主要语言={primary_language}")
         
         # Step 4: 获取提交历史（用于时间分布拟合）
         logger.info(f"开始获取提交历史: {username}")
-        commit_activity = github_client.get_user_commit_activity(
-            username, limit_repos=min(20, project_count)
+        # 复用 Step 2 的仓库列表，避免重复分页请求
+        commit_activity = await github_client.get_user_commit_activity(
+            username, limit_repos=min(20, project_count), repos=repos
         )
         commit_times = commit_activity.get("commit_times", [])
         recent_commits_data = commit_activity.get("recent_commits", [])
@@ -333,20 +509,26 @@ async def analyze_developer(
         # Step 7: 计算技术倾向概率
         # 使用 modeling.calculate_topic_probability（含拉普拉斯平滑）
         tech_tendency = modeling.calculate_topic_probability(
-            topics=repo_topics if repo_topics else [primary_language] if primary_language else [],
+            topics=repo_topics or _fallback_topics(primary_language, vocab),
             alpha=1.0,
             community_average=community_tendency,
-            confidence_weight=confidence_weight
+            confidence_weight=confidence_weight,
+            vocab=vocab,
         )
         
         # Step 8: 计算活跃时间分布
         # 仅在数据充分时计算
         if project_count >= 5 and commit_times:
-            time_pred = modeling.fit_time_distribution(commit_times)
+            time_pred = modeling.fit_time_distribution(
+                commit_times, memo=fit_memo, bootstrap_resamples=TIME_BOOTSTRAP_RESAMPLES
+            )
+            intervals_ci = time_pred.get("confidence_intervals") or {}
             time_prediction = TimePrediction(
                 expected_interval_days=time_pred["expected_interval_days"],
                 next_active_prob_30d=time_pred["next_active_prob_30d"],
-                distribution_type=time_pred["distribution_type"]
+                distribution_type=time_pred["distribution_type"],
+                expected_interval_ci=intervals_ci.get("expected_interval_days"),
+                next_active_prob_30d_ci=intervals_ci.get("next_active_prob_30d")
             )
         else:
             time_prediction = None
@@ -402,6 +584,13 @@ async def analyze_developer(
     except HTTPException:
         # 重新抛出 HTTP 异常
         raise
+    except QuotaExhaustedError as e:
+        # 额度在截止时间内无法恢复：快速失败，告知客户端何时重试
+        logger.warning(f"GitHub 额度不足 for {username}: {str(e)}")
+        raise _quota_exhausted_http_error(e)
+    except CircuitOpenError as e:
+        logger.warning(f"GitHub 熔断中 for {username}: {str(e)}")
+        raise _circuit_open_http_error(e)
     except RuntimeError as e:
         # GitHub API 错误（通常是用户不存在或限流）
         logger.error(f"RuntimeError for {username}: {str(e)}")
@@ -447,10 +636,21 @@ async def match_technology_stack(request: MatchRequest):
     
     公式：Score = (P_tendency * 0.7) + (P_active * 0.3)
     """
+    result = await analysis_flights.do_async(
+        ("match", request.username.lower(), tuple(request.target_techs)),
+        lambda: _run_match(request),
+    )
+    if result["username"] != request.username:
+        result = {**result, "username": request.username}
+    return result
+
+
+async def _run_match(request: MatchRequest) -> Dict[str, Any]:
+    """匹配度计算主体（由 match_technology_stack 通过 single-flight 调用）"""
     try:
         # 获取开发者分析结果
-        user_info = github_client.get_user(request.username)
-        repos = github_client.get_repos(request.username)
+        user_info = await github_client.get_user(request.username)
+        repos = await github_client.get_repos(request.username)
         
         if not repos:
             raise HTTPException(
@@ -461,8 +661,12 @@ async def match_technology_stack(request: MatchRequest):
         # 提取数据
         project_count = len(repos)
         primary_language = _extract_primary_language(repos)
-        repo_topics = _extract_repo_topics(repos)
-        commit_activity = github_client.get_user_commit_activity(request.username)
+        # 未知话题只登记在本请求的词表中，不会让全局词表随用户增长
+        vocab = TECH_VOCAB.local()
+        repo_topics = _extract_repo_topics(repos, vocab)
+        commit_activity = await github_client.get_user_commit_activity(
+            request.username, repos=repos
+        )
         commit_times = commit_activity.get("commit_times", [])
         
         # 计算技术倾向
@@ -478,30 +682,30 @@ async def match_technology_stack(request: MatchRequest):
             community_tendency = None
         
         tech_tendency = modeling.calculate_topic_probability(
-            topics=repo_topics if repo_topics else [primary_language] if primary_language else [],
+            topics=repo_topics or _fallback_topics(primary_language, vocab),
             alpha=1.0,
             community_average=community_tendency,
-            confidence_weight=confidence_weight
+            confidence_weight=confidence_weight,
+            vocab=vocab,
         )
         
         # 计算活跃概率
         if project_count >= 5 and commit_times:
-            time_pred = modeling.fit_time_distribution(commit_times)
+            time_pred = modeling.fit_time_distribution(commit_times, memo=fit_memo)
             active_prob_30d = time_pred["next_active_prob_30d"]
         else:
             active_prob_30d = 0.5  # 默认值
         
-        # 计算每个目标技术的匹配度
-        match_results = {}
-        for target_tech in request.target_techs:
-            score_info = modeling.calculate_match_score(
-                tech_tendency=tech_tendency,
-                target_tech=target_tech,
-                active_prob_30d=active_prob_30d,
-                tech_weight=0.7,
-                active_weight=0.3
-            )
-            match_results[target_tech] = score_info
+        # 计算每个目标技术的匹配度（目标技术名称一次性解析，分数与等级整体计算）
+        match_matrix = modeling.calculate_match_matrix(
+            tendency=[tech_tendency],
+            active_probs=active_prob_30d,
+            target_techs=request.target_techs,
+            tech_weight=0.7,
+            active_weight=0.3,
+            vocab=vocab,
+        )
+        match_results = match_matrix.row(0)
         
         return {
             "username": request.username,
@@ -512,6 +716,10 @@ async def match_technology_stack(request: MatchRequest):
         
     except HTTPException:
         raise
+    except QuotaExhaustedError as e:
+        raise _quota_exhausted_http_error(e)
+    except CircuitOpenError as e:
+        raise _circuit_open_http_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -526,11 +734,15 @@ async def match_technology_stack(request: MatchRequest):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """统一 HTTP 异常处理"""
-    return {
-        "error": exc.detail,
-        "status_code": exc.status_code,
-        "timestamp": datetime.now().isoformat()
-    }
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "status_code": exc.status_code,
+            "timestamp": datetime.now().isoformat()
+        },
+        headers=getattr(exc, "headers", None),
+    )
 
 
 # =============================================================================
@@ -10,13 +10,14 @@ DevScope Phase 1 & Phase 2 - 数据建模与统计分析模块
 
 from typing import Dict, List, Optional, Any, Tuple
 import json
-from datetime import datetime
-from collections import Counter
+from datetime import datetime, timezone, timedelta
 
 import numpy as np
-from scipy import stats
+from scipy import sparse, stats, special
 from dateutil import parser as date_parser
 
+from fit_memo import FitMemo, array_digest
+from tech_vocab import TECH_VOCAB, TechVocabulary
 from seed_data import (
     get_community_average_tendency,
     get_community_average_time_params,
@@ -142,6 +143,112 @@ def blend_user_and_community(
     return blended
 
 
+# =============================================================================
+# 时间戳批量解析
+# =============================================================================
+
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_EPOCH_AWARE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_MIXED_TZ_ERROR = "can't compare offset-naive and offset-aware datetimes"
+
+
+def _iso_layout_ok(chars: np.ndarray) -> np.ndarray:
+    """逐行检查前 19 个字符是否为 YYYY-MM-DDTHH:MM:SS 布局（T 也可以是空格）。"""
+    return (
+        (chars[:, 4] == "-") & (chars[:, 7] == "-")
+        & ((chars[:, 10] == "T") | (chars[:, 10] == " "))
+        & (chars[:, 13] == ":") & (chars[:, 16] == ":")
+    )
+
+
+def _parse_general_us(ts: str) -> Tuple[int, bool]:
+    """通用解析（dateutil）：返回 (微秒时间戳, 是否带时区)。"""
+    dt = date_parser.parse(ts)
+    if dt.tzinfo is not None and dt.utcoffset() is not None:
+        return (dt - _EPOCH_AWARE) // _ONE_MICROSECOND, True
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+    return (dt - _EPOCH_NAIVE) // _ONE_MICROSECOND, False
+
+
+def _parse_timestamps_us_aware(
+    timestamps: List[str], errors: Optional[Dict[int, Exception]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量解析 ISO-8601 时间戳，返回 (int64 微秒, 是否带时区)；带时区的统一换算为 UTC。
+
+    GitHub 返回的三种常见格式用 NumPy datetime64 整批解析：
+    - 'YYYY-MM-DDTHH:MM:SSZ'（REST）
+    - 'YYYY-MM-DDTHH:MM:SS±HH:MM'（GraphQL authoredDate）
+    - 'YYYY-MM-DDTHH:MM:SS[.ffffff]'（无时区）
+    其余字符串逐个交给 dateutil；传入 errors 时解析失败的下标记入其中而不抛出。
+    """
+    n = len(timestamps)
+    us = np.zeros(n, dtype=np.int64)
+    aware = np.zeros(n, dtype=bool)
+    done = np.zeros(n, dtype=bool)
+    arr = np.asarray(timestamps)
+    if n and arr.dtype.kind == "U" and arr.dtype.itemsize // 4 >= 19:
+        lengths = np.char.str_len(arr)
+        chars = arr.astype("U26").view("U1").reshape(n, 26)
+        layout = _iso_layout_ok(chars)
+        groups = (
+            # (行掩码, 基础部分宽度, 是否带 Z, 是否带 ±HH:MM)
+            (layout & (lengths == 20) & (chars[:, 19] == "Z"), 19, True, False),
+            (layout & (lengths == 25) & ((chars[:, 19] == "+") | (chars[:, 19] == "-"))
+             & (chars[:, 22] == ":"), 19, False, True),
+            (layout & (lengths == 19), 19, False, False),
+            (layout & (lengths == 26) & (chars[:, 19] == "."), 26, False, False),
+        )
+        for mask, width, zulu, offset in groups:
+            if not mask.any():
+                continue
+            try:
+                if offset:
+                    digits = chars[mask][:, [20, 21, 23, 24]].astype(np.int64)
+                    hours = digits[:, 0] * 10 + digits[:, 1]
+                    mins = digits[:, 2] * 10 + digits[:, 3]
+                    in_range = (hours < 24) & (mins < 60)
+                    if not in_range.all():
+                        # 越界的偏移（如 +99:99）交给通用解析，与 dateutil 一样报错
+                        mask = mask.copy()
+                        mask[np.flatnonzero(mask)[~in_range]] = False
+                        hours, mins = hours[in_range], mins[in_range]
+                base = arr[mask].astype(f"U{width}").astype("datetime64[us]").astype(np.int64)
+                if offset:
+                    sign = np.where(chars[mask][:, 19] == "-", -1, 1)
+                    base = base - sign * (hours * 60 + mins) * 60_000_000
+            except ValueError:
+                # 本组有非法日期（如 2 月 30 日），整组交给通用解析
+                continue
+            us[mask] = base
+            aware[mask] = zulu or offset
+            done[mask] = True
+
+    for i in np.flatnonzero(~done):
+        if errors is None:
+            us[i], aware[i] = _parse_general_us(timestamps[i])
+            continue
+        try:
+            us[i], aware[i] = _parse_general_us(timestamps[i])
+        except Exception as e:
+            errors[int(i)] = e
+    return us, aware
+
+
+def _parse_timestamps_us(timestamps: List[str]) -> np.ndarray:
+    """
+    批量解析 ISO-8601 时间戳为 int64 微秒（见 `_parse_timestamps_us_aware`）。
+
+    带时区与不带时区混用时抛出与 datetime 比较相同的 TypeError。
+    """
+    us, aware = _parse_timestamps_us_aware(timestamps)
+    if aware.any() and not aware.all():
+        raise TypeError(_MIXED_TZ_ERROR)
+    return us
+
+
 # =============================================================================
 # Phase 2: Mathematical Modeling (Core)
 # =============================================================================
@@ -151,6 +258,7 @@ def calculate_topic_probability(
     alpha: float = 1.0,
     community_average: Optional[Dict[str, float]] = None,
     confidence_weight: float = 1.0,
+    vocab: Optional[TechVocabulary] = None,
 ) -> Dict[str, Dict[str, Any]]:
     """
     计算技术倾向概率，使用拉普拉斯平滑。
@@ -169,10 +277,13 @@ def calculate_topic_probability(
     $$P_{final} = w \\cdot P_{user} + (1-w) \\cdot P_{community}$$
     
     参数：
-        topics: 用户参与的项目话题/语言列表
+        topics: 用户参与的项目话题/语言列表；可以是规范技术 ID（见 tech_vocab.canonical_id），
+            也可以是按原样统计的名称
         alpha: 拉普拉斯平滑参数 (默认 1.0)
         community_average: 社区平均倾向分布 (可选，用于冷启动)
         confidence_weight: 置信度权重 (0.0 - 1.0，用于冷启动)
+        vocab: 技术词表（topics 为请求级词表分配的 ID 时必须传入同一词表；
+            默认为基于全局词表的临时请求级词表）
     
     返回值：
         包含各领域概率及解释的字典：
@@ -186,71 +297,442 @@ def calculate_topic_probability(
         }
     """
     if not topics:
-        # 空数据处理
-        if community_average:
-            # 完全使用社区数据
-            result = {}
-            for tech, prob in community_average.items():
-                result[tech] = {
-                    "probability": prob,
-                    "count": 0,
-                    "explanation": f"无历史数据，基于社区均值推断概率为 {prob:.1%}"
-                }
-            return result
-        return {}
-
-    # 1. 统计频次
-    counts = Counter(topics)
-    total_projects = len(topics)
-    unique_topics = list(counts.keys())
-    num_categories = len(unique_topics)
-    
-    # 2. 计算拉普拉斯平滑概率
-    user_probs = {}
-    denominator = total_projects + alpha * num_categories
-    
-    for topic in unique_topics:
-        count = counts[topic]
-        prob = (count + alpha) / denominator
-        user_probs[topic] = prob
-        
-    # 3. 融合社区数据 (如果需要)
-    final_probs = {}
-    
-    # 获取所有涉及的技术
-    all_techs = set(user_probs.keys())
+        # 空数据处理：有社区数据时完全使用社区数据
+        return _community_only_entries(community_average)
+
+    # 1. 技术名称映射为词表 ID，统计频次
+    vocab = vocab or TECH_VOCAB.local()
+    per_tech = np.bincount(_tech_ids(topics, vocab))
+    cols = np.flatnonzero(per_tech)
+    cnts = per_tech[cols]
+    rows = np.zeros(len(cols), dtype=np.int64)
     if community_average:
-        all_techs |= set(community_average.keys())
-        
-    for tech in all_techs:
-        u_prob = user_probs.get(tech, 0.0)
-        
-        if community_average and confidence_weight < 1.0:
-            c_prob = community_average.get(tech, 0.0)
-            # 融合公式
-            final_prob = confidence_weight * u_prob + (1 - confidence_weight) * c_prob
-            
-            # 生成解释
-            if confidence_weight > 0.8:
-                expl = f"基于历史数据({counts.get(tech, 0)}次)，参与概率为 {final_prob:.1%}"
-            else:
-                expl = f"数据较少，融合社区均值后概率为 {final_prob:.1%}"
+        comm_cols, comm_vals = vocab.vector(community_average)
+    else:
+        comm_cols, comm_vals = np.zeros(0, dtype=np.int64), np.zeros(0)
+    comm_rows = np.zeros(len(comm_cols), dtype=np.int64)
+
+    # 2. 拉普拉斯平滑 + 社区融合（向量化）
+    _, out_cols, out_counts, final, blended = _topic_probability_coo(
+        rows, cols, cnts, 1, alpha,
+        comm_rows, comm_cols, comm_vals,
+        np.array([bool(community_average)]), np.array([float(confidence_weight)]),
+    )
+
+    # 3. 生成结果与解释
+    return _render_topic_entries(
+        vocab.names(out_cols.tolist()), out_counts, final, blended, confidence_weight
+    )
+
+
+def _tech_ids(topics: Any, vocab: TechVocabulary) -> np.ndarray:
+    """话题序列 → 词表 ID 数组：整数（已规范化的 ID）直接使用，字符串按原样登记。"""
+    if isinstance(topics, np.ndarray) and topics.dtype.kind in "iu":
+        return topics.astype(np.int64, copy=False)
+    topics = list(topics)
+    if topics and all(isinstance(t, (int, np.integer)) for t in topics):
+        return np.asarray(topics, dtype=np.int64)
+    return vocab.intern_many(topics)
+
+
+# `_topic_probability_coo` 用位图求并集的键空间上限（行数 × 技术数）
+_DENSE_KEY_LIMIT = 1 << 16
+
+
+def _topic_probability_coo(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    counts: np.ndarray,
+    n_rows: int,
+    alpha: float,
+    comm_rows: np.ndarray,
+    comm_cols: np.ndarray,
+    comm_vals: np.ndarray,
+    has_community: np.ndarray,
+    weights: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `calculate_topic_probability` 的向量化核心，输入输出均为 COO 形式。
+
+    rows / cols / counts：用户计数（每个 (行, 技术) 至多一条，计数 > 0）；
+    comm_rows / comm_cols / comm_vals：各行使用的社区均值；
+    has_community / weights：每行是否提供社区均值、置信度权重。
+
+    每行的平滑分母为 $N + \\alpha K$（$K$ 为该行出现过的技术数），
+    输出覆盖 用户技术 ∪ 社区技术，按 (行, 技术 ID) 排序：
+    (行, 技术 ID, 计数, 最终概率, 是否融合了社区均值)。
+    逐元素运算顺序与标量公式相同，结果与逐个计算逐位一致。
+    """
+    n_cols = int(max(cols.max(initial=-1), comm_cols.max(initial=-1))) + 1
+    total = np.bincount(rows, weights=counts, minlength=n_rows)
+    distinct = np.bincount(rows, minlength=n_rows)
+    user_prob = (counts + alpha) / (total[rows] + alpha * distinct[rows])
+
+    keys = np.concatenate((rows * n_cols + cols, comm_rows * n_cols + comm_cols))
+    if n_rows * n_cols <= _DENSE_KEY_LIMIT:
+        # 键空间较小（如单个用户）时用位图求并集，比排序去重快
+        present = np.zeros(n_rows * n_cols, dtype=bool)
+        present[keys] = True
+        uniq = np.flatnonzero(present)
+        inverse = np.searchsorted(uniq, keys)
+    else:
+        uniq, inverse = np.unique(keys, return_inverse=True)
+    n_user = len(rows)
+    u = np.zeros(len(uniq))
+    u[inverse[:n_user]] = user_prob
+    c = np.zeros(len(uniq))
+    c[inverse[n_user:]] = comm_vals
+    out_counts = np.zeros(len(uniq), dtype=np.int64)
+    out_counts[inverse[:n_user]] = counts
+    out_rows = uniq // n_cols
+    out_cols = uniq % n_cols
+
+    w = weights[out_rows]
+    blended = has_community[out_rows] & (w < 1.0)
+    final = np.where(blended, w * u + (1 - w) * c, u)
+    # 没有任何话题的行完全使用社区均值
+    final = np.where(total[out_rows] == 0, c, final)
+    return out_rows, out_cols, out_counts, final, blended
+
+
+def _render_topic_entries(
+    names: List[str],
+    counts: np.ndarray,
+    final: np.ndarray,
+    blended: np.ndarray,
+    confidence_weight: float,
+) -> Dict[str, Dict[str, Any]]:
+    """把一行的向量结果组装为 `calculate_topic_probability` 的结果字典。"""
+    result = {}
+    for name, count, prob, mixed in zip(names, counts.tolist(), final.tolist(), blended.tolist()):
+        if mixed and confidence_weight <= 0.8:
+            expl = f"数据较少，融合社区均值后概率为 {prob:.1%}"
         else:
-            final_prob = u_prob
-            expl = f"基于历史数据({counts.get(tech, 0)}次)，参与概率为 {final_prob:.1%}"
-            
-        final_probs[tech] = {
-            "probability": round(final_prob, 4),
-            "count": counts.get(tech, 0),
+            expl = f"基于历史数据({count}次)，参与概率为 {prob:.1%}"
+        result[name] = {
+            "probability": round(prob, 4),
+            "count": count,
             "explanation": expl
         }
-        
-    return final_probs
+    return result
+
+
+def _community_only_entries(community_average: Optional[Dict[str, float]]) -> Dict[str, Dict[str, Any]]:
+    """无历史数据：完全使用社区数据"""
+    result = {}
+    for tech, prob in (community_average or {}).items():
+        result[tech] = {
+            "probability": prob,
+            "count": 0,
+            "explanation": f"无历史数据，基于社区均值推断概率为 {prob:.1%}"
+        }
+    return result
+
+
+def topic_count_matrix(
+    topics_per_user: List[List[Any]],
+    vocab: Optional[TechVocabulary] = None,
+) -> sparse.csr_matrix:
+    """
+    把每个用户的话题 / 语言列表转换为 用户 × 技术 的稀疏计数矩阵（列为词表 ID）。
+
+    列表元素可以是规范 ID（见 `TechVocabulary.canonical_id`）或按原样登记的名称。
+    未知名称登记在 vocab 中，后续 `calculate_topic_probability_batch` 须传入同一词表。
+    """
+    vocab = vocab or TECH_VOCAB.local()
+    lengths = [len(topics) for topics in topics_per_user]
+    cols = (
+        np.concatenate([_tech_ids(topics, vocab) for topics in topics_per_user if len(topics)])
+        if any(lengths) else np.zeros(0, dtype=np.int64)
+    )
+    rows = np.repeat(np.arange(len(topics_per_user)), lengths)
+    matrix = sparse.coo_matrix(
+        (np.ones(len(cols), dtype=np.int64), (rows, cols)),
+        shape=(len(topics_per_user), max(len(vocab), int(cols.max(initial=-1)) + 1)),
+    ).tocsr()
+    matrix.sum_duplicates()
+    return matrix
+
+
+class TopicProbabilityBatch:
+    """
+    批量技术倾向结果。
+
+    probabilities 为 用户 × 技术 的 CSR 概率矩阵（列为词表 ID），
+    非零结构覆盖每个用户的 用户技术 ∪ 社区技术（保留显式的 0）；
+    解释文本不预先生成，只在 `row()` 取出某个用户时渲染。
+    """
+
+    __slots__ = ("probabilities", "counts", "blended", "weights", "totals", "community", "vocab")
+
+    def __init__(
+        self,
+        probabilities: sparse.csr_matrix,
+        counts: np.ndarray,
+        blended: np.ndarray,
+        weights: np.ndarray,
+        totals: np.ndarray,
+        community: List[Optional[Dict[str, float]]],
+        vocab: TechVocabulary,
+    ) -> None:
+        self.probabilities = probabilities
+        self.counts = counts
+        self.blended = blended
+        self.weights = weights
+        self.totals = totals
+        self.community = community
+        self.vocab = vocab
+
+    def __len__(self) -> int:
+        return self.probabilities.shape[0]
+
+    def row(self, i: int, top_k: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """第 i 个用户的结果字典（与 `calculate_topic_probability` 相同），可只取概率最高的 top_k 项。"""
+        if self.totals[i] == 0:
+            result = _community_only_entries(self.community[i])
+            if top_k is not None:
+                result = dict(sorted(result.items(), key=lambda x: x[1]["probability"], reverse=True)[:top_k])
+            return result
+        lo, hi = self.probabilities.indptr[i], self.probabilities.indptr[i + 1]
+        index = np.arange(lo, hi)
+        if top_k is not None:
+            index = index[np.argsort(-self.probabilities.data[lo:hi], kind="stable")[:top_k]]
+        return _render_topic_entries(
+            self.vocab.names(self.probabilities.indices[index].tolist()),
+            self.counts[index],
+            self.probabilities.data[index],
+            self.blended[index],
+            float(self.weights[i]),
+        )
+
+
+def calculate_topic_probability_batch(
+    counts: Any,
+    alpha: float = 1.0,
+    community_average: Any = None,
+    confidence_weight: Any = 1.0,
+    vocab: Optional[TechVocabulary] = None,
+) -> TopicProbabilityBatch:
+    """
+    批量计算技术倾向概率（公式同 `calculate_topic_probability`）。
+
+    参数：
+        counts: 用户 × 技术 的稀疏计数矩阵，列为词表 ID（见 `topic_count_matrix`）
+        alpha: 拉普拉斯平滑参数
+        community_average: 社区平均倾向：所有用户共用一个字典，或每个用户一个字典（可为 None）
+        confidence_weight: 置信度权重：标量或每个用户一个值
+        vocab: 技术词表（默认为基于全局词表的临时请求级词表）
+
+    返回值：
+        `TopicProbabilityBatch`；对每个用户 row(i) 与单用户函数的结果逐位一致。
+    """
+    vocab = vocab or TECH_VOCAB.local()
+    matrix = sparse.csr_matrix(counts)
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    if matrix.nnz and int(matrix.indices.max()) >= len(vocab):
+        raise ValueError("计数矩阵含词表之外的技术 ID，请传入构造矩阵时使用的词表")
+    n_users = matrix.shape[0]
+    coo = matrix.tocoo()
+
+    if isinstance(community_average, dict) or community_average is None:
+        community = [community_average] * n_users
+    else:
+        community = list(community_average)
+        if len(community) != n_users:
+            raise ValueError("community_average 的长度与用户数不一致")
+    # 按字典对象分组，每个不同的社区分布只转换一次
+    groups: Dict[int, Tuple[Dict[str, float], List[int]]] = {}
+    for u, mapping in enumerate(community):
+        if mapping:
+            groups.setdefault(id(mapping), (mapping, []))[1].append(u)
+    comm_rows, comm_cols, comm_vals = [], [], []
+    for mapping, users in groups.values():
+        ids, vals = vocab.vector(mapping)
+        comm_rows.append(np.repeat(np.asarray(users, dtype=np.int64), len(ids)))
+        comm_cols.append(np.tile(ids, len(users)))
+        comm_vals.append(np.tile(vals, len(users)))
+    has_community = np.array([bool(m) for m in community], dtype=bool)
+    weights = np.broadcast_to(np.asarray(confidence_weight, dtype=np.float64), (n_users,))
+
+    out_rows, out_cols, out_counts, final, blended = _topic_probability_coo(
+        coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data.astype(np.int64),
+        n_users, alpha,
+        np.concatenate(comm_rows) if comm_rows else np.zeros(0, dtype=np.int64),
+        np.concatenate(comm_cols) if comm_cols else np.zeros(0, dtype=np.int64),
+        np.concatenate(comm_vals) if comm_vals else np.zeros(0),
+        has_community, weights,
+    )
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(out_rows, minlength=n_users))))
+    n_cols = max(matrix.shape[1], len(vocab), int(out_cols.max(initial=-1)) + 1)
+    probabilities = sparse.csr_matrix((final, out_cols, indptr), shape=(n_users, n_cols))
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    return TopicProbabilityBatch(probabilities, out_counts, blended, weights, totals, community, vocab)
+
+
+# loc=0 的 Weibull MLE 牛顿迭代初值：社区"中等活跃"开发者的形状参数
+_WEIBULL_WARM_START_SHAPE = get_community_average_time_params("medium")["weibull_k"]
+
+
+def fit_weibull_mle(
+    intervals: List[float],
+    initial_shape: Optional[float] = None,
+    tol: float = 1e-10,
+    max_iter: int = 60,
+) -> Optional[Tuple[float, float]]:
+    """
+    位置参数固定为 0 的 Weibull 极大似然估计。
+
+    数学原理：
+    固定 loc=0 时，形状参数 $k$ 的 MLE 是下面单调递增方程的唯一根：
+    $$g(k) = \\frac{\\sum x_i^k \\ln x_i}{\\sum x_i^k} - \\frac{1}{k} - \\overline{\\ln x} = 0$$
+    用带区间保护的牛顿法求解（步长越界时改为二分），尺度参数为闭式解：
+    $$\\lambda = \\left(\\frac{1}{n} \\sum x_i^k\\right)^{1/k}$$
+
+    与 `stats.weibull_min.fit(intervals, floc=0)`（通用 Nelder-Mead 优化）求的是同一个极值，
+    但收敛到机器精度、速度快一个数量级以上。
+
+    参数：
+        intervals: 正的间隔样本（天）
+        initial_shape: 牛顿迭代初值（默认取社区中等活跃开发者的形状参数）
+        tol: 形状参数的相对收敛阈值
+        max_iter: 最大迭代次数
+
+    返回值：
+        (shape, scale)；样本退化（全部相等、含非正值）或未收敛时返回 None，
+        由调用方回退到 scipy。
+    """
+    x = np.asarray(intervals, dtype=np.float64)
+    if x.size < 2 or not np.all(x > 0) or not np.all(np.isfinite(x)):
+        return None
+    log_x = np.log(x)
+    if not np.ptp(log_x) > 0:
+        # 所有间隔相同：似然随 k 无界增大，不存在有限的 MLE
+        return None
+    mean_log = log_x.mean()
+    # 以最大值为基准计算 x^k，避免 k 较大时溢出
+    shifted = log_x - log_x.max()
+
+    k = float(initial_shape or _WEIBULL_WARM_START_SHAPE)
+    lo, hi = 0.0, np.inf
+    for _ in range(max_iter):
+        w = np.exp(k * shifted)
+        w_sum = w.sum()
+        a = (w @ log_x) / w_sum
+        c = (w @ (log_x * log_x)) / w_sum
+        g = a - 1.0 / k - mean_log
+        if g > 0:
+            hi = min(hi, k)
+        else:
+            lo = max(lo, k)
+        # g'(k) = Var_w(ln x) + 1/k^2 > 0
+        k_next = k - g / (c - a * a + 1.0 / (k * k))
+        # 先判断收敛：已收敛时舍入噪声可能让牛顿步略微越过区间端点，不应因此改为二分
+        if abs(k_next - k) <= tol * k:
+            k = k_next
+            break
+        if not lo < k_next < hi:
+            k_next = (lo + hi) / 2 if np.isfinite(hi) else k * 2
+        k = k_next
+    else:
+        return None
+
+    scale = np.exp(log_x.max() + np.log(np.exp(k * shifted).mean()) / k)
+    if not (np.isfinite(k) and np.isfinite(scale) and k > 0 and scale > 0):
+        return None
+    return np.float64(k), np.float64(scale)
+
+
+def _fit_weibull_mle_segments(
+    log_x: np.ndarray,
+    counts: np.ndarray,
+    initial_shape: Optional[float] = None,
+    tol: float = 1e-10,
+    max_iter: int = 60,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `fit_weibull_mle` 的分段向量化版本：一次求解多组样本的 Weibull MLE。
+
+    log_x 是各组 ln(间隔) 首尾相接的扁平数组，counts 为每组的样本数（均 >= 2）。
+    每轮迭代用 `np.add.reduceat` 做分段求和，所有组同步执行相同的带区间保护的牛顿步；
+    已收敛的组从工作数组中剔除，后续迭代只处理未收敛的组。
+
+    返回值：
+        (shape, scale, ok)；ok 为 False 的组（样本退化或未收敛）需由调用方逐组回退。
+    """
+    n_groups = len(counts)
+    shape = np.full(n_groups, np.nan)
+    scale = np.full(n_groups, np.nan)
+    if n_groups == 0:
+        return shape, scale, np.zeros(0, dtype=bool)
+
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    seg_max = np.maximum.reduceat(log_x, starts)
+    seg_min = np.minimum.reduceat(log_x, starts)
+    mean_log = np.add.reduceat(log_x, starts) / counts
+    shifted_all = log_x - np.repeat(seg_max, counts)
+
+    # 所有间隔相同的组不存在有限的 MLE，直接交给回退路径
+    active = np.flatnonzero(seg_max > seg_min)
+    elem_mask = np.repeat(seg_max > seg_min, counts)
+    cur_counts = counts[active]
+    cur_log = log_x[elem_mask]
+    cur_shifted = shifted_all[elem_mask]
+
+    k = np.full(len(active), float(initial_shape or _WEIBULL_WARM_START_SHAPE))
+    lo = np.zeros(len(active))
+    hi = np.full(len(active), np.inf)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        cur_starts = np.concatenate(([0], np.cumsum(cur_counts)[:-1]))
+        w = np.exp(np.repeat(k, cur_counts) * cur_shifted)
+        wl = w * cur_log
+        w_sum = np.add.reduceat(w, cur_starts)
+        a = np.add.reduceat(wl, cur_starts) / w_sum
+        c = np.add.reduceat(wl * cur_log, cur_starts) / w_sum
+        g = a - 1.0 / k - mean_log[active]
+        hi = np.where(g > 0, np.minimum(hi, k), hi)
+        lo = np.where(g > 0, lo, np.maximum(lo, k))
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            k_next = k - g / (c - a * a + 1.0 / (k * k))
+        converged = np.abs(k_next - k) <= tol * k
+        outside = ~converged & ~((lo < k_next) & (k_next < hi))
+        k_next = np.where(
+            outside, np.where(np.isfinite(hi), (lo + hi) / 2, k * 2), k_next
+        )
+        k = k_next
+
+        if converged.any():
+            done = active[converged]
+            shape[done] = k[converged]
+            keep = ~converged
+            elem_keep = np.repeat(keep, cur_counts)
+            active, k, lo, hi = active[keep], k[keep], lo[keep], hi[keep]
+            cur_counts = cur_counts[keep]
+            cur_log = cur_log[elem_keep]
+            cur_shifted = cur_shifted[elem_keep]
+
+    fitted = np.isfinite(shape)
+    if fitted.any():
+        elem_fitted = np.repeat(fitted, counts)
+        fit_counts = counts[fitted]
+        fit_starts = np.concatenate(([0], np.cumsum(fit_counts)[:-1]))
+        k_fit = shape[fitted]
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            w_mean = np.add.reduceat(
+                np.exp(np.repeat(k_fit, fit_counts) * shifted_all[elem_fitted]), fit_starts
+            ) / fit_counts
+            scale[fitted] = np.exp(seg_max[fitted] + np.log(w_mean) / k_fit)
+    ok = np.isfinite(shape) & np.isfinite(scale) & (shape > 0) & (scale > 0)
+    return shape, scale, ok
 
 
 def fit_time_distribution(
     timestamps: List[str],
     fallback_to_exponential: bool = True,
+    memo: Optional[FitMemo] = None,
+    bootstrap_resamples: int = 0,
 ) -> Dict[str, Any]:
     """
     拟合活跃时间分布（Weibull 或 Exponential）。
@@ -269,77 +751,162 @@ def fit_time_distribution(
     参数：
         timestamps: ISO 格式的时间戳列表
         fallback_to_exponential: 若 Weibull 拟合失败，是否降级为指数分布
+        memo: 拟合结果缓存；按有效间隔数组的内容哈希复用之前的拟合结果
+        bootstrap_resamples: > 0 时，Weibull 拟合结果附带 "confidence_intervals"
+            （见 `bootstrap_time_intervals`）
         
     返回值：
         包含分布类型、参数、期望间隔、未来30天活跃概率的字典。
     """
     if not timestamps or len(timestamps) < 2:
-        return {
-            "distribution_type": "Insufficient Data",
-            "params": {},
-            "expected_interval_days": 0.0,
-            "next_active_prob_30d": 0.0,
-            "intervals": [],
-            "explanation": "数据不足，无法拟合时间分布"
-        }
+        return _insufficient_data_result()
         
     # 1. 解析时间戳并计算间隔
     try:
-        dates = [date_parser.parse(ts) for ts in timestamps]
-        dates.sort()
-        
-        intervals = []
-        for i in range(len(dates) - 1):
-            delta = dates[i+1] - dates[i]
-            intervals.append(delta.total_seconds() / 86400.0) # 转换为天
+        # 批量解析为微秒整数后排序、差分（与逐个 timedelta.total_seconds() 的结果逐位一致）
+        moments = np.sort(_parse_timestamps_us(timestamps))
+        days = np.diff(moments).astype(np.float64) / 1e6 / 86400.0  # 转换为天
             
         # 过滤掉极小的间隔 (如同一次 push 的多个 commit)
-        intervals = [i for i in intervals if i > 0.01]
+        kept = days[days > 0.01]
+        intervals = kept.tolist()
         
         if len(intervals) < 3:
-             return {
-                "distribution_type": "Insufficient Intervals",
-                "params": {},
-                "expected_interval_days": np.mean(intervals) if intervals else 0,
-                "next_active_prob_30d": 0.5, # 默认值
-                "intervals": intervals,
-                "explanation": "有效间隔不足，无法准确拟合"
-            }
+            return _insufficient_intervals_result(intervals)
             
     except Exception as e:
-        return {
-            "distribution_type": "Error",
-            "params": {"error": str(e)},
-            "expected_interval_days": 0.0,
-            "next_active_prob_30d": 0.0,
-            "intervals": [],
-            "explanation": f"时间戳解析错误: {str(e)}"
-        }
+        return _error_result(e)
+
+    # 2. 拟合分布（结果只取决于有效间隔序列，按其内容哈希缓存）
+    #    点估计与 bootstrap 置信区间分开缓存：不带置信区间的调用（/api/match）
+    #    与带置信区间的调用（/api/analyze）共用同一份点估计
+    digest = array_digest(kept) if memo is not None else None
+    if memo is not None:
+        result, shape = memo.get_or_compute(
+            ("fit_time_distribution", fallback_to_exponential, digest),
+            lambda: _fit_point(intervals, fallback_to_exponential),
+        )
+    else:
+        result, shape = _fit_point(intervals, fallback_to_exponential)
+
+    if bootstrap_resamples > 0 and shape is not None:
+        def compute_intervals() -> Optional[Dict[str, Any]]:
+            return bootstrap_time_intervals(intervals, n_resamples=bootstrap_resamples, initial_shape=shape)
+
+        if memo is not None:
+            result["confidence_intervals"] = memo.get_or_compute(
+                ("bootstrap_time_intervals", bootstrap_resamples, digest), compute_intervals
+            )
+        else:
+            result["confidence_intervals"] = compute_intervals()
+    return result
+
 
-    # 2. 拟合分布
+def _insufficient_data_result() -> Dict[str, Any]:
+    return {
+        "distribution_type": "Insufficient Data",
+        "params": {},
+        "expected_interval_days": 0.0,
+        "next_active_prob_30d": 0.0,
+        "intervals": [],
+        "explanation": "数据不足，无法拟合时间分布"
+    }
+
+
+def _insufficient_intervals_result(intervals: List[float]) -> Dict[str, Any]:
+    return {
+        "distribution_type": "Insufficient Intervals",
+        "params": {},
+        "expected_interval_days": np.mean(intervals) if intervals else 0,
+        "next_active_prob_30d": 0.5, # 默认值
+        "intervals": intervals,
+        "explanation": "有效间隔不足，无法准确拟合"
+    }
+
+
+def _error_result(e: Exception) -> Dict[str, Any]:
+    return {
+        "distribution_type": "Error",
+        "params": {"error": str(e)},
+        "expected_interval_days": 0.0,
+        "next_active_prob_30d": 0.0,
+        "intervals": [],
+        "explanation": f"时间戳解析错误: {str(e)}"
+    }
+
+
+def _round_weibull_values(shape: Any, scale: Any, expected_interval: Any, prob_30d: Any) -> Tuple[Any, Any, Any, Any]:
+    """
+    Weibull 结果字段的取整规则，单用户与批量路径共用（标量或整列数组均可）。
+
+    拟合值均为 np.float64，其 `round()` 即逐元素的 `np.round`，这里统一用 `np.round`，
+    两条路径的取整结果与类型逐位一致。
+    """
+    return (
+        np.round(shape, 4), np.round(scale, 4),
+        np.round(expected_interval, 2), np.round(prob_30d, 4),
+    )
+
+
+def _weibull_result(
+    shape: float,
+    scale: float,
+    expected_interval: float,
+    prob_30d: float,
+    rounded_intervals: List[float],
+    rounded: Optional[Tuple[float, float, float, float]] = None,
+) -> Dict[str, Any]:
+    """rounded: 批量路径整列取整后的 (shape, scale, expected_interval, prob_30d)。"""
+    if rounded is None:
+        rounded = _round_weibull_values(
+            np.float64(shape), np.float64(scale), np.float64(expected_interval), np.float64(prob_30d)
+        )
+    return {
+        "distribution_type": "Weibull",
+        "params": {
+            "shape": rounded[0],
+            "scale": rounded[1]
+        },
+        "expected_interval_days": rounded[2],
+        "next_active_prob_30d": rounded[3],
+        "intervals": rounded_intervals,
+        "explanation": f"基于 Weibull 分布拟合(k={shape:.2f})，预测下次活跃倾向于在 {expected_interval:.1f} 天内"
+    }
+
+
+def _fit_intervals(intervals: List[float], fallback_to_exponential: bool = True) -> Dict[str, Any]:
+    """对已过滤的有效间隔（至少 3 个）拟合分布，返回 `fit_time_distribution` 的结果字典。"""
+    return _fit_point(intervals, fallback_to_exponential)[0]
+
+
+def _fit_point(
+    intervals: List[float],
+    fallback_to_exponential: bool = True,
+) -> Tuple[Dict[str, Any], Optional[float]]:
+    """同 `_fit_intervals`，另返回 Weibull 形状参数（bootstrap 的牛顿迭代初值；降级结果为 None）。"""
     try:
-        # 尝试 Weibull 拟合
-        # scipy.stats.weibull_min.fit 返回 (shape, loc, scale)
-        # 我们通常固定 loc=0
-        shape, loc, scale = stats.weibull_min.fit(intervals, floc=0)
-        
-        # 计算期望值 (Mean)
-        expected_interval = stats.weibull_min.mean(shape, loc=loc, scale=scale)
-        
-        # 计算未来 30 天活跃概率 (CDF at t=30)
-        prob_30d = stats.weibull_min.cdf(30, shape, loc=loc, scale=scale)
+        # 尝试 Weibull 拟合（固定 loc=0）
+        # 优先使用专用的牛顿法 MLE，样本退化或不收敛时回退到 scipy 的通用优化器
+        fitted = fit_weibull_mle(intervals)
+        if fitted is not None:
+            shape, scale = fitted
+            # 期望值 (Mean) 与未来 30 天活跃概率 (CDF at t=30) 的闭式解
+            expected_interval = scale * special.gamma(1 + 1 / shape)
+            prob_30d = -np.expm1(-(30 / scale) ** shape)
+        else:
+            # scipy.stats.weibull_min.fit 返回 (shape, loc, scale)
+            shape, loc, scale = stats.weibull_min.fit(intervals, floc=0)
+            
+            # 计算期望值 (Mean)
+            expected_interval = stats.weibull_min.mean(shape, loc=loc, scale=scale)
+            
+            # 计算未来 30 天活跃概率 (CDF at t=30)
+            prob_30d = stats.weibull_min.cdf(30, shape, loc=loc, scale=scale)
         
-        return {
-            "distribution_type": "Weibull",
-            "params": {
-                "shape": round(shape, 4),
-                "scale": round(scale, 4)
-            },
-            "expected_interval_days": round(expected_interval, 2),
-            "next_active_prob_30d": round(prob_30d, 4),
-            "intervals": [round(i, 2) for i in intervals],
-            "explanation": f"基于 Weibull 分布拟合(k={shape:.2f})，预测下次活跃倾向于在 {expected_interval:.1f} 天内"
-        }
+        result = _weibull_result(
+            shape, scale, expected_interval, prob_30d, [round(i, 2) for i in intervals]
+        )
+        return result, float(shape)
         
     except Exception as e:
         if fallback_to_exponential:
@@ -360,7 +927,7 @@ def fit_time_distribution(
                     "next_active_prob_30d": round(prob_30d, 4),
                     "intervals": [round(i, 2) for i in intervals],
                     "explanation": f"Weibull 拟合失败，降级为指数分布。平均间隔 {expected_interval:.1f} 天"
-                }
+                }, None
             except Exception as e2:
                 pass
         
@@ -373,7 +940,227 @@ def fit_time_distribution(
             "next_active_prob_30d": 0.5,
             "intervals": [round(i, 2) for i in intervals],
             "explanation": f"拟合失败，使用简单平均值: {mean_val:.1f} 天"
-        }
+        }, None
+
+
+# 元素预算把重采样次数压到低于该值时，百分位区间不可靠，不再计算
+BOOTSTRAP_MIN_RESAMPLES = 20
+
+
+def bootstrap_time_intervals(
+    intervals: List[float],
+    n_resamples: int = 200,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+    max_elements: int = 100_000,
+    initial_shape: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    期望间隔与未来 30 天活跃概率的 bootstrap 置信区间（百分位法）。
+
+    所有重采样组成一个 (B, n) 矩阵一次生成，用 `_fit_weibull_mle_segments`
+    同时拟合全部 B 组（以点估计的形状参数为牛顿迭代初值），再用闭式解得到每组的
+    期望值与 CDF(30)，不做任何逐组的 scipy 拟合。
+
+    为控制延迟，重采样次数取 n_resamples 与 max_elements // n 中的较小者，
+    耗时与 B × n 成正比：默认预算下 1,000 个间隔取 100 次重采样，约 7-10ms。
+    预算只够不到 BOOTSTRAP_MIN_RESAMPLES 次（且调用方要求的次数更多）时返回 None。
+
+    参数：
+        intervals: 有效间隔（天），至少 3 个
+        n_resamples: 重采样次数上限
+        confidence: 置信水平
+        seed: 随机种子（默认固定，使同一输入的区间稳定、可缓存）
+        max_elements: 单次重采样矩阵的元素数上限（B × n）
+        initial_shape: 牛顿迭代初值（通常为点估计的形状参数）
+
+    返回值：
+        {"expected_interval_days": [下限, 上限], "next_active_prob_30d": [下限, 上限],
+         "confidence": 置信水平, "n_resamples": 有效重采样次数}；
+        样本不足、退化、超出元素预算或没有可用的重采样时返回 None。
+    """
+    x = np.asarray(intervals, dtype=np.float64)
+    n = x.size
+    if n < 3 or not np.all(x > 0) or not np.all(np.isfinite(x)):
+        return None
+    resamples = min(n_resamples, max_elements // n)
+    if resamples < 1 or resamples < min(n_resamples, BOOTSTRAP_MIN_RESAMPLES):
+        return None
+    rng = np.random.default_rng(seed)
+    log_x = np.log(x)[rng.integers(0, n, size=(resamples, n))].ravel()
+
+    shape, scale, ok = _fit_weibull_mle_segments(
+        log_x, np.full(resamples, n, dtype=np.int64), initial_shape
+    )
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        expected = scale * special.gamma(1 + 1 / shape)
+        prob_30d = -np.expm1(-(30 / scale) ** shape)
+    ok &= np.isfinite(expected) & np.isfinite(prob_30d)
+    if not ok.any():
+        return None
+
+    tail = (1 - confidence) / 2 * 100
+    expected_lo, expected_hi = np.percentile(expected[ok], [tail, 100 - tail])
+    prob_lo, prob_hi = np.percentile(prob_30d[ok], [tail, 100 - tail])
+    return {
+        "expected_interval_days": [round(float(expected_lo), 2), round(float(expected_hi), 2)],
+        "next_active_prob_30d": [round(float(prob_lo), 4), round(float(prob_hi), 4)],
+        "confidence": confidence,
+        "n_resamples": int(ok.sum()),
+    }
+
+
+def _round_array(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    向量化的 Python `round(v, ndigits)`，结果逐位一致。
+
+    `np.round` 先放大再取整，只有放大后恰好落在 .5 附近时才可能与 Python 的
+    十进制精确取整不同，这些元素（去重后）单独用 `round` 重算。
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 10.0 ** ndigits
+    rounded = np.round(values, ndigits)
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        uniq, inverse = np.unique(values[ties], return_inverse=True)
+        rounded[ties] = np.array([round(v, ndigits) for v in uniq.tolist()])[inverse]
+    return rounded
+
+
+def _round_floats(values: np.ndarray, ndigits: int) -> List[float]:
+    """`[round(v, ndigits) for v in values.tolist()]` 的向量化版本。"""
+    return _round_array(values, ndigits).tolist()
+
+
+def fit_time_distribution_batch(
+    timestamps: Any,
+    offsets: Optional[Any] = None,
+    fallback_to_exponential: bool = True,
+    include_intervals: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    批量拟合多个开发者的活跃时间分布（预热 / 离线打分）。
+
+    与逐个调用 `fit_time_distribution` 的结果一致（同样的结果字典、同样的分支与回退），
+    但解析、排序、差分、过滤、Weibull 牛顿迭代、期望值与 30 天 CDF 都在扁平数组上
+    一次完成，Python 层只剩组装结果字典的循环。
+
+    参数：
+        timestamps: 两种形式之一：
+            - offsets 为 None 时：每个开发者一个时间戳列表（ragged 列表）；
+            - 否则：所有开发者首尾相接的扁平数组，可以是 ISO 格式字符串、
+              datetime64 或 int64 微秒时间戳。
+        offsets: CSR 风格的偏移数组（长度为 开发者数 + 1），
+            第 u 个开发者的时间戳为 timestamps[offsets[u]:offsets[u + 1]]
+        fallback_to_exponential: 同 `fit_time_distribution`
+        include_intervals: 为 False 时结果中的 "intervals" 为空列表，
+            省去逐个间隔取整（大规模打分时这部分占大头）
+
+    返回值：
+        与开发者顺序一致的结果字典列表。
+    """
+    if offsets is None:
+        lists = [list(ts) if ts is not None else [] for ts in timestamps]
+        offsets = np.concatenate(([0], np.cumsum([len(ts) for ts in lists]))).astype(np.int64)
+        flat: Any = [t for ts in lists for t in ts]
+    else:
+        offsets = np.asarray(offsets, dtype=np.int64)
+        flat = timestamps
+    if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0 or np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets 必须是从 0 开始的非递减数组")
+
+    n_users = len(offsets) - 1
+    sizes = np.diff(offsets)
+    owner = np.repeat(np.arange(n_users), sizes)
+    errors: Dict[int, Exception] = {}
+
+    # 1. 解析为 int64 微秒
+    arr = np.asarray(flat)
+    if arr.size != offsets[-1]:
+        raise ValueError("timestamps 的长度与 offsets[-1] 不一致")
+    if arr.dtype.kind == "M":
+        us = arr.astype("datetime64[us]").astype(np.int64)
+    elif arr.dtype.kind in "iu":
+        us = arr.astype(np.int64)
+    else:
+        # 无法解析的时间戳只让所属开发者得到 Error 结果（与单用户路径一样取第一个出错的）
+        bad: Dict[int, Exception] = {}
+        us, aware = _parse_timestamps_us_aware(arr if arr.dtype.kind == "U" else list(flat), bad)
+        for i in sorted(bad):
+            errors.setdefault(int(owner[i]), bad[i])
+        # 同一开发者内带时区与不带时区混用
+        aware_count = np.bincount(owner, weights=aware, minlength=n_users)
+        for u in np.flatnonzero((aware_count > 0) & (aware_count < sizes)):
+            errors.setdefault(u, TypeError(_MIXED_TZ_ERROR))
+
+    # 2. 分组排序、差分，过滤极小间隔
+    # owner 本身已按开发者分组递增，按 (owner, 全局时间排名) 组成的 int64 键排一次序即可
+    # 得到每组内按时间排序的结果，比 np.lexsort 快约 3 倍
+    n = len(us)
+    by_time = np.argsort(us)
+    rank = np.empty(n, dtype=np.int64)
+    rank[by_time] = np.arange(n)
+    moments = us[by_time[np.sort(owner * n + rank) % n]]
+    days = np.diff(moments).astype(np.float64) / 1e6 / 86400.0
+    keep = (owner[1:] == owner[:-1]) & (days > 0.01)
+    values = days[keep]
+    counts = np.bincount(owner[1:][keep], minlength=n_users)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+
+    # 3. 对有效间隔 >= 3 的开发者一次性求解 Weibull MLE
+    fit_users = np.flatnonzero((counts >= 3) & (sizes >= 2))
+    if errors:
+        fit_users = fit_users[~np.isin(fit_users, list(errors))]
+    fit_counts = counts[fit_users]
+    fit_values = values[np.repeat(np.isin(np.arange(n_users), fit_users), counts)]
+    shape, scale, ok = _fit_weibull_mle_segments(np.log(fit_values), fit_counts)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        expected = scale * special.gamma(1 + 1 / shape)
+        prob_30d = -np.expm1(-(30 / scale) ** shape)
+    ok &= np.isfinite(expected) & np.isfinite(prob_30d)
+    fit_index = np.full(n_users, -1)
+    fit_index[fit_users] = np.arange(len(fit_users))
+
+    # 4. 组装结果（取整整列完成，循环内只做切片与构造字典）
+    value_list = values.tolist()
+    rounded_list = _round_floats(values, 2) if include_intervals else None
+    columns = (
+        list(shape), list(scale), list(expected), list(prob_30d),
+        *(list(col) for col in _round_weibull_values(shape, scale, expected, prob_30d)),
+    )
+    ok_list = ok.tolist()
+    fit_index_list = fit_index.tolist()
+    starts_list = starts.tolist()
+    results: List[Dict[str, Any]] = []
+    for u, size in enumerate(sizes.tolist()):
+        if size < 2:
+            results.append(_insufficient_data_result())
+            continue
+        if u in errors:
+            results.append(_error_result(errors[u]))
+            continue
+        lo, hi = starts_list[u], starts_list[u + 1]
+        intervals = value_list[lo:hi]
+        if len(intervals) < 3:
+            result = _insufficient_intervals_result(intervals)
+            if not include_intervals:
+                result["intervals"] = []
+            results.append(result)
+            continue
+        i = fit_index_list[u]
+        if not ok_list[i]:
+            # 样本退化或未收敛：与单用户路径相同，回退到 scipy / 指数分布 / 简单平均
+            result = _fit_intervals(intervals, fallback_to_exponential)
+            if not include_intervals:
+                result["intervals"] = []
+            results.append(result)
+            continue
+        results.append(_weibull_result(
+            columns[0][i], columns[1][i], columns[2][i], columns[3][i],
+            rounded_list[lo:hi] if include_intervals else [],
+            rounded=(columns[4][i], columns[5][i], columns[6][i], columns[7][i]),
+        ))
+    return results
 
 
 def calculate_match_score(
@@ -422,36 +1209,225 @@ def calculate_match_score(
     score = round(score, 4)
     
     # 确定匹配等级
-    if score >= 0.8:
-        level = "极高匹配"
-    elif score >= 0.6:
-        level = "高度匹配"
-    elif score >= 0.4:
-        level = "中等匹配"
-    elif score >= 0.2:
-        level = "低度契合"
-    else:
-        level = "不匹配"
-        
-    # 生成解释
-    explanation = (
-        f"综合评分 {score:.2f} ({level})。 "
-        f"技术契合度贡献: {tech_prob * tech_weight:.2f}, "
-        f"活跃度贡献: {active_prob_30d * active_weight:.2f}。"
-    )
-    
-    if not matched_key:
-        explanation += f" 注意：未在历史记录中找到 {target_tech} 相关项目。"
+    level = MATCH_LEVELS[_match_level_code(score)]
         
     return {
         "score": score,
         "level": level,
         "tech_contribution": round(tech_prob * tech_weight, 4),
         "active_contribution": round(active_prob_30d * active_weight, 4),
-        "explanation": explanation
+        "explanation": _match_explanation(
+            score, level, tech_prob * tech_weight, active_prob_30d * active_weight,
+            target_tech, matched_key is not None,
+        )
     }
 
 
+# 匹配等级（由低到高）及其分数下限
+MATCH_LEVELS = ("不匹配", "低度契合", "中等匹配", "高度匹配", "极高匹配")
+_MATCH_LEVEL_BOUNDS = np.array([0.2, 0.4, 0.6, 0.8])
+
+
+def _match_level_code(score: Any) -> Any:
+    """分数 → MATCH_LEVELS 下标（标量或数组）。"""
+    return np.searchsorted(_MATCH_LEVEL_BOUNDS, score, side="right")
+
+
+def _match_explanation(
+    score: float,
+    level: str,
+    tech_contribution: float,
+    active_contribution: float,
+    target_tech: str,
+    matched: bool,
+) -> str:
+    explanation = (
+        f"综合评分 {score:.2f} ({level})。 "
+        f"技术契合度贡献: {tech_contribution:.2f}, "
+        f"活跃度贡献: {active_contribution:.2f}。"
+    )
+    
+    if not matched:
+        explanation += f" 注意：未在历史记录中找到 {target_tech} 相关项目。"
+    return explanation
+
+
+def tendency_matrix(
+    tendencies: List[Dict[str, Any]],
+    vocab: Optional[TechVocabulary] = None,
+) -> sparse.csr_matrix:
+    """
+    把多个技术倾向字典（`calculate_topic_probability` 的返回值，或 {名称: 概率}）
+    转换为 用户 × 技术 的 CSR 概率矩阵（列为词表 ID）。
+
+    字典中出现的每个技术都作为显式元素保存（概率为 0 也保留），用于区分"未找到"。
+    """
+    vocab = vocab or TECH_VOCAB.local()
+    rows, cols, vals = [], [], []
+    for i, tendency in enumerate(tendencies):
+        for key, value in tendency.items():
+            rows.append(i)
+            cols.append(vocab.intern(key))
+            vals.append(value.get("probability", 0.0) if isinstance(value, dict) else float(value))
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    order = np.lexsort((cols, rows))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(tendencies)))))
+    return sparse.csr_matrix(
+        (np.asarray(vals, dtype=np.float64)[order], cols[order], indptr),
+        shape=(len(tendencies), len(vocab)),
+    )
+
+
+class MatchMatrix:
+    """
+    用户 × 目标技术 的匹配度结果。
+
+    scores / tech_contribution / active_contribution 为取整后的矩阵，
+    level_codes 为 MATCH_LEVELS 的下标矩阵；解释文本只在 `result()` / `row()` 取出时生成。
+    """
+
+    __slots__ = (
+        "target_techs", "scores", "level_codes", "tech_contribution", "active_contribution",
+        "matched", "_tech_raw", "_active_raw",
+    )
+
+    def __init__(
+        self,
+        target_techs: List[str],
+        scores: np.ndarray,
+        level_codes: np.ndarray,
+        tech_contribution: np.ndarray,
+        active_contribution: np.ndarray,
+        matched: np.ndarray,
+        tech_raw: np.ndarray,
+        active_raw: np.ndarray,
+    ) -> None:
+        self.target_techs = target_techs
+        self.scores = scores
+        self.level_codes = level_codes
+        self.tech_contribution = tech_contribution
+        self.active_contribution = active_contribution
+        self.matched = matched
+        self._tech_raw = tech_raw
+        self._active_raw = active_raw
+
+    @property
+    def levels(self) -> np.ndarray:
+        """等级名称矩阵。"""
+        return np.asarray(MATCH_LEVELS, dtype=object)[self.level_codes]
+
+    def result(self, i: int, j: int) -> Dict[str, Any]:
+        """第 i 个用户对第 j 个目标技术的结果字典（与 `calculate_match_score` 相同）。"""
+        score = float(self.scores[i, j])
+        level = MATCH_LEVELS[self.level_codes[i, j]]
+        return {
+            "score": score,
+            "level": level,
+            "tech_contribution": float(self.tech_contribution[i, j]),
+            "active_contribution": float(self.active_contribution[i]),
+            "explanation": _match_explanation(
+                score, level, float(self._tech_raw[i, j]), float(self._active_raw[i]),
+                self.target_techs[j], bool(self.matched[i, j]),
+            ),
+        }
+
+    def row(self, i: int) -> Dict[str, Dict[str, Any]]:
+        """第 i 个用户对所有目标技术的结果：{目标技术: 结果字典}。"""
+        return {tech: self.result(i, j) for j, tech in enumerate(self.target_techs)}
+
+
+def calculate_match_matrix(
+    tendency: Any,
+    active_probs: Any,
+    target_techs: List[str],
+    tech_weight: float = 0.7,
+    active_weight: float = 0.3,
+    vocab: Optional[TechVocabulary] = None,
+) -> MatchMatrix:
+    """
+    批量计算 用户 × 目标技术 的匹配度（公式与等级同 `calculate_match_score`）。
+
+    目标技术名称先通过词表的忽略大小写索引与别名表一次性解析为 ID（如 "js" → JavaScript；
+    有多个候选时取 ID 最小且该用户存在的那个），之后分数、等级、贡献度都在矩阵上一次算出。
+
+    参数：
+        tendency: `TopicProbabilityBatch`（使用与结果字典相同的 4 位取整概率）、
+            用户 × 技术 的稀疏概率矩阵（显式元素视为"已找到"），或倾向字典列表
+        active_probs: 每个用户的未来 30 天活跃概率（标量则所有用户共用）
+        target_techs: 目标技术名称列表
+        tech_weight / active_weight: 同 `calculate_match_score`
+        vocab: 技术词表（默认为基于全局词表的临时请求级词表）
+    """
+    if vocab is None:
+        vocab = tendency.vocab if isinstance(tendency, TopicProbabilityBatch) else TECH_VOCAB.local()
+    if isinstance(tendency, TopicProbabilityBatch):
+        matrix = tendency.probabilities.copy()
+        matrix.data = _round_array(matrix.data, 4)
+    elif isinstance(tendency, (list, tuple)):
+        matrix = tendency_matrix(list(tendency), vocab)
+    else:
+        matrix = sparse.csr_matrix(tendency)
+    n_users = matrix.shape[0]
+    n_targets = len(target_techs)
+    active = np.broadcast_to(np.asarray(active_probs, dtype=np.float64), (n_users,))
+
+    # 1. 目标技术 → 候选列（忽略大小写），只解析一次
+    cand_target, cand_col = [], []
+    for j, tech in enumerate(target_techs):
+        candidates = set(vocab.casefold_ids(tech))
+        canonical = vocab.canonical_lookup(tech)
+        if canonical is not None:
+            candidates.add(canonical)
+        for tech_id in sorted(candidates):
+            cand_target.append(j)
+            cand_col.append(tech_id)
+    cand_target = np.asarray(cand_target, dtype=np.int64)
+    cand_col = np.asarray(cand_col, dtype=np.int64)
+
+    # 2. 从稀疏矩阵中取出候选列上的显式元素，每个 (用户, 目标) 取列 ID 最小的一个
+    tech_prob = np.zeros((n_users, n_targets))
+    matched = np.zeros((n_users, n_targets), dtype=bool)
+    coo = matrix.tocoo()
+    hit = np.isin(coo.col, cand_col)
+    if hit.any():
+        rows, cols, vals = coo.row[hit], coo.col[hit], coo.data[hit]
+        # 一个列可能对应多个目标（如目标列表中同时有 "Python" 和 "python"）
+        by_col = np.argsort(cand_col, kind="stable")
+        lo = np.searchsorted(cand_col[by_col], cols, side="left")
+        hi = np.searchsorted(cand_col[by_col], cols, side="right")
+        reps = hi - lo
+        entry = np.repeat(np.arange(len(cols)), reps)
+        targets = cand_target[by_col][np.repeat(lo, reps) + _ragged_arange(reps)]
+        order = np.lexsort((cols[entry], targets, rows[entry]))
+        entry, targets = entry[order], targets[order]
+        key = rows[entry] * n_targets + targets
+        first = np.concatenate(([True], key[1:] != key[:-1]))
+        tech_prob[rows[entry[first]], targets[first]] = vals[entry[first]]
+        matched[rows[entry[first]], targets[first]] = True
+
+    # 3. 分数、贡献度与等级（逐元素运算顺序与标量公式相同）
+    tech_raw = tech_prob * tech_weight
+    active_raw = active * active_weight
+    scores = _round_array(tech_raw + active_raw[:, None], 4)
+    return MatchMatrix(
+        list(target_techs),
+        scores,
+        _match_level_code(scores),
+        _round_array(tech_raw, 4),
+        _round_array(active_raw, 4),
+        matched,
+        tech_raw,
+        active_raw,
+    )
+
+
+def _ragged_arange(lengths: np.ndarray) -> np.ndarray:
+    """[0..n0), [0..n1), ... 首尾相接。"""
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - lengths, lengths)
+
+
 def prepare_cold_start_data(
     username: str,
     project_count: int,
@@ -0,0 +1,124 @@
+"""
+并发请求合并（single-flight）
+
+同一开发者主页被分享时，大量客户端会同时请求 `/api/analyze/{username}`，
+每个请求都独立跑一遍 GitHub 扇出、Weibull 拟合和 LLM 调用。
+`SingleFlight` 按键合并进行中的调用：同一个键在完成前只执行一次，
+其余调用方等待并共享同一结果（或同一异常）。
+
+- 同步调用方（线程）与异步调用方（协程）可以混合使用同一个实例；
+- 结果以 `concurrent.futures.Future` 在线程 / 事件循环之间传递；
+- 调用完成后立即移除键，这里只合并"进行中"的调用，不做结果缓存；
+- 共享结果由多个调用方同时持有，调用方应视为只读。
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """按键合并进行中的调用，线程与协程安全。"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """返回 (future, 是否由当前调用方执行)。"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.executed += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """同步执行 fn；同一键已有进行中的调用时阻塞等待其结果。"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """异步执行 fn()；同一键已有进行中的调用时等待其结果。
+
+        实际计算运行在独立任务中：发起者被取消（如客户端断开）时，
+        其他等待者仍能拿到结果。
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+
+            def _done(t: "asyncio.Task") -> None:
+                if t.cancelled():
+                    future.set_exception(asyncio.CancelledError())
+                elif t.exception() is not None:
+                    future.set_exception(t.exception())
+                else:
+                    future.set_result(t.result())
+                self._finish(key, future)
+
+            task.add_done_callback(_done)
+            return await asyncio.shield(task)
+        return await asyncio.wrap_future(future)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }
+
+
+def coalesce(key: Callable[..., Hashable]) -> Callable:
+    """方法装饰器：按 key(self, *args, **kwargs) 合并 self._flights 上的并发调用。
+
+    同时支持普通方法与 async 方法；key 的签名应与被装饰方法一致。
+    """
+    def decorator(method: Callable) -> Callable:
+        name = method.__name__
+
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                return await self._flights.do_async(
+                    (name, key(self, *args, **kwargs)),
+                    lambda: method(self, *args, **kwargs),
+                )
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return self._flights.do(
+                (name, key(self, *args, **kwargs)),
+                lambda: method(self, *args, **kwargs),
+            )
+        return wrapper
+
+    return decorator
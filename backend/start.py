@@ -24,6 +24,7 @@ def check_dependencies():
         "fastapi": "FastAPI",
         "uvicorn": "Uvicorn",
         "requests": "Requests",
+        "httpx": "HTTPX",
         "pydantic": "Pydantic",
         "numpy": "NumPy",
         "scipy": "SciPy",
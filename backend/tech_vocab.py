@@ -0,0 +1,297 @@
+"""
+全局技术词表
+
+把技术名称（编程语言、话题标签）映射为稠密的整数 ID，
+技术倾向计算因此可以在计数向量 / 稀疏矩阵上用 NumPy 完成，
+而不必为每个请求构造 Counter、做集合运算。
+
+- ID 从 0 开始连续分配；
+- 全局词表 `TECH_VOCAB` 只登记社区平均倾向中的全部技术与别名表，构造后冻结，
+  进程内只读、可在多个请求之间共享，不随分析过的用户增长；
+- 用户自由填写的未知话题由 `local()` 创建的请求级词表分配溢出 ID
+  （从全局词表长度开始），请求结束后随之释放。
+
+GitHub 的 `language`（"JavaScript"）与自由填写的 `topics`（"javascript"、"js"）
+常常指同一技术。`canonical_id()` 先把名称规范化（小写、空白 / 下划线换成连字符），
+再查预编译的 别名 → 规范 ID 表（`TECH_ALIASES`，覆盖社区平均倾向中的全部技术）；
+不在表中的名称在请求级词表内按规范化后的形式合并，显示名称取已见写法中字典序最小的一个，
+与出现顺序无关。
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from seed_data import COMMUNITY_AVERAGE_TENDENCIES, get_community_average_tendency
+
+
+# 规范名称 → 别名（规范名称本身无需列出；匹配前统一经过 normalize_tech_name）
+TECH_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "Python": ("python3", "python2", "py"),
+    "JavaScript": ("js", "ecmascript", "es6", "vanilla-js"),
+    "TypeScript": ("ts",),
+    "Node.js": ("nodejs", "node", "node-js"),
+    "React": ("reactjs", "react-js", "react.js"),
+    "React Native": ("reactnative",),
+    "Vue": ("vuejs", "vue.js", "vue-js", "vue2", "vue3"),
+    "Go": ("golang",),
+    "C++": ("cpp", "cplusplus", "c-plus-plus"),
+    "C": ("c-language",),
+    "C#": ("csharp", "c-sharp"),
+    "Java": ("java8", "java11", "java17"),
+    "Ruby": ("ruby-lang",),
+    "Rust": ("rust-lang", "rustlang"),
+    "Bash": ("shell", "sh", "shell-script", "shell-scripts", "bash-script"),
+    "CSS": ("css3", "scss", "sass"),
+    "HTML": ("html5",),
+    "CUDA": ("cuda-programming",),
+    "Julia": ("julia-language", "julialang"),
+    "R": ("rstats", "r-language", "rlang"),
+    "Scala": ("scala-lang",),
+    "SQL": ("tsql", "plsql", "plpgsql"),
+    "Kotlin": ("kotlin-android",),
+    "Objective-C": ("objc", "objectivec"),
+    "Docker": ("dockerfile", "docker-compose"),
+    "Kubernetes": ("k8s",),
+    "Machine Learning": ("machine-learning", "ml"),
+    "Deep Learning": ("deep-learning",),
+    "Other": (),
+}
+
+_NORMALIZE_RE = re.compile(r"[\s_]+")
+
+
+def normalize_tech_name(name: str) -> str:
+    """规范化技术名称：去除首尾空白、小写、空白与下划线统一为连字符。"""
+    return _NORMALIZE_RE.sub("-", name.strip().lower())
+
+
+class TechVocabulary:
+    """技术名称 ↔ 整数 ID 的双向映射。
+
+    参数：
+        names: 预先登记的名称（按原样登记）
+        aliases: 规范名称 → 别名，用于 `canonical_id()`
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] = (),
+        aliases: Optional[Mapping[str, Iterable[str]]] = None,
+    ) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        self._frozen = False
+        # 忽略大小写的索引：小写名称 → ID 列表，词表增长后按需重建
+        self._folded: Dict[str, List[int]] = {}
+        self._folded_size = 0
+        # 规范化名称 → 规范 ID；原始名称 → 规范 ID（省去重复的规范化，冻结后只读）
+        self._canonical: Dict[str, int] = {}
+        self._raw_canonical: Dict[str, int] = {}
+        for name in names:
+            self.intern(name)
+        for canonical, alias_names in (aliases or {}).items():
+            tech_id = self.intern(canonical)
+            for alias in (canonical, *alias_names):
+                self._canonical[normalize_tech_name(alias)] = tech_id
+                self._raw_canonical[alias] = tech_id
+        # 预先登记的其余名称也作为自身的规范写法
+        for name in list(self._names):
+            self._canonical.setdefault(normalize_tech_name(name), self._ids[name])
+            self._raw_canonical.setdefault(name, self._canonical[normalize_tech_name(name)])
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def freeze(self) -> "TechVocabulary":
+        """冻结词表：之后不再分配新 ID，未知名称需通过 `local()` 的请求级词表处理。"""
+        self.casefold_ids("")
+        self._frozen = True
+        return self
+
+    def local(self) -> "LocalTechVocabulary":
+        """以本词表为底、可登记未知名称的请求级词表。"""
+        return LocalTechVocabulary(self)
+
+    def _check_mutable(self, name: str) -> None:
+        if self._frozen:
+            raise KeyError(f"词表已冻结，未登记的技术名称需使用 local() 词表: {name!r}")
+
+    def intern(self, name: str) -> int:
+        """返回名称的 ID，首次出现时分配新 ID。"""
+        tech_id = self._ids.get(name)
+        if tech_id is not None:
+            return tech_id
+        self._check_mutable(name)
+        with self._lock:
+            tech_id = self._ids.get(name)
+            if tech_id is None:
+                tech_id = self._ids[name] = len(self._names)
+                self._names.append(name)
+            return tech_id
+
+    def intern_many(self, names: Iterable[str]) -> np.ndarray:
+        names = list(names)
+        get = self._ids.get
+        ids = [get(name) for name in names]
+        if None in ids:
+            ids = [self.intern(name) if tech_id is None else tech_id for name, tech_id in zip(names, ids)]
+        return np.array(ids, dtype=np.int64)
+
+    def canonical_id(self, name: str) -> int:
+        """别名 / 大小写变体 → 规范 ID；未知技术按规范化后的名称分配新 ID。"""
+        tech_id = self.canonical_lookup(name)
+        if tech_id is not None:
+            return tech_id
+        self._check_mutable(name)
+        key = normalize_tech_name(name)
+        tech_id = self.intern(name.strip())
+        with self._lock:
+            return self._canonical.setdefault(key, tech_id)
+
+    def canonical_ids(self, names: Iterable[str]) -> List[int]:
+        return [self.canonical_id(name) for name in names]
+
+    def canonical_lookup(self, name: str) -> Optional[int]:
+        """只查询不分配：名称对应的规范 ID，未登记时返回 None。"""
+        tech_id = self._raw_canonical.get(name)
+        if tech_id is not None:
+            return tech_id
+        return self._canonical.get(normalize_tech_name(name))
+
+    def lookup(self, name: str) -> Optional[int]:
+        """只查询不分配，未登记时返回 None。"""
+        return self._ids.get(name)
+
+    def casefold_ids(self, name: str) -> List[int]:
+        """忽略大小写匹配该名称的所有 ID（升序）。"""
+        with self._lock:
+            if self._folded_size != len(self._names):
+                for tech_id in range(self._folded_size, len(self._names)):
+                    self._folded.setdefault(self._names[tech_id].lower(), []).append(tech_id)
+                self._folded_size = len(self._names)
+            return list(self._folded.get(name.lower(), ()))
+
+    def name(self, tech_id: int) -> str:
+        return self._names[tech_id]
+
+    def names(self, ids: Iterable[int]) -> List[str]:
+        names = self._names
+        return [names[i] for i in ids]
+
+    def vector(self, mapping: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """{名称: 值} → (ID 数组, float64 值数组)，保持字典顺序。"""
+        ids = self.intern_many(mapping.keys())
+        values = np.fromiter(mapping.values(), dtype=np.float64, count=len(ids))
+        return ids, values
+
+
+class LocalTechVocabulary(TechVocabulary):
+    """请求级词表：已登记的名称沿用底层词表的 ID，未知名称分配溢出 ID（从底层词表长度开始）。
+
+    溢出部分只属于本对象，不写回底层词表；不加锁，只在单个请求内使用。
+    """
+
+    def __init__(self, base: TechVocabulary) -> None:
+        super().__init__()
+        self.base = base
+        self._offset = len(base)
+
+    def __len__(self) -> int:
+        return self._offset + len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.base or name in self._ids
+
+    def freeze(self) -> "TechVocabulary":
+        raise TypeError("请求级词表不能冻结")
+
+    def local(self) -> "LocalTechVocabulary":
+        return self
+
+    def intern(self, name: str) -> int:
+        tech_id = self.base.lookup(name)
+        if tech_id is not None:
+            return tech_id
+        tech_id = self._ids.get(name)
+        if tech_id is None:
+            tech_id = self._ids[name] = self._offset + len(self._names)
+            self._names.append(name)
+        return tech_id
+
+    def intern_many(self, names: Iterable[str]) -> np.ndarray:
+        names = list(names)
+        base_get = self.base.lookup
+        ids = [base_get(name) for name in names]
+        if None in ids:
+            ids = [self.intern(name) if tech_id is None else tech_id for name, tech_id in zip(names, ids)]
+        return np.array(ids, dtype=np.int64)
+
+    def canonical_id(self, name: str) -> int:
+        """底层词表的别名优先；未知技术按规范化名称合并，显示名称取字典序最小的写法。"""
+        tech_id = self.base.canonical_lookup(name)
+        if tech_id is not None:
+            return tech_id
+        tech_id = self._raw_canonical.get(name)
+        if tech_id is not None:
+            return tech_id
+        key = normalize_tech_name(name)
+        spelling = name.strip()
+        tech_id = self._canonical.get(key)
+        if tech_id is None:
+            tech_id = self._canonical[key] = self.intern(spelling)
+        else:
+            self._ids.setdefault(spelling, tech_id)
+            slot = tech_id - self._offset
+            if spelling < self._names[slot]:
+                self._names[slot] = spelling
+                self._folded_size = 0
+                self._folded.clear()
+        self._raw_canonical[name] = tech_id
+        return tech_id
+
+    def canonical_lookup(self, name: str) -> Optional[int]:
+        tech_id = self.base.canonical_lookup(name)
+        if tech_id is not None:
+            return tech_id
+        return super().canonical_lookup(name)
+
+    def lookup(self, name: str) -> Optional[int]:
+        tech_id = self.base.lookup(name)
+        return tech_id if tech_id is not None else self._ids.get(name)
+
+    def casefold_ids(self, name: str) -> List[int]:
+        if self._folded_size != len(self._names):
+            self._folded.clear()
+            for slot, local_name in enumerate(self._names):
+                self._folded.setdefault(local_name.lower(), []).append(self._offset + slot)
+            self._folded_size = len(self._names)
+        return self.base.casefold_ids(name) + self._folded.get(name.lower(), [])
+
+    def name(self, tech_id: int) -> str:
+        if tech_id < self._offset:
+            return self.base.name(tech_id)
+        return self._names[tech_id - self._offset]
+
+    def names(self, ids: Iterable[int]) -> List[str]:
+        base_names, offset, local_names = self.base._names, self._offset, self._names
+        return [base_names[i] if i < offset else local_names[i - offset] for i in ids]
+
+
+def _seed_names() -> List[str]:
+    names: List[str] = []
+    for tendency in COMMUNITY_AVERAGE_TENDENCIES.values():
+        names.extend(tendency)
+    # 未知开发者类型使用的默认分布
+    names.extend(get_community_average_tendency(""))
+    return names
+
+
+# 进程内共享的全局词表（只读；未知话题使用 TECH_VOCAB.local()）
+TECH_VOCAB = TechVocabulary(_seed_names(), aliases=TECH_ALIASES).freeze()
@@ -0,0 +1,91 @@
+"""
+活跃时间拟合缓存测试
+
+用 httpx.MockTransport 作为本地桩服务器，依次调用 /api/analyze 与 /api/match，
+断言同一用户的第二次拟合命中 FitMemo（点估计与 bootstrap 置信区间分开缓存）。
+
+运行：cd backend && python -m pytest -q test_fit_memo.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+import main
+import modeling
+from fit_memo import FitMemo
+from github_client import AsyncGitHubClient
+from github_resilience import CircuitBreaker, RetryPolicy
+
+
+NOW = datetime.now(timezone.utc)
+REPO_NAMES = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta"]
+
+
+def _iso(days_ago: float) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    page = int(request.url.params.get("page", "1"))
+    if path == "/users/alice":
+        return httpx.Response(200, json={"login": "alice", "name": "Alice", "public_repos": len(REPO_NAMES)})
+    if path == "/users/alice/repos":
+        items = [
+            {"name": name, "owner": {"login": "alice"}, "language": "Python", "topics": ["ml"], "pushed_at": _iso(i)}
+            for i, name in enumerate(REPO_NAMES)
+        ]
+        return httpx.Response(200, json=items if page == 1 else [])
+    if path.startswith("/repos/alice/") and path.endswith("/commits"):
+        offset = REPO_NAMES.index(path.split("/")[3])
+        items = [
+            {
+                "sha": f"{offset}-{k}",
+                "html_url": f"https://github.com/alice/x/commit/{offset}-{k}",
+                "commit": {"author": {"date": _iso(offset * 1.7 + k * 3.3)}, "message": f"commit {k}"},
+            }
+            for k in range(8)
+        ]
+        return httpx.Response(200, json=items if page == 1 else [])
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+def test_analyze_then_match_reuses_time_fit(monkeypatch):
+    async def no_prediction(messages):
+        return None
+
+    memo = FitMemo()
+    monkeypatch.setattr(main, "fit_memo", memo)
+    monkeypatch.setattr(main, "predict_next_commit", no_prediction)
+    monkeypatch.setattr(main, "TIME_BOOTSTRAP_RESAMPLES", 50)
+    fits = []
+    point_fit = modeling._fit_point
+    monkeypatch.setattr(modeling, "_fit_point", lambda *args: fits.append(args) or point_fit(*args))
+    monkeypatch.setattr(main, "github_client", AsyncGitHubClient(
+        token="test-token",
+        base_url="https://api.github.test",
+        transport=httpx.MockTransport(_handler),
+        retry_policy=RetryPolicy(max_retries=0),
+        circuit_breaker=CircuitBreaker(),
+        events_fast_path=False,
+        commit_source="repos",
+    ))
+
+    async def call():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analysis = await client.get("/api/analyze/alice")
+            match = await client.post("/api/match", json={"username": "alice", "target_techs": ["Python"]})
+        await main.github_client.aclose()
+        return analysis, match
+
+    analysis, match = asyncio.run(call())
+    assert analysis.status_code == 200 and match.status_code == 200
+    prediction = analysis.json()["time_prediction"]
+    assert prediction["expected_interval_ci"] is not None
+    # analyze 未命中（点估计 + 置信区间），match 命中同一份点估计
+    assert len(fits) == 1
+    stats = memo.stats()
+    assert stats["misses"] == 2 and stats["hits"] == 1
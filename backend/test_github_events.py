@@ -0,0 +1,122 @@
+"""
+事件流快速路径测试
+
+用 httpx.MockTransport 作为本地桩服务器，断言事件流只用于挑选仓库：
+提交时间来自 commits API（作者时间，而非推送时间），只请求事件流中本人推送过的仓库；
+间隔不足时回退为逐仓库抓取，且不重复请求已抓取的仓库。
+
+运行：cd backend && python -m pytest -q test_github_events.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from github_client import AsyncGitHubClient
+from github_records import RepoRecord
+from github_resilience import CircuitBreaker, RetryPolicy
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _iso(days_ago: float) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+REPOS = [
+    RepoRecord("alice", "alpha", "Python", (), _iso(1)),
+    RepoRecord("alice", "beta", "Go", (), _iso(2)),
+]
+
+
+def _push(repo: str, days_ago: float, author: str = "alice") -> dict:
+    return {
+        "type": "PushEvent",
+        "created_at": _iso(days_ago),
+        "repo": {"name": repo},
+        "payload": {"commits": [{
+            "sha": f"{repo}-{days_ago}",
+            "message": "push",
+            "author": {"name": author, "email": f"{author}@example.com"},
+            "distinct": True,
+        }]},
+    }
+
+
+class StubGitHub:
+    def __init__(self, events, commit_days):
+        self.events = events
+        self.commit_days = commit_days
+        self.paths = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.paths.append(path)
+        page = int(request.url.params.get("page", "1"))
+        if path == "/users/alice":
+            return httpx.Response(200, json={"login": "alice", "name": "Alice"})
+        if path == "/users/alice/events/public":
+            return httpx.Response(200, json=self.events if page == 1 else [])
+        if path.endswith("/commits"):
+            repo = "/".join(path.split("/")[2:4])
+            items = [
+                {
+                    "sha": f"{repo}-{d}",
+                    "html_url": f"https://github.com/{repo}/commit/{d}",
+                    "commit": {"author": {"date": _iso(d)}, "message": f"{repo} {d}"},
+                }
+                for d in self.commit_days.get(repo, ())
+            ]
+            return httpx.Response(200, json=items if page == 1 else [])
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+def _activity(stub: StubGitHub):
+    async def call():
+        client = AsyncGitHubClient(
+            token="test-token",
+            base_url="https://api.github.test",
+            transport=httpx.MockTransport(stub),
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker(),
+            events_fast_path=True,
+            commit_source="repos",
+        )
+        try:
+            return await client.get_user_commit_activity("alice", repos=REPOS)
+        finally:
+            await client.aclose()
+    return asyncio.run(call())
+
+
+def test_events_pick_repos_but_times_come_from_commits_api():
+    commit_days = {
+        "alice/alpha": [3 + 7 * k for k in range(8)],   # 部分提交早于事件流的 90 天范围
+        "org/gamma": [200 + 5 * k for k in range(5)],  # 事件流推送之外的历史提交也计入
+        "alice/beta": [4, 9, 15],
+    }
+    stub = StubGitHub(
+        events=[_push("alice/alpha", 1), _push("org/gamma", 2), _push("alice/beta", 3, author="bob")],
+        commit_days=commit_days,
+    )
+    activity = _activity(stub)
+    assert activity["source"] == "events"
+    expected = [_iso(d) for repo in ("alice/alpha", "org/gamma") for d in commit_days[repo]]
+    assert sorted(activity["commit_times"]) == sorted(expected)
+    # 只有别人提交的推送不会选中 beta；窗口仍是完整的 12 个月
+    assert "/repos/alice/beta/commits" not in stub.paths
+    assert datetime.fromisoformat(activity["window_start"]) <= NOW - timedelta(days=364)
+
+
+def test_too_few_intervals_falls_back_without_refetching():
+    stub = StubGitHub(
+        events=[_push("alice/alpha", 1)],
+        commit_days={"alice/alpha": [3, 10], "alice/beta": [4, 9, 15]},
+    )
+    activity = _activity(stub)
+    assert activity["source"] == "repos"
+    assert len(activity["commit_times"]) == 5
+    assert stub.paths.count("/repos/alice/alpha/commits") == 1
+    assert stub.paths.count("/repos/alice/beta/commits") == 1
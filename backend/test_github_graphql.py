@@ -0,0 +1,293 @@
+"""
+GraphQL 抓取模式测试
+
+用 httpx.MockTransport 作为本地桩服务器，同一份数据同时以 REST 与 GraphQL 两种形式提供，
+断言 GraphQL 模式下 get_user / get_repos / get_user_commit_activity 返回的记录
+与 REST 模式结构一致，以及查询出错时的回退行为。
+
+运行：cd backend && python -m pytest -q test_github_graphql.py
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from github_client import AsyncGitHubClient
+from github_records import RepoRecord
+from github_resilience import CircuitBreaker, RetryPolicy
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _iso(days_ago: float) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+USER = {
+    "login": "alice",
+    "name": "Alice",
+    "bio": "builds things",
+    "avatar_url": "https://avatars.example/alice",
+    "company": "Acme",
+    "location": "Earth",
+    "created_at": "2015-01-01T00:00:00Z",
+    "followers": 12,
+    "following": 3,
+    "public_repos": 2,
+}
+
+REPOS = [
+    {"name": "alpha", "language": "Python", "topics": ["ml", "python3"], "pushed_at": _iso(1)},
+    {"name": "beta", "language": "Go", "topics": [], "pushed_at": _iso(5)},
+]
+
+COMMITS = {
+    "alpha": [
+        {"date": _iso(d), "message": f"alpha {d}", "url": f"https://github.com/alice/alpha/commit/{d}"}
+        for d in (1, 3, 8)
+    ],
+    "beta": [
+        {"date": _iso(d), "message": f"beta {d}", "url": f"https://github.com/alice/beta/commit/{d}"}
+        for d in (5, 20)
+    ],
+}
+
+
+class StubGitHub:
+    """同时应答 REST 与 GraphQL 请求的桩服务器。
+
+    history_errors 中的仓库在批量 history 查询里返回字段级错误（data 中对应别名为 null）；
+    fail_queries 中的查询关键字（如 "contributionsCollection"）整体返回错误、不含 data。
+    """
+
+    def __init__(self, history_errors=(), fail_queries=(), commits=None):
+        self.history_errors = set(history_errors)
+        self.fail_queries = tuple(fail_queries)
+        self.commits = COMMITS if commits is None else commits
+        self.paths = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.paths.append(path)
+        if path == "/graphql":
+            return self._graphql(json.loads(request.content))
+        if path == "/users/alice":
+            return httpx.Response(200, json={**USER, "id": 1, "type": "User"})
+        if path == "/users/ghost":
+            return httpx.Response(404, json={"message": "Not Found"})
+        if path == "/users/alice/repos":
+            page = int(request.url.params.get("page", "1"))
+            items = [{**r, "owner": {"login": "alice"}, "id": i} for i, r in enumerate(REPOS)]
+            return httpx.Response(200, json=items if page == 1 else [])
+        if path.startswith("/repos/alice/") and path.endswith("/commits"):
+            name = path.split("/")[3]
+            page = int(request.url.params.get("page", "1"))
+            per_page = int(request.url.params.get("per_page", "30"))
+            items = [
+                {"sha": c["url"][-1], "html_url": c["url"], "commit": {"author": {"date": c["date"]}, "message": c["message"]}}
+                for c in self.commits.get(name, [])
+            ]
+            return httpx.Response(200, json=items[(page - 1) * per_page:page * per_page])
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    def _graphql(self, body):
+        query, variables = body["query"], body.get("variables") or {}
+        for keyword in self.fail_queries:
+            if keyword in query:
+                return httpx.Response(200, json={"errors": [{"message": f"{keyword} failed"}]})
+        if variables.get("login") == "ghost":
+            return httpx.Response(200, json={
+                "data": {"user": None},
+                "errors": [{"type": "NOT_FOUND", "message": "Could not resolve to a User"}],
+            })
+        if "contributionsCollection" in query:
+            by_repo = [{"repository": {"name": r["name"], "owner": {"login": "alice"}}} for r in REPOS]
+            return httpx.Response(200, json={"data": {"user": {
+                "id": "U_alice",
+                "contributionsCollection": {"commitContributionsByRepository": by_repo},
+            }}})
+        if "history(" in query:
+            data, errors = {}, []
+            i = 0
+            while f"o{i}" in variables:
+                name = variables[f"n{i}"]
+                if name in self.history_errors:
+                    data[f"r{i}"] = None
+                    errors.append({"path": [f"r{i}"], "message": f"{name} unavailable"})
+                else:
+                    # 游标即偏移量
+                    start, first = int(variables[f"a{i}"] or 0), variables[f"f{i}"]
+                    commits = self.commits.get(name, [])
+                    nodes = [
+                        {"authoredDate": c["date"], "message": c["message"], "url": c["url"]}
+                        for c in commits[start:start + first]
+                    ]
+                    has_next = start + first < len(commits)
+                    history = {
+                        "pageInfo": {"hasNextPage": has_next, "endCursor": str(start + first) if has_next else None},
+                        "nodes": nodes,
+                    }
+                    data[f"r{i}"] = {"defaultBranchRef": {"target": {"history": history}}}
+                i += 1
+            return httpx.Response(200, json={"data": data, **({"errors": errors} if errors else {})})
+        if "pageInfo" in query:
+            nodes = [{
+                "name": r["name"],
+                "pushedAt": r["pushed_at"],
+                "owner": {"login": "alice"},
+                "primaryLanguage": {"name": r["language"]} if r["language"] else None,
+                "repositoryTopics": {"nodes": [{"topic": {"name": t}} for t in r["topics"]]},
+            } for r in REPOS]
+            return httpx.Response(200, json={"data": {"user": {"repositories": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "nodes": nodes,
+            }}}})
+        # 用户信息查询
+        node = {
+            "login": USER["login"],
+            "name": USER["name"],
+            "bio": USER["bio"],
+            "avatarUrl": USER["avatar_url"],
+            "company": USER["company"],
+            "location": USER["location"],
+            "createdAt": USER["created_at"],
+            "followers": {"totalCount": USER["followers"]},
+            "following": {"totalCount": USER["following"]},
+            "repositories": {"totalCount": USER["public_repos"]},
+        }
+        return httpx.Response(200, json={"data": {"user": node}})
+
+
+def _client(mode: str, stub: StubGitHub) -> AsyncGitHubClient:
+    return AsyncGitHubClient(
+        token="test-token",
+        base_url="https://api.github.test",
+        fetch_mode=mode,
+        transport=httpx.MockTransport(stub),
+        retry_policy=RetryPolicy(max_retries=0),
+        circuit_breaker=CircuitBreaker(),
+        events_fast_path=False,
+        commit_source="repos",
+    )
+
+
+def _run(mode: str, stub: StubGitHub, method: str, *args, **kwargs):
+    async def call():
+        client = _client(mode, stub)
+        try:
+            return await getattr(client, method)(*args, **kwargs)
+        finally:
+            await client.aclose()
+    return asyncio.run(call())
+
+
+def _repo_shape(repos):
+    return [(r.owner, r.name, r.language, r.topics, r.pushed_at) for r in repos]
+
+
+def _activity_shape(activity):
+    return sorted(activity["commit_times"]), activity["recent_commits"]
+
+
+def test_get_user_matches_rest_fields():
+    rest = _run("rest", StubGitHub(), "get_user", "alice")
+    stub = StubGitHub()
+    graphql = _run("graphql", stub, "get_user", "alice")
+    assert stub.paths == ["/graphql"]
+    assert set(graphql) <= set(rest)
+    assert graphql == {key: rest[key] for key in graphql}
+
+
+def test_get_repos_matches_rest_records():
+    rest = _run("rest", StubGitHub(), "get_repos", "alice")
+    stub = StubGitHub()
+    graphql = _run("graphql", stub, "get_repos", "alice")
+    assert all(isinstance(r, RepoRecord) for r in graphql)
+    assert _repo_shape(graphql) == _repo_shape(rest)
+    assert stub.paths == ["/graphql"]
+
+
+def test_commit_activity_matches_rest():
+    rest = _run("rest", StubGitHub(), "get_user_commit_activity", "alice")
+    stub = StubGitHub()
+    graphql = _run("graphql", stub, "get_user_commit_activity", "alice")
+    # contributionsCollection + 一次批量 history
+    assert stub.paths == ["/graphql", "/graphql"]
+    assert _activity_shape(graphql) == _activity_shape(rest)
+    assert set(graphql) == set(rest)
+    assert graphql["source"] == "graphql" and rest["source"] == "repos"
+
+
+def test_commit_activity_pages_history_like_rest():
+    # 超过 100 条的仓库按游标翻页，单仓库上限与 REST 模式相同（per_repo_commits=300 → 300 条）
+    commits = {
+        "alpha": [
+            {"date": _iso(d / 2), "message": f"alpha {d}", "url": f"https://github.com/alice/alpha/commit/{d}"}
+            for d in range(1, 351)
+        ],
+        "beta": COMMITS["beta"],
+    }
+    rest = _run("rest", StubGitHub(commits=commits), "get_user_commit_activity", "alice", per_repo_commits=300)
+    stub = StubGitHub(commits=commits)
+    graphql = _run("graphql", stub, "get_user_commit_activity", "alice", per_repo_commits=300)
+    assert len(rest["commit_times"]) == 300 + len(COMMITS["beta"])
+    assert _activity_shape(graphql) == _activity_shape(rest)
+    # contributionsCollection + 3 轮 history
+    assert stub.paths == ["/graphql"] * 4
+
+
+def test_recent_commits_sorted_by_instant_across_offsets():
+    # GraphQL 的 authoredDate 带提交者时区：09:00+02:00 (= 07:00Z) 早于 08:00Z，按字符串排序会排反
+    recent = [
+        {"date": "2026-01-01T09:00:00+02:00", "message": "a"},
+        {"date": "2026-01-01T08:00:00Z", "message": "b"},
+    ]
+    activity = AsyncGitHubClient._finalize_activity([], recent, "", NOW)
+    assert [c["message"] for c in activity["recent_commits"]] == ["b", "a"]
+
+
+def test_commit_activity_skips_failed_repo_like_rest():
+    # 单个仓库的 history 出错时只丢弃该仓库，与 REST 模式单仓库失败的处理一致
+    graphql = _run("graphql", StubGitHub(history_errors={"beta"}), "get_user_commit_activity", "alice")
+    assert sorted(graphql["commit_times"]) == sorted(c["date"] for c in COMMITS["alpha"])
+    assert {c["repo_name"] for c in graphql["recent_commits"]} == {"alice/alpha"}
+
+
+def test_query_error_raises_runtime_error():
+    stub = StubGitHub(fail_queries=("contributionsCollection",))
+    with pytest.raises(RuntimeError, match="contributionsCollection failed"):
+        _run("graphql", stub, "get_user_commit_activity", "alice")
+
+
+def test_missing_user_maps_to_404_like_rest():
+    with pytest.raises(RuntimeError, match="404"):
+        _run("rest", StubGitHub(), "get_user", "ghost")
+    with pytest.raises(RuntimeError, match="404"):
+        _run("graphql", StubGitHub(), "get_user", "ghost")
+
+
+def test_graphql_without_token_falls_back_to_rest(monkeypatch):
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.delenv("GITHUB_TOKENS", raising=False)
+    stub = StubGitHub()
+
+    async def call():
+        client = AsyncGitHubClient(
+            base_url="https://api.github.test",
+            fetch_mode="graphql",
+            transport=httpx.MockTransport(stub),
+            circuit_breaker=CircuitBreaker(),
+        )
+        try:
+            assert client.fetch_mode == "rest"
+            return await client.get_repos("alice")
+        finally:
+            await client.aclose()
+
+    repos = asyncio.run(call())
+    assert _repo_shape(repos) == _repo_shape(_run("rest", StubGitHub(), "get_repos", "alice"))
+    assert "/graphql" not in stub.paths